@@ -0,0 +1,52 @@
+"""Per-request authentication overhead: uncached DB lookup vs principal cache vs token claims.
+
+Run against a seeded database: python -m backend.benchmarks.auth_overhead [iterations]
+"""
+import sys
+import time
+import asyncio
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy import select
+from backend.database import async_session_maker
+from backend.models import User
+from backend.utils.auth import (
+    create_access_token, user_token_claims, principal_cache,
+    get_current_user, get_token_user
+)
+
+async def measure(label: str, iterations: int, call) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await call()
+    per_request = (time.perf_counter() - start) / iterations * 1_000_000
+    print(f"{label:<28} {per_request:10.1f} us/request")
+    return per_request
+
+async def main(iterations: int = 2000):
+    async with async_session_maker() as db:
+        result = await db.execute(select(User).order_by(User.id).limit(1))
+        user = result.scalar_one_or_none()
+        if user is None:
+            print("No users found, run backend/seed_data.py first")
+            return
+        token = create_access_token(data=user_token_claims(user))
+        credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+        async def uncached():
+            principal_cache.invalidate(user.id)
+            await get_current_user(credentials, db)
+
+        async def cached():
+            await get_current_user(credentials, db)
+
+        async def claims():
+            await get_token_user(credentials, db)
+
+        before = await measure("DB lookup (before)", iterations, uncached)
+        principal_cache.changed_at.pop(user.id, None)
+        after = await measure("principal cache", iterations, cached)
+        token_only = await measure("token claims", iterations, claims)
+        print(f"speedup: cache {before / after:.1f}x, claims {before / token_only:.1f}x")
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000))
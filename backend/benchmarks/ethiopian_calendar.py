@@ -0,0 +1,30 @@
+"""Ethiopian calendar conversion: per-date cost of single, batch and formatted conversion.
+
+Correctness is covered by backend/tests/test_ethiopian_calendar.py.
+No database needed: python -m backend.benchmarks.ethiopian_calendar [dates]
+"""
+import sys
+import time
+import random
+from datetime import date, timedelta
+from backend.utils.ethiopian_calendar import numpy, to_ethiopian, to_ethiopian_many, format_ethiopian_date, _format
+
+def measure(label: str, count: int, call):
+    start = time.perf_counter()
+    call()
+    per_date = (time.perf_counter() - start) / count * 1_000_000_000
+    print(f"{label:<28} {per_date:10.0f} ns/date")
+
+def main(count: int = 100_000):
+    start = date(1990, 1, 1)
+    dates = [start + timedelta(days=random.randrange(365 * 40)) for _ in range(count)]
+
+    print(f"{count} dates, batch backend: {'numpy' if numpy else 'pure python'}")
+    measure("single", count, lambda: [to_ethiopian(day) for day in dates])
+    measure("batch", count, lambda: to_ethiopian_many(dates))
+    _format.cache_clear()
+    measure("format (cold cache)", count, lambda: [format_ethiopian_date(day, "am") for day in dates])
+    measure("format (warm cache)", count, lambda: [format_ethiopian_date(day, "am") for day in dates])
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,52 @@
+"""Event-loop latency during a burst of concurrent logins, bcrypt inline vs on the password pool.
+
+python -m backend.benchmarks.login_burst [concurrent_logins]
+"""
+import sys
+import time
+import asyncio
+import statistics
+from backend.utils.auth import verify_password, verify_password_async, get_password_hash, password_pool
+
+TICK = 0.005
+
+async def probe(lags: list, stop: asyncio.Event):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append((time.perf_counter() - started - TICK) * 1000)
+
+async def burst(label: str, logins: int, login):
+    lags: list = []
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(probe(lags, stop))
+    await asyncio.sleep(TICK * 2)
+    started = time.perf_counter()
+    results = await asyncio.gather(*[login() for _ in range(logins)], return_exceptions=True)
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await ticker
+    rejected = sum(1 for result in results if isinstance(result, Exception))
+    lags.sort()
+    p99 = lags[int(len(lags) * 0.99) - 1] if lags else 0.0
+    print(
+        f"{label:<10} {logins} logins in {elapsed:6.2f}s  "
+        f"loop lag p50={statistics.median(lags) if lags else 0:7.1f}ms "
+        f"p99={p99:7.1f}ms max={max(lags, default=0):7.1f}ms  rejected={rejected}"
+    )
+
+async def main(logins: int = 32):
+    hashed = get_password_hash("benchmark-password")
+
+    async def inline():
+        verify_password("benchmark-password", hashed)
+
+    async def pooled():
+        await verify_password_async("benchmark-password", hashed)
+
+    await burst("inline", logins, inline)
+    await burst("pool", logins, pooled)
+    print(password_pool.stats())
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 32))
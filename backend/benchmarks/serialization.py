@@ -0,0 +1,45 @@
+"""Listing serialization throughput: pydantic validation vs the fast row encoder, plus compressed sizes.
+
+Run against a seeded database: python -m backend.benchmarks.serialization [iterations]
+"""
+import sys
+import time
+import asyncio
+from typing import List
+from sqlalchemy import select, desc
+from backend.database import async_session_maker
+from backend.models import Article
+from backend.schemas import Article as ArticleSchema, ArticleCard
+from backend.utils.cache import encode_json, compress_body
+from backend.utils.serialization import orjson, dumps, row_dicts
+
+def measure(label: str, iterations: int, call) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        call()
+    per_second = iterations / (time.perf_counter() - start)
+    print(f"{label:<36} {per_second:10.0f} listings/s")
+    return per_second
+
+async def main(iterations: int = 500):
+    async with async_session_maker() as db:
+        result = await db.execute(select(Article).order_by(desc(Article.published_at)).limit(100))
+        articles = result.scalars().all()
+    if not articles:
+        print("No articles found, run backend/seed_data.py first")
+        return
+
+    print(f"JSON encoder: {'orjson' if orjson else 'stdlib json'}")
+    for size in (20, 100):
+        rows = articles[:size]
+        print(f"\n{len(rows)} articles")
+        for model in (ArticleSchema, ArticleCard):
+            pydantic_rate = measure(f"  {model.__name__} pydantic", iterations, lambda: encode_json(List[model], rows))
+            fast_rate = measure(f"  {model.__name__} fast path", iterations, lambda: dumps(row_dicts(model, rows)))
+            print(f"  speedup {fast_rate / pydantic_rate:.1f}x")
+        body = encode_json(List[ArticleSchema], rows)
+        sizes = ", ".join(f"{name} {len(data)}" for name, data in compress_body(body).items())
+        print(f"  bytes: identity {len(body)}, {sizes}")
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 500))
@@ -0,0 +1,353 @@
+"""End-to-end API benchmarks against the real app, in-process over ASGI or against a running server.
+
+Seed a corpus first:  python -m backend.seed_data --corpus [--articles 100000]
+In-process:           python -m backend.benchmarks.suite
+Over HTTP:            python -m backend.benchmarks.suite --url http://localhost:8000
+Compare two runs:     python -m backend.benchmarks.suite --compare backend/benchmarks/results/<baseline>.json
+
+Every run writes its latency percentiles, throughput and memory to backend/benchmarks/results/
+as JSON named after the commit, so a regression can be found by comparing two files.
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import resource
+import subprocess
+from collections import Counter
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+from backend.seed_data import WORDS, BENCH_PASSWORD
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+SCENARIOS = ("homepage", "deep_pagination", "search", "article_read", "rss", "login_burst", "websocket_fanout")
+LANGUAGES = ("en", "am", "om", "ti")
+
+def percentile(ordered: List[float], fraction: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+def memory_snapshot() -> dict:
+    snapshot = {"max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)}
+    try:
+        with open("/proc/self/statm") as statm:
+            snapshot["rss_mb"] = round(int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20, 1)
+    except (OSError, ValueError):
+        pass
+    return snapshot
+
+class Recorder:
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.statuses: Counter = Counter()
+        self.errors = 0
+
+    def add(self, seconds: float, status: int):
+        self.latencies.append(seconds)
+        self.statuses[str(status)] += 1
+        if status >= 500 or status in (0, 401, 429):
+            self.errors += 1
+
+    def summary(self, elapsed: float) -> dict:
+        ordered = sorted(self.latencies)
+        count = len(ordered)
+        return {
+            "requests": count,
+            "elapsed_s": round(elapsed, 3),
+            "throughput_rps": round(count / elapsed, 1) if elapsed else 0.0,
+            "p50_ms": round(percentile(ordered, 0.50) * 1000, 2),
+            "p95_ms": round(percentile(ordered, 0.95) * 1000, 2),
+            "p99_ms": round(percentile(ordered, 0.99) * 1000, 2),
+            "max_ms": round(ordered[-1] * 1000, 2) if ordered else 0.0,
+            "mean_ms": round(sum(ordered) / count * 1000, 2) if count else 0.0,
+            "errors": self.errors,
+            "statuses": dict(self.statuses),
+            "memory": memory_snapshot(),
+        }
+
+class Bench:
+    def __init__(self, client, args):
+        self.client = client
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.article_ids: List[int] = []
+        self.cursors: Dict[int, Optional[str]] = {}
+        self.pages: Dict[int, int] = {}
+        self.etags: Dict[str, str] = {}
+
+    async def discover(self):
+        cursor = None
+        for _ in range(10):
+            params = {"status": "published", "limit": 100, "fields": "id"}
+            if cursor:
+                params["cursor"] = cursor
+            response = await self.client.get("/api/articles", params=params)
+            response.raise_for_status()
+            self.article_ids.extend(row["id"] for row in response.json())
+            cursor = response.headers.get("x-next-cursor")
+            if not cursor:
+                break
+        if not self.article_ids:
+            raise SystemExit("No published articles found, run python -m backend.seed_data --corpus first")
+
+async def run_load(bench: Bench, requests: int, concurrency: int, op: Callable[[Bench, int], Awaitable[int]]) -> dict:
+    recorder = Recorder()
+    remaining = [requests]
+
+    async def worker(index: int):
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            started = time.perf_counter()
+            try:
+                status = await op(bench, index)
+            except Exception:
+                status = 0
+            recorder.add(time.perf_counter() - started, status)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker(index) for index in range(concurrency)])
+    return recorder.summary(time.perf_counter() - started)
+
+async def homepage(bench: Bench, worker: int) -> int:
+    response = await bench.client.get("/api/articles", params={"status": "published", "limit": 20, "view": "card"})
+    return response.status_code
+
+async def deep_pagination(bench: Bench, worker: int) -> int:
+    # each worker walks the listing page by page and starts over after --pages pages
+    params = {"status": "published", "limit": 20, "view": "card"}
+    if bench.cursors.get(worker):
+        params["cursor"] = bench.cursors[worker]
+    response = await bench.client.get("/api/articles", params=params)
+    bench.pages[worker] = bench.pages.get(worker, 0) + 1
+    cursor = response.headers.get("x-next-cursor")
+    if not cursor or bench.pages[worker] >= bench.args.pages:
+        cursor = None
+        bench.pages[worker] = 0
+    bench.cursors[worker] = cursor
+    return response.status_code
+
+async def search(bench: Bench, worker: int) -> int:
+    language = bench.rng.choice(LANGUAGES)
+    term = " ".join(bench.rng.sample(WORDS[language], bench.rng.randint(1, 2)))
+    response = await bench.client.get("/api/articles/search", params={"q": term, "limit": 20})
+    return response.status_code
+
+async def article_read(bench: Bench, worker: int) -> int:
+    # skewed towards the newest stories, like real traffic
+    index = min(int(bench.rng.paretovariate(1.5)) - 1, len(bench.article_ids) - 1)
+    response = await bench.client.get(f"/api/articles/{bench.article_ids[index]}")
+    return response.status_code
+
+async def rss(bench: Bench, worker: int) -> int:
+    language = bench.rng.choice(LANGUAGES)
+    headers = {}
+    if language in bench.etags and bench.rng.random() < 0.5:
+        headers["If-None-Match"] = bench.etags[language]
+    response = await bench.client.get("/api/rss/feed.xml", params={"lang": language}, headers=headers)
+    if "etag" in response.headers:
+        bench.etags[language] = response.headers["etag"]
+    return response.status_code
+
+async def login(bench: Bench, worker: int) -> int:
+    user = f"bench-user-{bench.rng.randrange(bench.args.users)}"
+    response = await bench.client.post("/api/auth/login", json={"username": user, "password": BENCH_PASSWORD})
+    return response.status_code
+
+class FakeSocket:
+    """Just enough of a WebSocket for the connection manager, timestamping each delivery"""
+
+    def __init__(self, arrivals: List[float], done: Callable[[], None]):
+        self.arrivals = arrivals
+        self.done = done
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text: str):
+        if '"breaking_news"' in text:
+            self.arrivals.append(time.perf_counter())
+            self.done()
+
+    async def close(self, code: int = 1000):
+        pass
+
+async def websocket_fanout_in_process(bench: Bench) -> dict:
+    from backend.routers.websocket import manager, broadcast_breaking_news
+
+    recorder = Recorder()
+    arrivals: List[float] = []
+    pending = [0]
+    delivered = asyncio.Event()
+
+    def done():
+        pending[0] -= 1
+        if pending[0] <= 0:
+            delivered.set()
+
+    sockets = [FakeSocket(arrivals, done) for _ in range(bench.args.clients)]
+    for socket in sockets:
+        await manager.connect(socket)
+    started = time.perf_counter()
+    try:
+        for round_number in range(bench.args.rounds):
+            arrivals.clear()
+            pending[0] = len(sockets)
+            delivered.clear()
+            sent = time.perf_counter()
+            await broadcast_breaking_news({"id": round_number, "title_en": "Benchmark", "region_id": None, "category_id": None})
+            await asyncio.wait_for(delivered.wait(), timeout=30)
+            for arrived in arrivals:
+                recorder.add(arrived - sent, 200)
+    finally:
+        for socket in sockets:
+            manager.disconnect(socket)
+    return {**recorder.summary(time.perf_counter() - started), "clients": len(sockets), "rounds": bench.args.rounds}
+
+async def websocket_fanout_http(bench: Bench) -> dict:
+    import websockets
+
+    response = await bench.client.post("/api/auth/login", json={"username": bench.args.admin_user, "password": bench.args.admin_password})
+    response.raise_for_status()
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    ws_url = bench.args.url.replace("http", "ws", 1).rstrip("/") + "/ws/breaking-news"
+
+    recorder = Recorder()
+    clients = [await websockets.connect(ws_url, max_queue=None) for _ in range(bench.args.clients)]
+    started = time.perf_counter()
+    try:
+        for round_number in range(bench.args.rounds):
+            async def receive(client) -> float:
+                while True:
+                    if '"breaking_news"' in await client.recv():
+                        return time.perf_counter()
+
+            receivers = [asyncio.create_task(receive(client)) for client in clients]
+            created = await bench.client.post("/api/articles", headers=headers, json={
+                "title_en": f"Benchmark breaking {round_number}",
+                "slug": f"bench-breaking-{int(time.time() * 1000)}-{round_number}",
+                "content_en": "Benchmark",
+                "is_breaking": True,
+            })
+            created.raise_for_status()
+            sent = time.perf_counter()
+            await bench.client.put(f"/api/articles/{created.json()['id']}", headers=headers, json={"status": "published"})
+            for arrived in await asyncio.wait_for(asyncio.gather(*receivers), timeout=30):
+                recorder.add(arrived - sent, 200)
+            await bench.client.delete(f"/api/articles/{created.json()['id']}", headers=headers)
+    finally:
+        await asyncio.gather(*[client.close() for client in clients], return_exceptions=True)
+    return {**recorder.summary(time.perf_counter() - started), "clients": len(clients), "rounds": bench.args.rounds}
+
+@asynccontextmanager
+async def open_client(args):
+    if httpx is None:
+        raise SystemExit("The benchmark suite requires the 'httpx' package")
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, timeout=60) as client:
+            yield client
+        return
+    from backend.main import app
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            yield client
+
+async def run(args) -> dict:
+    operations = {"homepage": homepage, "deep_pagination": deep_pagination, "search": search, "article_read": article_read, "rss": rss}
+    results = {}
+    async with open_client(args) as client:
+        bench = Bench(client, args)
+        await bench.discover()
+        for name in args.scenarios:
+            print(f"{name} ...", flush=True)
+            if name == "login_burst":
+                results[name] = await run_load(bench, args.logins, args.login_concurrency, login)
+            elif name == "websocket_fanout":
+                results[name] = await (websocket_fanout_http(bench) if args.url else websocket_fanout_in_process(bench))
+            else:
+                results[name] = await run_load(bench, args.requests, args.concurrency, operations[name])
+            summary = results[name]
+            print(
+                f"  {summary['throughput_rps']:9.1f} req/s  p50 {summary['p50_ms']:8.2f}ms  "
+                f"p95 {summary['p95_ms']:8.2f}ms  p99 {summary['p99_ms']:8.2f}ms  errors {summary['errors']}"
+            )
+    return results
+
+def current_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def compare(baseline: dict, current: dict, threshold: float) -> List[str]:
+    """Print the change per scenario and return the scenarios that regressed beyond threshold"""
+    regressions = []
+    print(f"\nvs {baseline.get('commit')} ({baseline.get('timestamp')})")
+    for name, result in current["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if not before:
+            continue
+        p95 = (result["p95_ms"] - before["p95_ms"]) / before["p95_ms"] if before["p95_ms"] else 0.0
+        rps = (result["throughput_rps"] - before["throughput_rps"]) / before["throughput_rps"] if before["throughput_rps"] else 0.0
+        regressed = p95 > threshold or rps < -threshold
+        if regressed:
+            regressions.append(name)
+        print(f"  {name:<18} p95 {p95:+7.1%}  throughput {rps:+7.1%}{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="benchmark a running server instead of the in-process app")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=2000, help="requests per HTTP scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--pages", type=int, default=50, help="pages per deep pagination walk")
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--login-concurrency", type=int, default=32)
+    parser.add_argument("--users", type=int, default=1000, help="bench users seeded by seed_data --corpus")
+    parser.add_argument("--clients", type=int, default=500, help="WebSocket clients for fan-out")
+    parser.add_argument("--rounds", type=int, default=10, help="breaking news broadcasts for fan-out")
+    parser.add_argument("--admin-user", default="admin")
+    parser.add_argument("--admin-password", default="admin123")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="result file, defaults to results/<timestamp>-<commit>.json")
+    parser.add_argument("--compare", help="earlier result file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative change counted as a regression")
+    args = parser.parse_args()
+
+    scenarios = asyncio.run(run(args))
+    commit = current_commit()
+    timestamp = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
+    report = {
+        "commit": commit,
+        "timestamp": timestamp,
+        "transport": "http" if args.url else "asgi",
+        "config": {key: value for key, value in vars(args).items() if key not in ("admin_password", "compare", "output")},
+        "scenarios": scenarios,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"{timestamp}-{commit}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as handle:
+        json.dump(report, handle, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        with open(args.compare) as handle:
+            if compare(json.load(handle), report, args.threshold):
+                sys.exit(1)
+
+if __name__ == "__main__":
+    main()
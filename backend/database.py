@@ -1,9 +1,18 @@
 import os
+import time
+from typing import List, Optional
+from fastapi import Request, Response
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.schema import CreateIndex
 from urllib.parse import urlparse, urlunparse, parse_qs, urlencode
+from backend.utils.db_metrics import InstrumentedPool, db_metrics
 
 def clean_database_url(url: str) -> str:
+    # only postgres URLs need the asyncpg driver and sslmode rewrite; sqlite paths would be mangled by urlunparse
+    if not url.startswith(("postgresql://", "postgresql+asyncpg://")):
+        return url
     url = url.replace("postgresql://", "postgresql+asyncpg://")
     parsed = urlparse(url)
     query = parse_qs(parsed.query)
@@ -20,7 +29,48 @@ def clean_database_url(url: str) -> str:
 
 DATABASE_URL = clean_database_url(os.getenv("DATABASE_URL", ""))
 
-engine = create_async_engine(DATABASE_URL, echo=False, future=True)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000"))
+# Set to 0 behind pgbouncer in transaction pooling mode
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "256"))
+
+DATABASE_REPLICA_URLS = [
+    clean_database_url(url.strip()) for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()
+]
+DB_REPLICA_MAX_LAG = float(os.getenv("DB_REPLICA_MAX_LAG", "5"))
+DB_REPLICA_CHECK_INTERVAL = float(os.getenv("DB_REPLICA_CHECK_INTERVAL", "5"))
+READ_YOUR_WRITES_SECONDS = int(os.getenv("READ_YOUR_WRITES_SECONDS", "10"))
+PRIMARY_READS_COOKIE = "db_primary_until"
+
+# Zero when the replica has replayed everything it received, so an idle primary doesn't look like lag
+REPLICA_LAG_SQL = """
+SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END
+"""
+
+def engine_options(url: str) -> dict:
+    if not url.startswith("postgresql"):
+        return {}
+    return {
+        "poolclass": InstrumentedPool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+        "connect_args": {
+            "prepared_statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+            "statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+            "server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)},
+        },
+    }
+
+engine = create_async_engine(DATABASE_URL, echo=False, future=True, **engine_options(DATABASE_URL))
+db_metrics.attach(engine, "primary")
 async_session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 Base = declarative_base()
@@ -32,6 +82,143 @@ async def get_db():
         finally:
             await session.close()
 
+class Replica:
+    def __init__(self, url: str, label: str):
+        self.url = url
+        self.label = label
+        self.engine = create_async_engine(url, echo=False, future=True, **engine_options(url))
+        db_metrics.attach(self.engine, label)
+        self.session_maker = async_sessionmaker(self.engine, class_=AsyncSession, expire_on_commit=False)
+        self.healthy = True
+        self.lag = 0.0
+        self.checked_at = 0.0
+        self.errors = 0
+
+    async def check(self):
+        self.checked_at = time.monotonic()
+        try:
+            async with self.engine.connect() as conn:
+                if conn.dialect.name == "postgresql":
+                    lag = (await conn.execute(text(REPLICA_LAG_SQL))).scalar()
+                else:
+                    await conn.execute(text("SELECT 1"))
+                    lag = 0
+            self.lag = float(lag or 0)
+            self.healthy = self.lag <= DB_REPLICA_MAX_LAG
+        except Exception:
+            self.errors += 1
+            self.healthy = False
+
+class ReplicaRouter:
+    """Hands out read-only sessions round-robin over replicas that are reachable and caught up"""
+
+    def __init__(self, urls: List[str]):
+        self.replicas = [Replica(url, f"replica{index}") for index, url in enumerate(urls)]
+        self._next = 0
+        self.replica_reads = 0
+        self.primary_reads = 0
+        self.fallbacks = 0
+
+    async def choose(self) -> Optional[Replica]:
+        for _ in range(len(self.replicas)):
+            replica = self.replicas[self._next % len(self.replicas)]
+            self._next += 1
+            if time.monotonic() - replica.checked_at >= DB_REPLICA_CHECK_INTERVAL:
+                await replica.check()
+            if replica.healthy:
+                return replica
+        if self.replicas:
+            self.fallbacks += 1
+        return None
+
+    async def dispose(self):
+        for replica in self.replicas:
+            await replica.engine.dispose()
+            db_metrics.detach(replica.label)
+
+    def stats(self) -> dict:
+        return {
+            "replica_reads": self.replica_reads,
+            "primary_reads": self.primary_reads,
+            "fallbacks": self.fallbacks,
+            "replicas": [
+                {"healthy": replica.healthy, "lag_seconds": replica.lag, "errors": replica.errors}
+                for replica in self.replicas
+            ],
+        }
+
+replica_router = ReplicaRouter(DATABASE_REPLICA_URLS)
+
+def reads_pinned_to_primary(request: Request) -> bool:
+    try:
+        return float(request.cookies.get(PRIMARY_READS_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+def pin_reads_to_primary(response: Response):
+    """Send this client's reads to the primary long enough for replicas to catch up with its write"""
+    response.set_cookie(
+        PRIMARY_READS_COOKIE,
+        str(int(time.time()) + READ_YOUR_WRITES_SECONDS),
+        max_age=READ_YOUR_WRITES_SECONDS,
+        httponly=True,
+        samesite="lax",
+    )
+
+async def get_read_db(request: Request):
+    """Session for read-only routes: a replica when one is healthy, the primary otherwise"""
+    replica = None
+    if replica_router.replicas and not reads_pinned_to_primary(request):
+        replica = await replica_router.choose()
+    if replica is not None:
+        replica_router.replica_reads += 1
+        session_maker = replica.session_maker
+    else:
+        replica_router.primary_reads += 1
+        session_maker = async_session_maker
+    async with session_maker() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+async def set_statement_timeout(db: AsyncSession, milliseconds: int):
+    """Override the statement timeout for the rest of the current transaction"""
+    if db.bind.dialect.name == "postgresql":
+        await db.execute(text(f"SET LOCAL statement_timeout = {int(milliseconds)}"))
+
+async def ping() -> float:
+    started = time.perf_counter()
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+    return time.perf_counter() - started
+
+# expression indexes replaced by GIN indexes on the stored search vectors
+OBSOLETE_INDEXES = ("idx_article_search_en", "idx_article_search_am", "idx_article_search_om", "idx_article_search_ti")
+
+def create_missing_columns(conn):
+    # create_all doesn't alter existing tables; generated columns can be added without a backfill
+    if conn.dialect.name != "postgresql":
+        return
+    compiler = conn.dialect.ddl_compiler(conn.dialect, None)
+    for table in Base.metadata.sorted_tables:
+        for column in table.columns:
+            if column.computed is not None:
+                spec = compiler.get_column_specification(column)
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN IF NOT EXISTS {spec}"))
+
+def create_missing_indexes(conn):
+    # create_all skips indexes on tables that already exist
+    if conn.dialect.name != "postgresql":
+        return
+    for name in OBSOLETE_INDEXES:
+        conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            conn.execute(CreateIndex(index, if_not_exists=True))
+
 async def init_db():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(create_missing_columns)
+        await conn.run_sync(create_missing_indexes)
@@ -0,0 +1,50 @@
+"""Bulk import articles from NDJSON or CSV, upserting by slug.
+
+python -m backend.import_articles archive.ndjson [--format csv] [--author admin] [--batch-size 1000]
+
+Each record takes the ArticleCreate fields plus optional `category` / `region` slugs,
+`status` (default "published") and `published_at`. In CSV, tags are comma separated.
+"""
+import sys
+import json
+import asyncio
+import argparse
+from sqlalchemy import select
+from backend.database import async_session_maker, init_db
+from backend.models import User
+from backend.utils.bulk_import import IMPORT_BATCH_SIZE, IMPORT_FORMATS, ArticleImporter, import_format
+
+def print_progress(summary: dict):
+    print(
+        f"  {summary['processed']} rows, {summary['imported']} imported, {summary['duplicates']} duplicates, {summary['failed']} failed, "
+        f"{summary['rows_per_second']:.0f} rows/s",
+        end="\r", flush=True
+    )
+
+async def import_file(path: str, fmt: str, author: str, batch_size: int) -> dict:
+    await init_db()
+    async with async_session_maker() as db:
+        result = await db.execute(select(User.id).where(User.username == author))
+        author_id = result.scalar_one_or_none()
+        if author_id is None:
+            raise SystemExit(f"Unknown author '{author}'")
+        importer = ArticleImporter(db, author_id, batch_size, progress=print_progress)
+        with open(path, encoding="utf-8-sig", newline="") as stream:
+            summary = await importer.run(stream, fmt)
+    print()
+    return summary
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import articles")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=IMPORT_FORMATS)
+    parser.add_argument("--author", default="admin", help="username recorded as the author of new articles")
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    summary = asyncio.run(import_file(args.path, args.format or import_format(args.path), args.author, args.batch_size))
+    for error in summary.pop("errors"):
+        print(json.dumps(error, ensure_ascii=False), file=sys.stderr)
+    print(json.dumps(summary))
+    if summary["failed"]:
+        sys.exit(1)
@@ -1,26 +1,97 @@
-from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
+import time
+import asyncio
+from fastapi import FastAPI, Depends, HTTPException, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
-from backend.database import init_db
-from backend.routers import auth, articles, submissions, comments, categories, regions, rss, websocket
+from backend.database import init_db, async_session_maker, ping, replica_router, pin_reads_to_primary
+from backend.utils.view_counter import view_counter
+from backend.utils.pagination import NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER
+from backend.utils.cache import response_cache
+from backend.utils.feeds import feed_store
+from backend.utils.broker import broker
+from backend.utils.auth import Principal, get_token_user, principal_cache, password_pool, load_revocations
+from backend.utils.images import ImmutableStaticFiles, UploadLimitMiddleware, image_pipeline, UPLOAD_DIR
+from backend.utils.i18n import materialize_missing
+from backend.utils.archive import rebuild_archive
+from backend.utils.comments import rebuild_comment_counts
+from backend.utils.trending import trending
+from backend.utils.jobs import job_queue
+from backend.utils.db_metrics import db_metrics
+from backend.utils.metrics import (
+    registry, http_in_flight, current_request, RequestStats, StackSampler,
+    wants_profile, route_label, observe_request
+)
+from backend.routers import auth, articles, submissions, comments, categories, regions, rss, websocket, jobs
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await init_db()
+    async with async_session_maker() as session:
+        await materialize_missing(session)
+        await rebuild_archive(session)
+        await rebuild_comment_counts(session)
+        await load_revocations(session)
+    view_counter.start()
+    await trending.start()
+    feed_store.start()
+    websocket.manager.start()
+    await broker.start()
+    job_queue.start()
     yield
+    await job_queue.stop()
+    await broker.stop()
+    await websocket.manager.stop()
+    await feed_store.stop()
+    await view_counter.stop()
+    await trending.stop()
+    password_pool.executor.shutdown(wait=False)
+    await replica_router.dispose()
 
 app = FastAPI(title="Ethiopian News API", lifespan=lifespan)
 
+app.add_middleware(UploadLimitMiddleware, paths=("/api/articles/upload-image",))
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER, "ETag", "Last-Modified"],
 )
 
-app.mount("/uploads", StaticFiles(directory="backend/static/uploads"), name="uploads")
+@app.middleware("http")
+async def request_metrics(request: Request, call_next):
+    stats = RequestStats()
+    token = current_request.set(stats)
+    sampler = None
+    if wants_profile(request.headers):
+        sampler = StackSampler()
+        sampler.start()
+    http_in_flight.inc(1, request.method)
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    finally:
+        http_in_flight.dec(1, request.method)
+        observe_request(request.method, route_label(request.scope), status, time.perf_counter() - started, stats)
+        current_request.reset(token)
+    if sampler is not None:
+        # collapsed stacks of the loop thread while this request ran, for flamegraph.pl or speedscope
+        return PlainTextResponse(sampler.stop(), headers={"X-Profiled-Status": str(status)})
+    return response
+
+@app.middleware("http")
+async def read_your_writes(request: Request, call_next):
+    response = await call_next(request)
+    if replica_router.replicas and request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+        pin_reads_to_primary(response)
+    return response
+
+app.mount("/uploads", ImmutableStaticFiles(directory=UPLOAD_DIR), name="uploads")
 
 app.include_router(auth.router)
 app.include_router(articles.router)
@@ -30,7 +101,78 @@ app.include_router(categories.router)
 app.include_router(regions.router)
 app.include_router(rss.router)
 app.include_router(websocket.router)
+app.include_router(jobs.router)
+
+HEALTH_DB_TIMEOUT = 2.0
+
+async def database_health() -> dict:
+    try:
+        latency = await asyncio.wait_for(ping(), timeout=HEALTH_DB_TIMEOUT)
+    except Exception as exc:
+        return {"reachable": False, "error": type(exc).__name__, **db_metrics.stats()}
+    return {"reachable": True, "ping_ms": round(latency * 1000, 2), **db_metrics.stats()}
 
 @app.get("/api/health")
 async def health_check():
-    return {"status": "healthy"}
+    database = await database_health()
+    return JSONResponse(status_code=200 if database["reachable"] else 503, content={
+        "status": "healthy" if database["reachable"] else "unhealthy",
+        "database": database,
+        "replicas": replica_router.stats(),
+        "view_counter": view_counter.stats(),
+        "trending": trending.stats(),
+        "response_cache": response_cache.stats(),
+        "feeds": feed_store.stats(),
+        "websocket": websocket.manager.stats(),
+        "broker": broker.stats(),
+        "auth_cache": principal_cache.stats(),
+        "password_pool": password_pool.stats(),
+        "image_pipeline": image_pipeline.stats(),
+        "jobs": job_queue.stats(),
+    })
+
+@registry.collector
+def component_metrics():
+    cache = response_cache.stats()
+    principals = principal_cache.stats()
+    sockets = websocket.manager.stats()
+    passwords = password_pool.stats()
+    database = db_metrics.stats()
+    engines = database["engines"]
+    yield "response_cache_hits_total", "counter", "Response cache hits", cache["hits"]
+    yield "response_cache_misses_total", "counter", "Response cache misses", cache["misses"]
+    yield "response_cache_hit_ratio", "gauge", "Response cache hit ratio", cache["hit_ratio"]
+    yield "response_cache_not_modified_total", "counter", "Conditional requests answered with 304", cache["not_modified"]
+    yield "auth_cache_hit_ratio", "gauge", "Principal cache hit ratio", principals["hit_ratio"]
+    yield "websocket_connections", "gauge", "Open WebSocket connections", sockets["connections"]
+    yield "websocket_broadcasts_total", "counter", "Broadcasts fanned out by this worker", sockets["broadcasts"]
+    yield "websocket_dropped_clients_total", "counter", "Clients evicted for falling behind", sockets["dropped_clients"]
+    yield "password_pool_in_flight", "gauge", "bcrypt jobs running or queued", passwords["in_flight"]
+    yield "password_pool_queue_depth", "gauge", "bcrypt jobs waiting for a worker", passwords["queue_depth"]
+    yield "password_pool_rejected_total", "counter", "bcrypt jobs rejected with 503", passwords["rejected"]
+    yield "db_queries_total", "counter", "Database queries executed", database["queries"]
+    yield "db_slow_queries_total", "counter", "Database queries above the slow threshold", database["slow_queries"]
+    for label, engine in engines.items():
+        yield "db_pool_checkout_timeouts_total", "counter", "Pool checkouts that timed out", engine["checkout_timeouts"], {"engine": label}
+    for label, engine in engines.items():
+        yield "db_pool_wait_max_seconds", "gauge", "Longest pool checkout wait", engine["wait_max_ms"] / 1000, {"engine": label}
+    for key in ("size", "checked_out", "idle", "overflow"):
+        for label, engine in engines.items():
+            if key in engine["pool"]:
+                yield f"db_pool_{key}", "gauge", f"Connection pool {key.replace('_', ' ')}", engine["pool"][key], {"engine": label}
+    yield "view_counter_pending", "gauge", "Article views waiting to be flushed", view_counter.stats()["pending"]
+    queue = job_queue.stats()
+    for status, count in queue["depth"].items():
+        yield f"jobs_{status}", "gauge", f"Background jobs {status} (refreshed every JOB_MONITOR_INTERVAL)", count
+    yield "jobs_oldest_queued_seconds", "gauge", "Age of the oldest job due to run", queue["oldest_queued_seconds"]
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/api/metrics/db")
+async def database_metrics(current_user: Principal = Depends(get_token_user)):
+    # the slow query log carries raw SQL, so only admins see it
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized")
+    return {**db_metrics.stats(), "slow_query_log": list(db_metrics.slow_queries)}
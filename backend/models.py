@@ -1,9 +1,22 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Index, func
-from sqlalchemy.orm import relationship
-from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy import Column, Computed, Integer, String, Text, Boolean, DateTime, Float, JSON, ForeignKey, Index, func, literal_column
+from sqlalchemy.orm import relationship, deferred
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
 from datetime import datetime
 from backend.database import Base
 
+SEARCH_LANGUAGES = ["en", "am", "om", "ti"]
+SEARCH_CONFIGS = {"en": "english", "am": "simple", "om": "simple", "ti": "simple"}
+
+def search_vector(config: str, title, excerpt, content):
+    """Weighted tsvector over an article's title, excerpt and content for one language"""
+    regconfig = literal_column(f"'{config}'::regconfig")
+    empty = literal_column("''")
+    return (
+        func.setweight(func.to_tsvector(regconfig, func.coalesce(title, empty)), literal_column("'A'"))
+        .op("||")(func.setweight(func.to_tsvector(regconfig, func.coalesce(excerpt, empty)), literal_column("'B'")))
+        .op("||")(func.setweight(func.to_tsvector(regconfig, func.coalesce(content, empty)), literal_column("'C'")))
+    )
+
 class User(Base):
     __tablename__ = "users"
     
@@ -75,16 +88,54 @@ class Article(Base):
     published_at = Column(DateTime)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # maintained by PostgreSQL on every write, so searches read the vectors instead of re-parsing the text
+    search_en = deferred(Column(TSVECTOR, Computed(search_vector(SEARCH_CONFIGS["en"], title_en, excerpt_en, content_en), persisted=True)))
+    search_am = deferred(Column(TSVECTOR, Computed(search_vector(SEARCH_CONFIGS["am"], title_am, excerpt_am, content_am), persisted=True)))
+    search_om = deferred(Column(TSVECTOR, Computed(search_vector(SEARCH_CONFIGS["om"], title_om, excerpt_om, content_om), persisted=True)))
+    search_ti = deferred(Column(TSVECTOR, Computed(search_vector(SEARCH_CONFIGS["ti"], title_ti, excerpt_ti, content_ti), persisted=True)))
     
     author = relationship("User", back_populates="articles")
     category = relationship("Category", back_populates="articles")
     region = relationship("Region", back_populates="articles")
     comments = relationship("Comment", back_populates="article", cascade="all, delete-orphan")
+    localizations = relationship("ArticleLocalization", cascade="all, delete-orphan", passive_deletes=True)
     
     __table_args__ = (
         Index('idx_article_status_published', status, published_at),
+        Index('idx_article_search_vector_en', search_en, postgresql_using='gin').ddl_if(dialect='postgresql'),
+        Index('idx_article_search_vector_am', search_am, postgresql_using='gin').ddl_if(dialect='postgresql'),
+        Index('idx_article_search_vector_om', search_om, postgresql_using='gin').ddl_if(dialect='postgresql'),
+        Index('idx_article_search_vector_ti', search_ti, postgresql_using='gin').ddl_if(dialect='postgresql'),
+    )
+
+class ArticleLocalization(Base):
+    __tablename__ = "article_localizations"
+    
+    article_id = Column(Integer, ForeignKey("articles.id", ondelete="CASCADE"), primary_key=True)
+    language = Column(String, primary_key=True)
+    title = Column(String, nullable=False)
+    excerpt = Column(Text)
+    content = Column(Text, nullable=False)
+    is_fallback = Column(Boolean, default=False)
+
+class ArticleViewBucket(Base):
+    __tablename__ = "article_view_buckets"
+    
+    article_id = Column(Integer, ForeignKey("articles.id", ondelete="CASCADE"), primary_key=True)
+    bucket_start = Column(DateTime, primary_key=True)
+    views = Column(Integer, nullable=False, default=0)
+    
+    __table_args__ = (
+        Index('idx_view_bucket_start', bucket_start),
     )
 
+class ArchiveMonthCount(Base):
+    __tablename__ = "archive_month_counts"
+    
+    eth_year = Column(Integer, primary_key=True)
+    eth_month = Column(Integer, primary_key=True)
+    article_count = Column(Integer, nullable=False, default=0)
+
 class Comment(Base):
     __tablename__ = "comments"
     
@@ -97,6 +148,17 @@ class Comment(Base):
     
     article = relationship("Article", back_populates="comments")
     user = relationship("User", back_populates="comments")
+    
+    __table_args__ = (
+        Index('idx_comment_thread', article_id, is_approved, created_at, id),
+        Index('idx_comment_moderation', is_approved, created_at, id),
+    )
+
+class ArticleCommentCount(Base):
+    __tablename__ = "article_comment_counts"
+    
+    article_id = Column(Integer, ForeignKey("articles.id", ondelete="CASCADE"), primary_key=True)
+    approved_count = Column(Integer, nullable=False, default=0)
 
 class Submission(Base):
     __tablename__ = "submissions"
@@ -116,3 +178,58 @@ class Submission(Base):
     
     submitter = relationship("User", foreign_keys=[submitter_id], back_populates="submissions")
     region = relationship("Region")
+    check = relationship("SubmissionCheck", foreign_keys="SubmissionCheck.submission_id", uselist=False, passive_deletes=True)
+    
+    __table_args__ = (
+        Index('idx_submission_created', created_at, id),
+        Index('idx_submission_status_created', status, created_at, id),
+    )
+
+class SubmissionCheck(Base):
+    __tablename__ = "submission_checks"
+    
+    submission_id = Column(Integer, ForeignKey("submissions.id", ondelete="CASCADE"), primary_key=True)
+    detected_language = Column(String)
+    language_confidence = Column(Float)
+    language_matches = Column(Boolean)
+    fingerprint = Column(String, nullable=False, index=True)
+    duplicate_of = Column(Integer, ForeignKey("submissions.id", ondelete="SET NULL"))
+    images = Column(JSON, default=list)
+    processed_at = Column(DateTime, default=datetime.utcnow)
+
+class Job(Base):
+    __tablename__ = "jobs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, nullable=False)
+    payload = Column(JSON, nullable=False)
+    status = Column(String, nullable=False, default="queued")
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=5)
+    run_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    locked_until = Column(DateTime)
+    last_error = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime)
+    
+    __table_args__ = (
+        Index('idx_job_claim', status, run_at, id),
+    )
+
+class BroadcastEvent(Base):
+    __tablename__ = "broadcast_events"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    channel = Column(String, nullable=False)
+    payload = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        Index('idx_broadcast_channel_id', channel, id),
+    )
+
+class AuthRevocation(Base):
+    __tablename__ = "auth_revocations"
+    
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    changed_at = Column(DateTime, nullable=False, index=True)
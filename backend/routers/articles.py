@@ -1,22 +1,41 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, Response, UploadFile, File
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, or_, desc
-from typing import List, Optional
+from sqlalchemy import select, func
+import io
+from typing import List, Optional, Union
 from datetime import datetime
-import os
-import uuid
-from backend.database import get_db
-from backend.models import Article, User, Category, Region
-from backend.schemas import ArticleCreate, ArticleUpdate, Article as ArticleSchema
-from backend.utils.auth import get_current_user, get_optional_user
-from backend.utils.ethiopian_calendar import format_ethiopian_date
+from backend.database import get_db, get_read_db, set_statement_timeout
+from backend.models import Article, Category, Region
+from backend.schemas import (
+    ArticleCreate, ArticleUpdate, Article as ArticleSchema, ArticleSearchResult,
+    ArticleCard, LocalizedArticleCard, LocalizedArticle, ArticleImportResult,
+    ArticleDetail, LocalizedArticleDetail, ArchiveMonth
+)
+from backend.utils.auth import get_current_user, get_optional_user, get_token_user, Principal
+from backend.utils.archive import archive_month, archive_bounds, archive_histogram, record_archive_change
+from backend.utils.view_counter import view_counter
+from backend.utils.pagination import NEXT_CURSOR_HEADER, encode_cursor, decode_cursor, keyset_after, keyset_order, next_cursor_headers
+from backend.utils.cache import response_cache, cache_key, cache_store
+from backend.utils.serialization import encode_rows
+from backend.utils.feeds import feed_store, feed_state
+from backend.routers.websocket import broadcast_breaking_news, breaking_news_payload
+from backend.utils.images import image_pipeline
+from backend.utils.projections import ArticleProjection, parse_includes
+from backend.utils.i18n import resolve_language, vary_headers, materialize_article
+from backend.utils.trending import TRENDING_TOP_K, TRENDING_REFRESH_INTERVAL, trending
+from backend.utils.bulk_import import IMPORT_FORMATS, ArticleImporter, import_format
+from backend.utils.search import SEARCH_LANGUAGES, SEARCH_STATEMENT_TIMEOUT_MS, search_index, search_articles, use_fulltext, match_clause, matching_article_ids
 
 router = APIRouter(prefix="/api/articles", tags=["articles"])
 
+DETAIL_COMMENTS_LIMIT = 20
+
+ArticleListing = Union[List[ArticleSchema], List[ArticleCard], List[LocalizedArticle], List[LocalizedArticleCard]]
+
 @router.post("", response_model=ArticleSchema)
 async def create_article(
     article_data: ArticleCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     new_article = Article(
@@ -24,22 +43,61 @@ async def create_article(
         author_id=current_user.id
     )
     db.add(new_article)
+    await db.flush()
+    await materialize_article(db, new_article)
+    await record_archive_change(db, None, archive_month(new_article))
     await db.commit()
     await db.refresh(new_article)
+    search_index.sync(new_article)
+    await response_cache.invalidate("article")
+    feed_store.article_changed(feed_state(new_article))
     return new_article
 
-@router.get("", response_model=List[ArticleSchema])
+@router.post("/import", response_model=ArticleImportResult)
+async def import_articles(
+    file: UploadFile = File(...),
+    format: Optional[str] = None,
+    current_user: Principal = Depends(get_token_user),
+    db: AsyncSession = Depends(get_db)
+):
+    if current_user.role not in ["editor", "admin"]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    
+    fmt = format or import_format(file.filename, file.content_type)
+    if fmt not in IMPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(IMPORT_FORMATS)}")
+    
+    # the upload is already spooled to disk, so this streams it instead of loading it whole
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        return await ArticleImporter(db, current_user.id).run(stream, fmt)
+    finally:
+        stream.detach()
+
+@router.get("", response_model=ArticleListing)
 async def get_articles(
-    skip: int = 0,
-    limit: int = 20,
+    request: Request,
+    cursor: Optional[str] = None,
+    skip: int = Query(0, deprecated=True),
+    limit: int = Query(20, ge=1, le=100),
     status: Optional[str] = None,
     category_id: Optional[int] = None,
     region_id: Optional[int] = None,
     is_breaking: Optional[bool] = None,
     search: Optional[str] = None,
-    db: AsyncSession = Depends(get_db)
+    view: str = "full",
+    lang: Optional[str] = None,
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db)
 ):
-    query = select(Article)
+    language, negotiated = resolve_language(request, lang)
+    projection = ArticleProjection(view, language, fields)
+    key = cache_key("articles", request, negotiated and language)
+    entry = await response_cache.get(key)
+    if entry:
+        return entry.to_response(request)
+    
+    query = projection.select("published_at")
     
     if status:
         query = query.where(Article.status == status)
@@ -56,43 +114,168 @@ async def get_articles(
         query = query.where(Article.is_breaking == is_breaking)
     
     if search:
-        search_filter = or_(
-            Article.title_en.ilike(f"%{search}%"),
-            Article.title_am.ilike(f"%{search}%"),
-            Article.content_en.ilike(f"%{search}%"),
-            Article.content_am.ilike(f"%{search}%")
-        )
-        query = query.where(search_filter)
+        if use_fulltext(db):
+            await set_statement_timeout(db, SEARCH_STATEMENT_TIMEOUT_MS)
+            query = query.where(match_clause(search))
+        else:
+            query = query.where(Article.id.in_(await matching_article_ids(db, search)))
     
-    query = query.order_by(desc(Article.published_at)).offset(skip).limit(limit)
+    if cursor:
+        published_at, article_id = decode_cursor(cursor, datetime.fromisoformat)
+        query = query.where(keyset_after(Article.published_at, Article.id, published_at, article_id))
+    elif skip:
+        query = query.offset(skip)
     
-    result = await db.execute(query)
-    return result.scalars().all()
+    query = query.order_by(*keyset_order(Article.published_at, Article.id)).limit(limit)
+    
+    articles = await projection.fetch(db, query)
+    entry = await cache_store(
+        key,
+        projection.encode(articles),
+        tags=["article"],
+        headers={**next_cursor_headers(articles, limit, "published_at"), **vary_headers(negotiated)}
+    )
+    return entry.to_response(request)
 
-@router.get("/trending", response_model=List[ArticleSchema])
+@router.get("/trending", response_model=ArticleListing)
 async def get_trending_articles(
+    request: Request,
     region_id: Optional[int] = None,
-    limit: int = 10,
-    db: AsyncSession = Depends(get_db)
+    category_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(10, ge=1, le=TRENDING_TOP_K),
+    view: str = "full",
+    lang: Optional[str] = None,
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db)
 ):
-    query = select(Article).where(Article.status == "published")
+    if region_id and category_id:
+        raise HTTPException(status_code=400, detail="Choose either a region or a category")
+    language, negotiated = resolve_language(request, lang)
+    projection = ArticleProjection(view, language, fields)
+    key = cache_key("articles:trending", request, negotiated and language)
+    entry = await response_cache.get(key)
+    if entry:
+        return entry.to_response(request)
+    
+    await trending.ensure_loaded(db)
+    ranking = trending.ranking(region_id, category_id)
+    start = 0
+    if cursor:
+        position, article_id = decode_cursor(cursor, int)
+        start = ranking.index(article_id) + 1 if article_id in ranking else position
+    ids = ranking[start:start + limit]
+    
+    articles = []
+    if ids:
+        query = projection.select().where(Article.id.in_(ids), Article.status == "published")
+        found = {article.id: article for article in await projection.fetch(db, query)}
+        articles = [found[article_id] for article_id in ids if article_id in found]
     
+    headers = vary_headers(negotiated)
+    if ids and start + limit < len(ranking):
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(start + limit, ids[-1])
+    entry = await cache_store(
+        key,
+        projection.encode(articles),
+        tags=["article"],
+        headers=headers,
+        ttl=int(TRENDING_REFRESH_INTERVAL)
+    )
+    return entry.to_response(request)
+
+@router.get("/search", response_model=List[ArticleSearchResult])
+async def search(
+    q: str = Query(..., min_length=1),
+    lang: Optional[str] = None,
+    category_id: Optional[int] = None,
+    region_id: Optional[int] = None,
+    skip: int = 0,
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db)
+):
+    if lang and lang not in SEARCH_LANGUAGES:
+        raise HTTPException(status_code=400, detail="Unsupported language")
+    
+    return await search_articles(db, q, lang, category_id, region_id, skip, limit)
+
+@router.get("/archive", response_model=List[ArchiveMonth])
+async def get_archive_months(
+    request: Request,
+    lang: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    language, negotiated = resolve_language(request, lang)
+    key = cache_key("articles:archive", request, negotiated and language)
+    entry = await response_cache.get(key)
+    if entry:
+        return entry.to_response(request)
+    
+    months = await archive_histogram(db, language or "en")
+    entry = await cache_store(key, encode_rows(ArchiveMonth, months), tags=["article"], headers=vary_headers(negotiated))
+    return entry.to_response(request)
+
+@router.get("/archive/{eth_year}/{eth_month}", response_model=ArticleListing)
+async def get_archive(
+    request: Request,
+    eth_year: int = Path(..., ge=1, le=9999),
+    eth_month: int = Path(..., ge=1, le=13),
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    category_id: Optional[int] = None,
+    region_id: Optional[int] = None,
+    view: str = "card",
+    lang: Optional[str] = None,
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    start, end = archive_bounds(eth_year, eth_month)
+    language, negotiated = resolve_language(request, lang)
+    projection = ArticleProjection(view, language, fields)
+    key = cache_key(f"articles:archive:{eth_year}:{eth_month}", request, negotiated and language)
+    entry = await response_cache.get(key)
+    if entry:
+        return entry.to_response(request)
+    
+    # status plus a published_at range is served by idx_article_status_published
+    query = projection.select("published_at").where(
+        Article.status == "published",
+        Article.published_at >= start,
+        Article.published_at < end
+    )
+    if category_id:
+        query = query.where(Article.category_id == category_id)
     if region_id:
         query = query.where(Article.region_id == region_id)
+    if cursor:
+        published_at, article_id = decode_cursor(cursor, datetime.fromisoformat)
+        query = query.where(keyset_after(Article.published_at, Article.id, published_at, article_id))
+    query = query.order_by(*keyset_order(Article.published_at, Article.id)).limit(limit)
     
-    query = query.order_by(desc(Article.view_count)).limit(limit)
-    
-    result = await db.execute(query)
-    return result.scalars().all()
+    articles = await projection.fetch(db, query)
+    entry = await cache_store(
+        key,
+        projection.encode(articles),
+        tags=["article"],
+        headers={**next_cursor_headers(articles, limit, "published_at"), **vary_headers(negotiated)}
+    )
+    return entry.to_response(request)
 
-@router.get("/{article_id}", response_model=ArticleSchema)
+@router.get("/{article_id}", response_model=Union[ArticleSchema, LocalizedArticle, ArticleDetail, LocalizedArticleDetail])
 async def get_article(
     article_id: int,
-    db: AsyncSession = Depends(get_db),
-    current_user: Optional[User] = Depends(get_optional_user)
+    request: Request,
+    response: Response,
+    lang: Optional[str] = None,
+    include: Optional[str] = None,
+    comments_limit: int = Query(DETAIL_COMMENTS_LIMIT, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Optional[Principal] = Depends(get_optional_user)
 ):
-    result = await db.execute(select(Article).where(Article.id == article_id))
-    article = result.scalar_one_or_none()
+    language, negotiated = resolve_language(request, lang)
+    projection = ArticleProjection("full", language, includes=parse_includes(include))
+    articles = await projection.fetch(db, projection.select().where(Article.id == article_id))
+    article = articles[0] if articles else None
     
     if not article:
         raise HTTPException(status_code=404, detail="Article not found")
@@ -100,16 +283,28 @@ async def get_article(
     if article.status != "published" and (not current_user or current_user.id != article.author_id):
         raise HTTPException(status_code=403, detail="Not authorized")
     
-    article.view_count += 1
-    await db.commit()
+    view_counter.record(article.id)
     
+    if projection.includes:
+        comments, comments_cursor = None, None
+        if "comments" in projection.includes:
+            comments = await projection.fetch_comments(db, article.id, comments_limit)
+            comments_cursor = next_cursor_headers(comments, comments_limit, "created_at").get(NEXT_CURSOR_HEADER)
+        return Response(
+            content=projection.detail(article, comments, comments_cursor),
+            media_type="application/json",
+            headers=vary_headers(negotiated)
+        )
+    if language:
+        response.headers.update(vary_headers(negotiated))
+        return projection.localize(article, projection.localizations[article.id])
     return article
 
 @router.put("/{article_id}", response_model=ArticleSchema)
 async def update_article(
     article_id: int,
     article_data: ArticleUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_token_user),
     db: AsyncSession = Depends(get_db)
 ):
     result = await db.execute(select(Article).where(Article.id == article_id))
@@ -121,20 +316,33 @@ async def update_article(
     if article.author_id != current_user.id and current_user.role not in ["editor", "admin"]:
         raise HTTPException(status_code=403, detail="Not authorized")
     
+    previous_state = feed_state(article)
+    previous_month = archive_month(article)
+    was_live_breaking = article.status == "published" and article.is_breaking
     for key, value in article_data.dict(exclude_unset=True).items():
         setattr(article, key, value)
     
     if article_data.status == "published" and not article.published_at:
         article.published_at = datetime.utcnow()
     
+    await materialize_article(db, article)
+    await record_archive_change(db, previous_month, archive_month(article))
     await db.commit()
     await db.refresh(article)
+    search_index.sync(article)
+    trending.sync(article)
+    await response_cache.invalidate("article")
+    feed_store.article_changed(previous_state, feed_state(article))
+    
+    if article.status == "published" and article.is_breaking and not was_live_breaking:
+        await broadcast_breaking_news(breaking_news_payload(article))
+    
     return article
 
 @router.delete("/{article_id}")
 async def delete_article(
     article_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_token_user),
     db: AsyncSession = Depends(get_db)
 ):
     result = await db.execute(select(Article).where(Article.id == article_id))
@@ -146,26 +354,23 @@ async def delete_article(
     if article.author_id != current_user.id and current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Not authorized")
     
+    previous_state = feed_state(article)
+    await record_archive_change(db, archive_month(article), None)
     await db.delete(article)
     await db.commit()
+    search_index.discard(article_id)
+    trending.discard(article_id)
+    await response_cache.invalidate("article")
+    feed_store.article_changed(previous_state)
     return {"message": "Article deleted successfully"}
 
 @router.post("/upload-image")
 async def upload_image(
     file: UploadFile = File(...),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
-    if not file.content_type.startswith("image/"):
+    if not file.content_type or not file.content_type.startswith("image/"):
         raise HTTPException(status_code=400, detail="File must be an image")
     
-    file_extension = file.filename.split(".")[-1]
-    filename = f"{uuid.uuid4()}.{file_extension}"
-    filepath = f"backend/static/uploads/{filename}"
-    
-    os.makedirs("backend/static/uploads", exist_ok=True)
-    
-    with open(filepath, "wb") as f:
-        content = await file.read()
-        f.write(content)
-    
-    return {"url": f"/uploads/{filename}"}
+    return await image_pipeline.store(db, file)
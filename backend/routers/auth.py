@@ -4,7 +4,10 @@ from sqlalchemy import select
 from backend.database import get_db
 from backend.models import User
 from backend.schemas import UserCreate, UserLogin, User as UserSchema, Token
-from backend.utils.auth import verify_password, get_password_hash, create_access_token
+from backend.utils.auth import (
+    verify_password_async, get_password_hash_async, password_needs_rehash,
+    create_access_token, user_token_claims
+)
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 
@@ -18,7 +21,7 @@ async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     if result.scalar_one_or_none():
         raise HTTPException(status_code=400, detail="Username already taken")
     
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash_async(user_data.password)
     new_user = User(
         email=user_data.email,
         username=user_data.username,
@@ -29,7 +32,7 @@ async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     await db.commit()
     await db.refresh(new_user)
     
-    access_token = create_access_token(data={"sub": new_user.id})
+    access_token = create_access_token(data=user_token_claims(new_user))
     return {
         "access_token": access_token,
         "token_type": "bearer",
@@ -41,13 +44,21 @@ async def login(credentials: UserLogin, db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(User).where(User.username == credentials.username))
     user = result.scalar_one_or_none()
     
-    if not user or not verify_password(credentials.password, user.hashed_password):
+    if not user or not await verify_password_async(credentials.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password"
         )
     
-    access_token = create_access_token(data={"sub": user.id})
+    if password_needs_rehash(user.hashed_password):
+        try:
+            user.hashed_password = await get_password_hash_async(credentials.password)
+            await db.commit()
+        except HTTPException:
+            # The pool is saturated; upgrade the hash on a later login
+            pass
+    
+    access_token = create_access_token(data=user_token_claims(user))
     return {
         "access_token": access_token,
         "token_type": "bearer",
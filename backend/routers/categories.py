@@ -1,18 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from typing import List
-from backend.database import get_db
-from backend.models import Category, User
-from backend.schemas import CategoryBase, Category as CategorySchema
-from backend.utils.auth import get_current_user
+from typing import List, Optional, Union
+from backend.database import get_db, get_read_db
+from backend.models import Category
+from backend.schemas import CategoryBase, Category as CategorySchema, LocalizedCategory
+from backend.utils.auth import get_token_user, Principal
+from backend.utils.cache import response_cache, cache_key, cache_store
+from backend.utils.serialization import encode_rows
+from backend.utils.i18n import resolve_language, vary_headers, localize_named
 
 router = APIRouter(prefix="/api/categories", tags=["categories"])
 
 @router.post("", response_model=CategorySchema)
 async def create_category(
     category_data: CategoryBase,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_token_user),
     db: AsyncSession = Depends(get_db)
 ):
     if current_user.role not in ["editor", "admin"]:
@@ -22,9 +25,28 @@ async def create_category(
     db.add(new_category)
     await db.commit()
     await db.refresh(new_category)
+    await response_cache.invalidate("category")
     return new_category
 
-@router.get("", response_model=List[CategorySchema])
-async def get_categories(db: AsyncSession = Depends(get_db)):
+@router.get("", response_model=Union[List[CategorySchema], List[LocalizedCategory]])
+async def get_categories(
+    request: Request,
+    lang: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    language, negotiated = resolve_language(request, lang)
+    key = cache_key("categories", request, negotiated and language)
+    entry = await response_cache.get(key)
+    if entry:
+        return entry.to_response(request)
+    
     result = await db.execute(select(Category))
-    return result.scalars().all()
+    categories = result.scalars().all()
+    if language:
+        body = encode_rows(LocalizedCategory, [
+            localize_named(row, language, ("id", "slug", "description", "parent_id")) for row in categories
+        ])
+    else:
+        body = encode_rows(CategorySchema, categories)
+    entry = await cache_store(key, body, tags=["category"], headers=vary_headers(negotiated))
+    return entry.to_response(request)
@@ -1,18 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc
-from typing import List
-from backend.database import get_db
-from backend.models import Comment, User, Article
-from backend.schemas import CommentCreate, Comment as CommentSchema
-from backend.utils.auth import get_current_user
+from sqlalchemy import select
+from typing import List, Optional
+from datetime import datetime
+from backend.database import get_db, get_read_db
+from backend.models import Comment, Article
+from backend.schemas import CommentCreate, Comment as CommentSchema, CommentModeration, CommentModerationResult
+from backend.utils.auth import get_current_user, get_token_user, Principal
+from backend.utils.pagination import TOTAL_COUNT_HEADER, decode_cursor, keyset_after, keyset_order, next_cursor_headers, set_next_cursor
+from backend.utils.cache import response_cache, cache_key, cache_store
+from backend.utils.serialization import encode_rows
+from backend.utils.comments import thread_tag, approved_count, moderate
+from backend.routers.websocket import publish_approved_comments
 
 router = APIRouter(prefix="/api/comments", tags=["comments"])
 
+COMMENTS_PAGE_SIZE = 20
+
 @router.post("", response_model=CommentSchema)
 async def create_comment(
     comment_data: CommentCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     result = await db.execute(select(Article).where(Article.id == comment_data.article_id))
@@ -34,31 +42,86 @@ async def create_comment(
 @router.get("/article/{article_id}", response_model=List[CommentSchema])
 async def get_article_comments(
     article_id: int,
-    db: AsyncSession = Depends(get_db)
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(COMMENTS_PAGE_SIZE, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db)
 ):
+    key = cache_key(f"comments:{article_id}", request)
+    entry = await response_cache.get(key)
+    if entry:
+        return entry.to_response(request)
+    
+    # idx_comment_thread covers the filter and the order, so a page costs the same on any thread
     query = select(Comment).where(
         Comment.article_id == article_id,
         Comment.is_approved == True
-    ).order_by(desc(Comment.created_at))
+    )
+    
+    if cursor:
+        created_at, comment_id = decode_cursor(cursor, datetime.fromisoformat)
+        query = query.where(keyset_after(Comment.created_at, Comment.id, created_at, comment_id))
+    
+    query = query.order_by(*keyset_order(Comment.created_at, Comment.id)).limit(limit)
+    
+    result = await db.execute(query)
+    comments = result.scalars().all()
+    headers = next_cursor_headers(comments, limit, "created_at")
+    headers[TOTAL_COUNT_HEADER] = str(await approved_count(db, article_id))
+    entry = await cache_store(key, encode_rows(CommentSchema, comments), tags=[thread_tag(article_id)], headers=headers)
+    return entry.to_response(request)
+
+@router.get("/pending", response_model=List[CommentSchema])
+async def get_pending_comments(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    article_id: Optional[int] = None,
+    current_user: Principal = Depends(get_token_user),
+    db: AsyncSession = Depends(get_db)
+):
+    if current_user.role not in ["editor", "admin"]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    
+    query = select(Comment).where(Comment.is_approved == False)
+    if article_id:
+        query = query.where(Comment.article_id == article_id)
+    if cursor:
+        created_at, comment_id = decode_cursor(cursor, datetime.fromisoformat)
+        query = query.where(keyset_after(Comment.created_at, Comment.id, created_at, comment_id))
+    query = query.order_by(*keyset_order(Comment.created_at, Comment.id)).limit(limit)
     
     result = await db.execute(query)
-    return result.scalars().all()
+    comments = result.scalars().all()
+    set_next_cursor(response, comments, limit, "created_at")
+    return comments
+
+@router.post("/moderate", response_model=CommentModerationResult)
+async def moderate_comments(
+    moderation: CommentModeration,
+    current_user: Principal = Depends(get_token_user),
+    db: AsyncSession = Depends(get_db)
+):
+    if current_user.role not in ["editor", "admin"]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    
+    changed = await moderate(db, moderation.ids, moderation.action)
+    if moderation.action == "approve":
+        await publish_approved_comments(changed)
+    return {"action": moderation.action, "updated": len(changed)}
 
 @router.put("/{comment_id}/approve")
 async def approve_comment(
     comment_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_token_user),
     db: AsyncSession = Depends(get_db)
 ):
     if current_user.role not in ["editor", "admin"]:
         raise HTTPException(status_code=403, detail="Not authorized")
     
-    result = await db.execute(select(Comment).where(Comment.id == comment_id))
-    comment = result.scalar_one_or_none()
-    
-    if not comment:
+    result = await db.execute(select(Comment.id).where(Comment.id == comment_id))
+    if result.scalar_one_or_none() is None:
         raise HTTPException(status_code=404, detail="Comment not found")
     
-    comment.is_approved = True
-    await db.commit()
+    await publish_approved_comments(await moderate(db, [comment_id], "approve"))
     return {"message": "Comment approved"}
@@ -0,0 +1,62 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from typing import List, Optional
+from datetime import datetime
+from backend.database import get_db
+from backend.models import Job
+from backend.schemas import Job as JobSchema
+from backend.utils.auth import get_token_user, Principal
+from backend.utils.pagination import decode_cursor, keyset_after, keyset_order, set_next_cursor
+from backend.utils.jobs import JOB_STATUSES, job_queue
+
+router = APIRouter(prefix="/api/jobs", tags=["jobs"])
+
+@router.get("", response_model=List[JobSchema])
+async def get_jobs(
+    response: Response,
+    status: Optional[str] = "dead",
+    kind: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    current_user: Principal = Depends(get_token_user),
+    db: AsyncSession = Depends(get_db)
+):
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized")
+    if status and status not in JOB_STATUSES:
+        raise HTTPException(status_code=400, detail=f"status must be one of {', '.join(JOB_STATUSES)}")
+    
+    query = select(Job)
+    if status:
+        query = query.where(Job.status == status)
+    if kind:
+        query = query.where(Job.kind == kind)
+    if cursor:
+        created_at, job_id = decode_cursor(cursor, datetime.fromisoformat)
+        query = query.where(keyset_after(Job.created_at, Job.id, created_at, job_id))
+    query = query.order_by(*keyset_order(Job.created_at, Job.id)).limit(limit)
+    
+    result = await db.execute(query)
+    jobs = result.scalars().all()
+    set_next_cursor(response, jobs, limit, "created_at")
+    return jobs
+
+@router.get("/stats")
+async def get_job_stats(current_user: Principal = Depends(get_token_user)):
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized")
+    return job_queue.stats()
+
+@router.post("/{job_id}/retry")
+async def retry_job(
+    job_id: int,
+    current_user: Principal = Depends(get_token_user),
+    db: AsyncSession = Depends(get_db)
+):
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized")
+    
+    if not await job_queue.retry(db, job_id):
+        raise HTTPException(status_code=404, detail="No dead-lettered job with that id")
+    return {"message": "Job queued for retry"}
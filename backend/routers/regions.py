@@ -1,18 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from typing import List
-from backend.database import get_db
-from backend.models import Region, User
-from backend.schemas import RegionBase, Region as RegionSchema
-from backend.utils.auth import get_current_user
+from typing import List, Optional, Union
+from backend.database import get_db, get_read_db
+from backend.models import Region
+from backend.schemas import RegionBase, Region as RegionSchema, LocalizedRegion
+from backend.utils.auth import get_token_user, Principal
+from backend.utils.cache import response_cache, cache_key, cache_store
+from backend.utils.serialization import encode_rows
+from backend.utils.i18n import resolve_language, vary_headers, localize_named
 
 router = APIRouter(prefix="/api/regions", tags=["regions"])
 
 @router.post("", response_model=RegionSchema)
 async def create_region(
     region_data: RegionBase,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_token_user),
     db: AsyncSession = Depends(get_db)
 ):
     if current_user.role not in ["editor", "admin"]:
@@ -22,9 +25,28 @@ async def create_region(
     db.add(new_region)
     await db.commit()
     await db.refresh(new_region)
+    await response_cache.invalidate("region")
     return new_region
 
-@router.get("", response_model=List[RegionSchema])
-async def get_regions(db: AsyncSession = Depends(get_db)):
+@router.get("", response_model=Union[List[RegionSchema], List[LocalizedRegion]])
+async def get_regions(
+    request: Request,
+    lang: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    language, negotiated = resolve_language(request, lang)
+    key = cache_key("regions", request, negotiated and language)
+    entry = await response_cache.get(key)
+    if entry:
+        return entry.to_response(request)
+    
     result = await db.execute(select(Region))
-    return result.scalars().all()
+    regions = result.scalars().all()
+    if language:
+        body = encode_rows(LocalizedRegion, [
+            localize_named(row, language, ("id", "slug")) for row in regions
+        ])
+    else:
+        body = encode_rows(RegionSchema, regions)
+    entry = await cache_store(key, body, tags=["region"], headers=vary_headers(negotiated))
+    return entry.to_response(request)
@@ -1,39 +1,56 @@
-from fastapi import APIRouter, Depends
-from fastapi.responses import Response
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc
-from feedgen.feed import FeedGenerator
-from backend.database import get_db
-from backend.models import Article
+from typing import Optional
+from backend.database import get_read_db
+from backend.utils.feeds import feed_store, feed_response
+from backend.utils.i18n import DEFAULT_LANGUAGE, resolve_language, vary_headers
 
 router = APIRouter(prefix="/api/rss", tags=["rss"])
 
-@router.get("/feed.xml")
-async def generate_rss_feed(db: AsyncSession = Depends(get_db)):
-    fg = FeedGenerator()
-    fg.id("https://ethiopiannews.com")
-    fg.title("Ethiopian News")
-    fg.link(href="https://ethiopiannews.com", rel="alternate")
-    fg.description("Latest news from Ethiopia")
-    fg.language("en")
+async def serve_feed(
+    request: Request,
+    db: AsyncSession,
+    fmt: str,
+    lang: str,
+    category: Optional[str],
+    region: Optional[str]
+):
+    language, negotiated = resolve_language(request, lang)
+    # feeds are always rendered in one language, so an empty lang means the default
+    language = language or DEFAULT_LANGUAGE
+    if category and region:
+        raise HTTPException(status_code=400, detail="Choose either a category or a region feed")
     
-    result = await db.execute(
-        select(Article)
-        .where(Article.status == "published")
-        .order_by(desc(Article.published_at))
-        .limit(20)
-    )
-    articles = result.scalars().all()
+    if category:
+        feed = await feed_store.get(db, language, fmt, "category", category)
+    elif region:
+        feed = await feed_store.get(db, language, fmt, "region", region)
+    else:
+        feed = await feed_store.get(db, language, fmt)
     
-    for article in articles:
-        fe = fg.add_entry()
-        fe.id(f"https://ethiopiannews.com/article/{article.slug}")
-        fe.title(article.title_en)
-        fe.link(href=f"https://ethiopiannews.com/article/{article.slug}")
-        fe.description(article.excerpt_en or article.content_en[:200])
-        fe.published(article.published_at)
-        if article.featured_image:
-            fe.enclosure(article.featured_image, 0, "image/jpeg")
+    if not feed:
+        raise HTTPException(status_code=404, detail="Feed not found")
     
-    rss_feed = fg.rss_str(pretty=True)
-    return Response(content=rss_feed, media_type="application/rss+xml")
+    response = feed_response(request, feed)
+    response.headers.update(vary_headers(negotiated))
+    return response
+
+@router.get("/feed.xml")
+async def generate_rss_feed(
+    request: Request,
+    lang: str = "en",
+    category: Optional[str] = None,
+    region: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    return await serve_feed(request, db, "rss", lang, category, region)
+
+@router.get("/atom.xml")
+async def generate_atom_feed(
+    request: Request,
+    lang: str = "en",
+    category: Optional[str] = None,
+    region: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    return await serve_feed(request, db, "atom", lang, category, region)
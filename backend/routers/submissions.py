@@ -1,57 +1,97 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, UploadFile, File
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
 from typing import List, Optional
+from datetime import datetime
 import os
 import uuid
 from backend.database import get_db
-from backend.models import Submission, User
-from backend.schemas import SubmissionCreate, Submission as SubmissionSchema
-from backend.utils.auth import get_current_user, get_optional_user
+from backend.models import Submission
+from backend.schemas import SubmissionCreate, Submission as SubmissionSchema, SubmissionReview
+from backend.utils.auth import get_optional_user, get_token_user, Principal
+from backend.utils.pagination import decode_cursor, keyset_after, keyset_order, set_next_cursor
+from backend.utils.jobs import job_queue
+from backend.utils.submission_checks import check_submission
+from backend.routers.websocket import notify_editors
 
 router = APIRouter(prefix="/api/submissions", tags=["submissions"])
 
+SUBMISSION_JOB = "submission.process"
+
+@job_queue.handler(SUBMISSION_JOB)
+async def process_submission(db: AsyncSession, payload: dict):
+    """Image variants, language and duplicate checks, then a notice to editors"""
+    result = await db.execute(select(Submission).where(Submission.id == payload["submission_id"]))
+    submission = result.scalar_one_or_none()
+    if submission is None:
+        return
+    check = await check_submission(db, submission)
+    await notify_editors("submission", {
+        "submission_id": submission.id,
+        "title": submission.title,
+        "language": submission.language,
+        "detected_language": check["detected_language"],
+        "language_matches": check["language_matches"],
+        "duplicate_of": check["duplicate_of"],
+        "image_errors": sum(1 for image in check["images"] if "error" in image),
+    })
+
 @router.post("", response_model=SubmissionSchema)
 async def create_submission(
     submission_data: SubmissionCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: Optional[User] = Depends(get_optional_user)
+    current_user: Optional[Principal] = Depends(get_optional_user)
 ):
     new_submission = Submission(
         **submission_data.dict(),
         submitter_id=current_user.id if current_user else None
     )
     db.add(new_submission)
+    await db.flush()
+    # committed together with the submission, so a crash can't lose the follow-up work
+    job_queue.enqueue(db, SUBMISSION_JOB, {"submission_id": new_submission.id})
     await db.commit()
     await db.refresh(new_submission)
+    job_queue.wake()
     return new_submission
 
-@router.get("", response_model=List[SubmissionSchema])
+@router.get("", response_model=List[SubmissionReview])
 async def get_submissions(
+    response: Response,
     status: Optional[str] = None,
-    skip: int = 0,
-    limit: int = 20,
-    current_user: User = Depends(get_current_user),
+    cursor: Optional[str] = None,
+    skip: int = Query(0, deprecated=True),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: Principal = Depends(get_token_user),
     db: AsyncSession = Depends(get_db)
 ):
     if current_user.role not in ["editor", "admin"]:
         raise HTTPException(status_code=403, detail="Not authorized")
     
-    query = select(Submission)
+    query = select(Submission).options(selectinload(Submission.check))
     
     if status:
         query = query.where(Submission.status == status)
     
-    query = query.order_by(desc(Submission.created_at)).offset(skip).limit(limit)
+    if cursor:
+        created_at, submission_id = decode_cursor(cursor, datetime.fromisoformat)
+        query = query.where(keyset_after(Submission.created_at, Submission.id, created_at, submission_id))
+    elif skip:
+        query = query.offset(skip)
+    
+    query = query.order_by(*keyset_order(Submission.created_at, Submission.id)).limit(limit)
     
     result = await db.execute(query)
-    return result.scalars().all()
+    submissions = result.scalars().all()
+    set_next_cursor(response, submissions, limit, "created_at")
+    return submissions
 
 @router.put("/{submission_id}/status")
 async def update_submission_status(
     submission_id: int,
     status: str,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_token_user),
     db: AsyncSession = Depends(get_db)
 ):
     if current_user.role not in ["editor", "admin"]:
@@ -1,40 +1,379 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from typing import List
+from starlette.websockets import WebSocketState
+from typing import Dict, Iterable, List, Optional, Set
+import os
 import json
+import time
+import asyncio
+from sqlalchemy import select
+from backend.database import async_session_maker
+from backend.models import Comment
+from backend.utils.broker import broker
+from backend.utils.auth import decode_token, load_principal
+from backend.utils.metrics import ws_broadcast_seconds
+
+WS_QUEUE_SIZE = int(os.getenv("WS_QUEUE_SIZE", "32"))
+WS_SEND_TIMEOUT = float(os.getenv("WS_SEND_TIMEOUT", "10"))
+WS_PING_INTERVAL = float(os.getenv("WS_PING_INTERVAL", "25"))
+WS_IDLE_TIMEOUT = float(os.getenv("WS_IDLE_TIMEOUT", "75"))
+WS_COMMENT_BATCH_MS = float(os.getenv("WS_COMMENT_BATCH_MS", "250"))
+WS_COMMENT_REPLAY_LIMIT = int(os.getenv("WS_COMMENT_REPLAY_LIMIT", "200"))
+WS_AUTH_TIMEOUT = float(os.getenv("WS_AUTH_TIMEOUT", "10"))
+
+TOPIC_DIMENSIONS = ("region", "category", "lang")
+BREAKING_NEWS_CHANNEL = "breaking_news"
+COMMENTS_CHANNEL = "comments"
+EDITORIAL_CHANNEL = "editorial"
+EDITOR_ROLES = ("editor", "admin")
+COMMENT_FIELDS = ("id", "article_id", "user_id", "content", "is_approved", "created_at")
+BREAKING_NEWS_FIELDS = (
+    "id", "slug", "title_en", "title_am", "title_om", "title_ti",
+    "excerpt_en", "excerpt_am", "excerpt_om", "excerpt_ti",
+    "featured_image", "category_id", "region_id", "published_at",
+)
 
 router = APIRouter()
 
+def parse_topics(topics: Iterable[str]) -> Dict[str, Set[str]]:
+    """Group topic strings like "region:3" or "lang:am" by dimension"""
+    grouped: Dict[str, Set[str]] = {}
+    for topic in topics:
+        dimension, _, value = str(topic).partition(":")
+        if dimension in TOPIC_DIMENSIONS and value:
+            grouped.setdefault(dimension, set()).add(value)
+    return grouped
+
+class Client:
+    def __init__(self, websocket: WebSocket, stream: str = BREAKING_NEWS_CHANNEL, article_id: Optional[int] = None):
+        self.websocket = websocket
+        # which feed the socket follows: breaking news, one article's comments, or editorial notices
+        self.stream = stream
+        self.article_id = article_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=WS_QUEUE_SIZE)
+        self.filters: Dict[str, Set[str]] = {}
+        self.last_seen = time.monotonic()
+        # only clients that answer the app-level ping are reaped for going quiet; the rest rely on
+        # protocol-level ping/pong and failed sends to detect dead connections
+        self.heartbeat = False
+        self.sender: Optional[asyncio.Task] = None
+
+    def wants(self, topics: Dict[str, Set[str]]) -> bool:
+        # Values within a dimension are alternatives, dimensions must all match
+        for dimension, accepted in self.filters.items():
+            if not accepted & topics.get(dimension, set()):
+                return False
+        return True
+
 class ConnectionManager:
     def __init__(self):
-        self.active_connections: List[WebSocket] = []
+        self.clients: Dict[WebSocket, Client] = {}
+        self.sent = 0
+        self.dropped_clients = 0
+        self.broadcasts = 0
+        self.comment_subscribers: Dict[int, Set[Client]] = {}
+        self.pending_comments: Dict[int, List[dict]] = {}
+        self.comment_frames = 0
+        self._heartbeat: Optional[asyncio.Task] = None
+        self._closing: Set[asyncio.Task] = set()
+
+    @property
+    def active_connections(self):
+        return list(self.clients)
 
-    async def connect(self, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections.append(websocket)
+    async def connect(self, websocket: WebSocket, stream: str = BREAKING_NEWS_CHANNEL, article_id: Optional[int] = None) -> Client:
+        if websocket.client_state == WebSocketState.CONNECTING:
+            await websocket.accept()
+        client = Client(websocket, stream, article_id)
+        client.sender = asyncio.create_task(self._send_loop(client))
+        self.clients[websocket] = client
+        if article_id is not None:
+            self.comment_subscribers.setdefault(article_id, set()).add(client)
+        return client
 
     def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
+        client = self.clients.pop(websocket, None)
+        if client and client.article_id is not None:
+            subscribers = self.comment_subscribers.get(client.article_id)
+            if subscribers is not None:
+                subscribers.discard(client)
+                if not subscribers:
+                    del self.comment_subscribers[client.article_id]
+        if client and client.sender and client.sender is not asyncio.current_task():
+            client.sender.cancel()
+
+    def _evict(self, client: Client, code: int = 1013):
+        if client.websocket not in self.clients:
+            return
+        self.dropped_clients += 1
+        self.disconnect(client.websocket)
+        task = asyncio.create_task(self._close(client.websocket, code))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def _close(self, websocket: WebSocket, code: int):
+        try:
+            await websocket.close(code=code)
+        except Exception:
+            pass
+
+    async def _send_loop(self, client: Client):
+        try:
+            while True:
+                text = await client.queue.get()
+                await asyncio.wait_for(client.websocket.send_text(text), timeout=WS_SEND_TIMEOUT)
+                self.sent += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self._evict(client, code=1011)
+
+    def _enqueue(self, client: Client, text: str):
+        try:
+            client.queue.put_nowait(text)
+        except asyncio.QueueFull:
+            # A client this far behind would only stall its own queue further
+            self._evict(client)
+
+    async def broadcast(self, message: dict, topics: Iterable[str] = ()):
+        started = time.perf_counter()
+        text = json.dumps(message, default=str)
+        grouped = parse_topics(topics)
+        self.broadcasts += 1
+        for client in list(self.clients.values()):
+            if client.stream == BREAKING_NEWS_CHANNEL and client.wants(grouped):
+                self._enqueue(client, text)
+        ws_broadcast_seconds.observe(time.perf_counter() - started)
+
+    def send_to_stream(self, stream: str, message: dict):
+        text = json.dumps(message, default=str)
+        for client in list(self.clients.values()):
+            if client.stream == stream:
+                self._enqueue(client, text)
 
-    async def broadcast(self, message: dict):
-        for connection in self.active_connections:
+    def queue_comments(self, comments: Iterable[dict]):
+        """Hold comments for WS_COMMENT_BATCH_MS so a burst on one article goes out as a single frame"""
+        loop = asyncio.get_running_loop()
+        for comment in comments:
+            article_id = comment["article_id"]
+            if article_id not in self.comment_subscribers:
+                continue
+            if article_id not in self.pending_comments:
+                self.pending_comments[article_id] = []
+                loop.call_later(WS_COMMENT_BATCH_MS / 1000, self._flush_comments, article_id)
+            self.pending_comments[article_id].append(comment)
+
+    def _flush_comments(self, article_id: int):
+        comments = self.pending_comments.pop(article_id, [])
+        subscribers = self.comment_subscribers.get(article_id)
+        if not comments or not subscribers:
+            return
+        text = json.dumps(comments_frame(article_id, comments), default=str)
+        self.comment_frames += 1
+        for client in list(subscribers):
+            self._enqueue(client, text)
+
+    async def replay_comments(self, client: Client, last_id):
+        try:
+            last_id = int(last_id or 0)
+        except (TypeError, ValueError):
+            return
+        async with async_session_maker() as session:
+            result = await session.execute(
+                select(Comment)
+                .where(Comment.article_id == client.article_id, Comment.is_approved == True, Comment.id > last_id)
+                .order_by(Comment.id)
+                .limit(WS_COMMENT_REPLAY_LIMIT)
+            )
+            comments = [comment_payload(comment) for comment in result.scalars()]
+        frame = comments_frame(client.article_id, comments)
+        # a full page means there may be more; the client resumes again from the last id
+        frame["more"] = len(comments) == WS_COMMENT_REPLAY_LIMIT
+        self._enqueue(client, json.dumps(frame, default=str))
+
+    async def handle_message(self, client: Client, data: str):
+        client.last_seen = time.monotonic()
+        try:
+            message = json.loads(data)
+        except ValueError:
+            return
+        if not isinstance(message, dict):
+            return
+        action = message.get("action") or message.get("type")
+        if action == "subscribe":
+            client.filters = parse_topics(message.get("topics", []))
+            self._enqueue(client, json.dumps({"type": "subscribed", "topics": sorted(
+                f"{dimension}:{value}" for dimension, values in client.filters.items() for value in values
+            )}))
+        elif action == "resume" and client.stream == COMMENTS_CHANNEL:
+            await self.replay_comments(client, message.get("last_id"))
+        elif action == "resume":
             try:
-                await connection.send_json(message)
-            except:
+                last_seq = int(message.get("last_seq", 0))
+            except (TypeError, ValueError):
+                return
+            for seq, event in await broker.replay(BREAKING_NEWS_CHANNEL, last_seq):
+                if client.wants(parse_topics(event.get("topics", []))):
+                    self._enqueue(client, json.dumps(breaking_news_frame(seq, event), default=str))
+        elif action == "unsubscribe":
+            client.filters = {}
+        elif action == "ping":
+            client.heartbeat = True
+            self._enqueue(client, json.dumps({"type": "pong"}))
+        elif action == "pong":
+            client.heartbeat = True
+
+    async def _heartbeat_loop(self):
+        ping = json.dumps({"type": "ping"})
+        while True:
+            await asyncio.sleep(WS_PING_INTERVAL)
+            cutoff = time.monotonic() - WS_IDLE_TIMEOUT
+            for client in list(self.clients.values()):
+                if client.heartbeat and client.last_seen < cutoff:
+                    self._evict(client, code=1001)
+                else:
+                    self._enqueue(client, ping)
+
+    def start(self):
+        if self._heartbeat is None:
+            self._heartbeat = asyncio.create_task(self._heartbeat_loop())
+
+    async def stop(self):
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            try:
+                await self._heartbeat
+            except asyncio.CancelledError:
                 pass
+            self._heartbeat = None
+        for client in list(self.clients.values()):
+            self._evict(client, code=1001)
+        if self._closing:
+            await asyncio.gather(*self._closing, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {
+            "connections": len(self.clients),
+            "broadcasts": self.broadcasts,
+            "sent": self.sent,
+            "dropped_clients": self.dropped_clients,
+            "comment_streams": len(self.comment_subscribers),
+            "comment_frames": self.comment_frames,
+        }
 
 manager = ConnectionManager()
 
 @router.websocket("/ws/breaking-news")
 async def breaking_news_websocket(websocket: WebSocket):
-    await manager.connect(websocket)
+    client = await manager.connect(websocket)
+    try:
+        while True:
+            data = await websocket.receive_text()
+            await manager.handle_message(client, data)
+    except (WebSocketDisconnect, RuntimeError):
+        # RuntimeError: the manager already closed this socket
+        pass
+    finally:
+        manager.disconnect(websocket)
+
+@router.websocket("/ws/comments/{article_id}")
+async def comments_websocket(websocket: WebSocket, article_id: int, last_id: Optional[int] = None):
+    """Approved comments for one article; pass last_id (or send a resume action) to catch up first"""
+    client = await manager.connect(websocket, COMMENTS_CHANNEL, article_id)
+    try:
+        if last_id is not None:
+            await manager.replay_comments(client, last_id)
+        while True:
+            data = await websocket.receive_text()
+            await manager.handle_message(client, data)
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        manager.disconnect(websocket)
+
+async def authenticate(websocket: WebSocket):
+    """Read the bearer token from the first frame, {"action": "auth", "token": ...}, and load its principal"""
+    try:
+        message = json.loads(await asyncio.wait_for(websocket.receive_text(), WS_AUTH_TIMEOUT))
+    except (asyncio.TimeoutError, ValueError, WebSocketDisconnect):
+        return None
+    if not isinstance(message, dict) or message.get("action") != "auth":
+        return None
+    payload = decode_token(message.get("token") or "")
+    if payload is None:
+        return None
+    async with async_session_maker() as session:
+        return await load_principal(payload["sub"], session)
+
+@router.websocket("/ws/editorial")
+async def editorial_websocket(websocket: WebSocket):
+    """Intake notices for editors; the token comes in the first message, never in the URL where access logs keep it"""
+    await websocket.accept()
+    principal = await authenticate(websocket)
+    if principal is None or not principal.is_active or principal.role not in EDITOR_ROLES:
+        if websocket.client_state == WebSocketState.CONNECTED:
+            await websocket.close(code=1008)
+        return
+    await websocket.send_text(json.dumps({"type": "authenticated"}))
+    client = await manager.connect(websocket, EDITORIAL_CHANNEL)
     try:
         while True:
             data = await websocket.receive_text()
-    except WebSocketDisconnect:
+            await manager.handle_message(client, data)
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
         manager.disconnect(websocket)
 
-async def broadcast_breaking_news(article_data: dict):
-    await manager.broadcast({
-        "type": "breaking_news",
-        "data": article_data
+def article_topics(article_data: dict) -> Set[str]:
+    topics = set()
+    if article_data.get("region_id"):
+        topics.add(f"region:{article_data['region_id']}")
+    if article_data.get("category_id"):
+        topics.add(f"category:{article_data['category_id']}")
+    for lang in ("en", "am", "om", "ti"):
+        if article_data.get(f"title_{lang}"):
+            topics.add(f"lang:{lang}")
+    return topics
+
+def breaking_news_payload(article) -> dict:
+    return {field: getattr(article, field) for field in BREAKING_NEWS_FIELDS}
+
+def breaking_news_frame(seq: int, event: dict) -> dict:
+    return {"type": "breaking_news", "seq": seq, "data": event["data"]}
+
+async def deliver_breaking_news(seq: int, event: dict):
+    await manager.broadcast(breaking_news_frame(seq, event), topics=event.get("topics", []))
+
+broker.subscribe(BREAKING_NEWS_CHANNEL, deliver_breaking_news)
+
+async def broadcast_breaking_news(article_data: dict) -> int:
+    """Publish to every worker; each one fans out to its own sockets"""
+    return await broker.publish(BREAKING_NEWS_CHANNEL, {
+        "data": article_data,
+        "topics": sorted(article_topics(article_data))
     })
+
+def comment_payload(comment) -> dict:
+    return {field: getattr(comment, field) for field in COMMENT_FIELDS}
+
+def comments_frame(article_id: int, comments: List[dict]) -> dict:
+    return {"type": "comments", "article_id": article_id, "comments": comments}
+
+async def deliver_comments(seq: int, event: dict):
+    manager.queue_comments(event["comments"])
+
+broker.subscribe(COMMENTS_CHANNEL, deliver_comments)
+
+async def publish_approved_comments(comments) -> Optional[int]:
+    """One broker message per moderation action, however many comments it approved"""
+    if not comments:
+        return None
+    return await broker.publish(COMMENTS_CHANNEL, {"comments": [comment_payload(comment) for comment in comments]})
+
+async def deliver_editorial(seq: int, event: dict):
+    manager.send_to_stream(EDITORIAL_CHANNEL, {"type": event["type"], "seq": seq, "data": event["data"]})
+
+broker.subscribe(EDITORIAL_CHANNEL, deliver_editorial)
+
+async def notify_editors(event_type: str, data: dict) -> int:
+    return await broker.publish(EDITORIAL_CHANNEL, {"type": event_type, "data": data})
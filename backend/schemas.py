@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional, List
+from typing import Literal, Optional, List
 from datetime import datetime
 
 class UserBase(BaseModel):
@@ -95,6 +95,23 @@ class ArticleUpdate(BaseModel):
     status: Optional[str] = None
     is_breaking: Optional[bool] = None
 
+ArticleStatus = Literal["draft", "review", "published"]
+
+class ArticleImport(ArticleCreate):
+    category: Optional[str] = None
+    region: Optional[str] = None
+    status: ArticleStatus = "published"
+    published_at: Optional[datetime] = None
+
+class ArticleImportResult(BaseModel):
+    processed: int
+    imported: int
+    duplicates: int = 0
+    failed: int
+    elapsed_seconds: float
+    rows_per_second: float
+    errors: List[dict] = []
+
 class Article(ArticleBase):
     id: int
     author_id: int
@@ -107,6 +124,76 @@ class Article(ArticleBase):
     class Config:
         from_attributes = True
 
+class ArticleCard(BaseModel):
+    id: int
+    slug: str
+    title_en: str
+    title_am: Optional[str] = None
+    title_om: Optional[str] = None
+    title_ti: Optional[str] = None
+    excerpt_en: Optional[str] = None
+    excerpt_am: Optional[str] = None
+    excerpt_om: Optional[str] = None
+    excerpt_ti: Optional[str] = None
+    featured_image: Optional[str] = None
+    category_id: Optional[int] = None
+    region_id: Optional[int] = None
+    tags: List[str] = []
+    is_breaking: bool = False
+    view_count: int
+    published_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+class LocalizedArticleCard(BaseModel):
+    id: int
+    slug: str
+    language: str
+    is_fallback: bool = False
+    title: str
+    excerpt: Optional[str] = None
+    featured_image: Optional[str] = None
+    category_id: Optional[int] = None
+    region_id: Optional[int] = None
+    tags: List[str] = []
+    is_breaking: bool = False
+    view_count: int
+    published_at: Optional[datetime] = None
+
+class LocalizedArticle(LocalizedArticleCard):
+    content: str
+    author_id: int
+    status: str
+    created_at: datetime
+    updated_at: datetime
+
+class LocalizedCategory(BaseModel):
+    id: int
+    language: str
+    name: str
+    slug: str
+    description: Optional[str] = None
+    parent_id: Optional[int] = None
+
+class LocalizedRegion(BaseModel):
+    id: int
+    language: str
+    name: str
+    slug: str
+
+class ArchiveMonth(BaseModel):
+    year: int
+    month: int
+    name: str
+    count: int
+
+class ArticleSearchResult(BaseModel):
+    article: Article
+    rank: float
+    language: str
+    snippet: Optional[str] = None
+
 class CommentBase(BaseModel):
     content: str
 
@@ -123,6 +210,38 @@ class Comment(CommentBase):
     class Config:
         from_attributes = True
 
+class CommentModeration(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=1000)
+    action: Literal["approve", "reject"]
+
+class CommentModerationResult(BaseModel):
+    action: str
+    updated: int
+
+class AuthorSummary(BaseModel):
+    id: int
+    username: str
+    full_name: Optional[str] = None
+    
+    class Config:
+        from_attributes = True
+
+class ArticleDetail(Article):
+    author: Optional[AuthorSummary] = None
+    category: Optional[Category] = None
+    region: Optional[Region] = None
+    comments: Optional[List[Comment]] = None
+    comments_cursor: Optional[str] = None
+    approved_comment_count: int = 0
+
+class LocalizedArticleDetail(LocalizedArticle):
+    author: Optional[AuthorSummary] = None
+    category: Optional[LocalizedCategory] = None
+    region: Optional[LocalizedRegion] = None
+    comments: Optional[List[Comment]] = None
+    comments_cursor: Optional[str] = None
+    approved_comment_count: int = 0
+
 class SubmissionBase(BaseModel):
     submitter_name: Optional[str] = None
     submitter_email: Optional[EmailStr] = None
@@ -143,3 +262,32 @@ class Submission(SubmissionBase):
     
     class Config:
         from_attributes = True
+
+class SubmissionCheck(BaseModel):
+    detected_language: Optional[str] = None
+    language_confidence: Optional[float] = None
+    language_matches: Optional[bool] = None
+    duplicate_of: Optional[int] = None
+    images: List[dict] = []
+    processed_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+class SubmissionReview(Submission):
+    check: Optional[SubmissionCheck] = None
+
+class Job(BaseModel):
+    id: int
+    kind: str
+    payload: dict
+    status: str
+    attempts: int
+    max_attempts: int
+    run_at: datetime
+    last_error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
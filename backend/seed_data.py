@@ -1,8 +1,33 @@
 import asyncio
+import argparse
+import random
+from datetime import datetime, timedelta
+from sqlalchemy import select, insert, func
 from sqlalchemy.ext.asyncio import AsyncSession
 from backend.database import async_session_maker, init_db
-from backend.models import User, Category, Region
+from backend.models import User, Category, Region, Article, ArticleViewBucket, Comment, Submission
 from backend.utils.auth import get_password_hash
+from backend.utils.i18n import materialize_missing
+from backend.utils.archive import rebuild_archive
+from backend.utils.comments import rebuild_comment_counts
+from backend.utils.trending import bucket_start
+
+BENCH_PASSWORD = "benchmark"
+BATCH_SIZE = 2000
+
+# Small per-language vocabularies; enough variety for search and realistic row widths
+WORDS = {
+    "en": "government election economy coffee harvest rain drought market stadium athletics marathon "
+          "hospital vaccine school university railway dam electricity investment export farmers "
+          "parliament minister festival culture startup mobile bank inflation road bridge".split(),
+    "am": "መንግሥት ምርጫ ኢኮኖሚ ቡና ምርት ዝናብ ድርቅ ገበያ ስታዲየም አትሌቲክስ ማራቶን ሆስፒታል ክትባት ትምህርት "
+          "ዩኒቨርሲቲ ባቡር ግድብ ኤሌክትሪክ ኢንቨስትመንት ገበሬዎች ፓርላማ ሚኒስትር በዓል ባህል ባንክ መንገድ ድልድይ".split(),
+    "om": "mootummaa filannoo dinagdee buna midhaan rooba gogiinsa gabaa istaadiyeemii atileetiksii "
+          "maaratoonii hospitaala talaallii mana barumsaa yuunivarsiitii baaburaa hidha ibsaa "
+          "qonnaan bultoota paarlaamaa ministira ayyaana aadaa baankii karaa riqicha".split(),
+    "ti": "መንግስቲ ምርጫ ቁጠባ ቡን ምህርቲ ዝናብ ድርቅ ዕዳጋ ስታድየም ኣትሌቲክስ ማራቶን ሆስፒታል ክታበት ትምህርቲ "
+          "ዩኒቨርሲቲ ባቡር ግድብ ኤሌክትሪክ ወፍሪ ሓረስቶት ባይቶ ሚኒስተር በዓል ባህሊ ባንክ መገዲ ድልድል".split(),
+}
 
 async def seed_data():
     await init_db()
@@ -102,5 +127,154 @@ async def seed_data():
         await db.commit()
         print("✅ Database seeded successfully!")
 
+def sentence(rng: random.Random, language: str, words: int) -> str:
+    return " ".join(rng.choice(WORDS[language]) for _ in range(words)).capitalize()
+
+def synthetic_article(rng: random.Random, number: int, author_ids, category_ids, region_ids, now: datetime) -> dict:
+    # Every article has English; most carry one or more translations
+    languages = ["en"] + [language for language in ("am", "om", "ti") if rng.random() < 0.6]
+    published = rng.random() < 0.9
+    published_at = now - timedelta(minutes=rng.randint(0, 60 * 24 * 365 * 2)) if published else None
+    row = {
+        "slug": f"bench-{number}",
+        "author_id": rng.choice(author_ids),
+        "category_id": rng.choice(category_ids),
+        "region_id": rng.choice(region_ids),
+        "tags": rng.sample(WORDS["en"], 3),
+        "status": "published" if published else rng.choice(["draft", "review"]),
+        "is_breaking": rng.random() < 0.01,
+        "view_count": int(rng.paretovariate(1.2) * 10),
+        "featured_image": f"/uploads/bench-{number % 500}.jpg",
+        "published_at": published_at,
+        "created_at": published_at or now,
+        "updated_at": published_at or now,
+    }
+    for language in ("en", "am", "om", "ti"):
+        present = language in languages
+        row[f"title_{language}"] = sentence(rng, language, rng.randint(5, 10)) if present else None
+        row[f"excerpt_{language}"] = sentence(rng, language, rng.randint(15, 30)) if present else None
+        row[f"content_{language}"] = (
+            "\n\n".join(sentence(rng, language, rng.randint(40, 80)) for _ in range(rng.randint(3, 8)))
+            if present else None
+        )
+    return row
+
+async def _insert_batches(db: AsyncSession, model, rows, label: str):
+    batch = []
+    total = 0
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            await db.execute(insert(model), batch)
+            await db.commit()
+            total += len(batch)
+            batch = []
+            print(f"  {label}: {total}", end="\r")
+    if batch:
+        await db.execute(insert(model), batch)
+        await db.commit()
+        total += len(batch)
+    print(f"  {label}: {total}")
+
+async def seed_corpus(articles: int = 100_000, users: int = 1_000, comments: int = 300_000, submissions: int = 10_000, seed: int = 42):
+    """Large synthetic multilingual corpus for benchmarks; expects seed_data() to have run"""
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    async with async_session_maker() as db:
+        category_ids = (await db.execute(select(Category.id))).scalars().all()
+        region_ids = (await db.execute(select(Region.id))).scalars().all()
+        if not category_ids or not region_ids:
+            raise SystemExit("Run seed_data() first")
+        first_article = (await db.execute(select(func.coalesce(func.max(Article.id), 0)))).scalar_one() + 1
+        first_user = (await db.execute(select(func.count(User.id)))).scalar_one()
+
+        # hashing once keeps seeding fast; every bench user logs in with BENCH_PASSWORD
+        hashed = get_password_hash(BENCH_PASSWORD)
+        await _insert_batches(db, User, (
+            {
+                "email": f"bench-user-{first_user + n}@example.com",
+                "username": f"bench-user-{first_user + n}",
+                "full_name": f"Bench User {first_user + n}",
+                "hashed_password": hashed,
+                "role": "editor" if n % 50 == 0 else "user",
+            }
+            for n in range(users)
+        ), "users")
+        user_ids = (await db.execute(select(User.id))).scalars().all()
+        author_ids = (await db.execute(select(User.id).where(User.role.in_(["editor", "admin"])))).scalars().all()
+
+        await _insert_batches(db, Article, (
+            synthetic_article(rng, first_article + n, author_ids, category_ids, region_ids, now)
+            for n in range(articles)
+        ), "articles")
+        article_ids = (await db.execute(
+            select(Article.id).where(Article.status == "published", Article.id >= first_article)
+        )).scalars().all()
+
+        await _insert_batches(db, Comment, (
+            {
+                "article_id": rng.choice(article_ids),
+                "user_id": rng.choice(user_ids),
+                "content": sentence(rng, rng.choice(list(WORDS)), rng.randint(5, 40)),
+                "is_approved": rng.random() < 0.8,
+                "created_at": now - timedelta(minutes=rng.randint(0, 60 * 24 * 90)),
+            }
+            for _ in range(comments)
+        ), "comments")
+
+        await _insert_batches(db, Submission, (
+            {
+                "submitter_id": rng.choice(user_ids) if rng.random() < 0.5 else None,
+                "submitter_name": f"Reporter {n}",
+                "submitter_email": f"reporter-{n}@example.com",
+                "title": sentence(rng, "en", 8),
+                "content": sentence(rng, "en", 120),
+                "language": rng.choice(list(WORDS)),
+                "images": [],
+                "region_id": rng.choice(region_ids),
+                "status": rng.choice(["pending", "pending", "approved", "rejected"]),
+                "created_at": now - timedelta(minutes=rng.randint(0, 60 * 24 * 180)),
+            }
+            for n in range(submissions)
+        ), "submissions")
+
+        # a day of hourly view buckets for the most recent stories so trending has something to rank
+        recent = (await db.execute(
+            select(Article.id)
+            .where(Article.status == "published", Article.id >= first_article)
+            .order_by(Article.published_at.desc())
+            .limit(2000)
+        )).scalars().all()
+        hour = bucket_start(now)
+        await _insert_batches(db, ArticleViewBucket, (
+            {"article_id": article_id, "bucket_start": hour - timedelta(hours=age), "views": int(rng.paretovariate(1.1) * 5)}
+            for article_id in recent
+            for age in range(24)
+            if rng.random() < 0.5
+        ), "view buckets")
+
+        print(f"  localizations: {await materialize_missing(db)}")
+        # the bulk inserts bypass the incremental counters, so recount them from scratch
+        print(f"  archive months: {await rebuild_archive(db, only_if_empty=False)}")
+        print(f"  comment counts: {await rebuild_comment_counts(db, only_if_empty=False)}")
+    print("✅ Benchmark corpus seeded successfully!")
+
 if __name__ == "__main__":
-    asyncio.run(seed_data())
+    parser = argparse.ArgumentParser(description="Seed the database")
+    parser.add_argument("--corpus", action="store_true", help="also seed a large synthetic corpus for benchmarks")
+    parser.add_argument("--skip-base", action="store_true", help="don't create the admin user, categories and regions")
+    parser.add_argument("--articles", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=1_000)
+    parser.add_argument("--comments", type=int, default=300_000)
+    parser.add_argument("--submissions", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    async def main():
+        if not args.skip_base:
+            await seed_data()
+        if args.corpus:
+            await init_db()
+            await seed_corpus(args.articles, args.users, args.comments, args.submissions, args.seed)
+
+    asyncio.run(main())
@@ -0,0 +1,4 @@
+import os
+
+# backend.database builds its engine at import time
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite://")
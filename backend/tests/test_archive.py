@@ -0,0 +1,7 @@
+from fastapi.testclient import TestClient
+from backend.main import app
+
+def test_archive_rejects_out_of_range_dates():
+    client = TestClient(app)
+    for path in ("0/1", "99999999999999999999/1", "2016/0", "2016/14"):
+        assert client.get(f"/api/articles/archive/{path}").status_code == 422
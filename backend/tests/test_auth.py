@@ -0,0 +1,107 @@
+import asyncio
+import time
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+from starlette.websockets import WebSocketDisconnect
+from backend.main import app
+from backend.models import AuthRevocation, User
+from backend.routers import websocket
+from backend.utils import auth
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    monkeypatch.setattr(auth, "principal_cache", auth.PrincipalCache())
+
+def make_engine(url="sqlite+aiosqlite://"):
+    # file databases are reopened per connection, so sessions made here work from the test client's loop
+    return create_async_engine(url) if url == "sqlite+aiosqlite://" else create_async_engine(url, poolclass=NullPool)
+
+async def create_user(engine, **fields):
+    async with engine.begin() as conn:
+        await conn.run_sync(User.__table__.create, checkfirst=True)
+        await conn.run_sync(AuthRevocation.__table__.create, checkfirst=True)
+    async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+        user = User(email="ed@example.com", username="ed", hashed_password="x", role="editor", **fields)
+        session.add(user)
+        await session.commit()
+        return user
+
+def fresh_claims(user):
+    return {**auth.user_token_claims(user), "iat": int(time.time()) - 1}
+
+def test_role_change_revokes_signed_claims_and_survives_restart():
+    async def run():
+        engine = make_engine()
+        user = await create_user(engine)
+        claims = fresh_claims(user)
+        assert auth.claims_principal(claims).role == "editor"
+
+        session_maker = async_sessionmaker(engine, expire_on_commit=False)
+        async with session_maker() as session:
+            stored = await session.get(User, user.id)
+            stored.role = "reader"
+            await session.commit()
+        assert auth.claims_principal(claims) is None
+
+        # a worker started after the change only has the stored marker to go on
+        auth.principal_cache = auth.PrincipalCache()
+        assert auth.claims_principal(claims) is not None
+        async with session_maker() as session:
+            assert (await session.execute(select(AuthRevocation.user_id))).scalars().all() == [user.id]
+            await auth.load_revocations(session)
+        assert auth.claims_principal(claims) is None
+        await engine.dispose()
+    asyncio.run(run())
+
+def test_unrelated_update_keeps_claims_valid():
+    async def run():
+        engine = make_engine()
+        user = await create_user(engine)
+        async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+            stored = await session.get(User, user.id)
+            stored.full_name = "Editor"
+            await session.commit()
+        assert auth.claims_principal(fresh_claims(user)) is not None
+        await engine.dispose()
+    asyncio.run(run())
+
+def test_expired_revocation_markers_are_pruned(monkeypatch):
+    cache = auth.principal_cache
+    now = time.time()
+    cache.invalidate(1, now - 60)
+    cache.invalidate(2, now - 30)
+    assert list(cache.changed_at) == [1, 2]
+    monkeypatch.setattr(time, "time", lambda: now + auth.AUTH_CLAIMS_MAX_AGE - 45)
+    cache.invalidate(3)
+    assert list(cache.changed_at) == [2, 3]
+    assert cache.stats()["revocations"] == 2
+
+def editorial_client(tmp_path, monkeypatch, **fields):
+    url = f"sqlite+aiosqlite:///{tmp_path / 'auth.db'}"
+    engine = make_engine(url)
+    user = asyncio.run(create_user(engine, **fields))
+    asyncio.run(engine.dispose())
+    monkeypatch.setattr(websocket, "async_session_maker", async_sessionmaker(make_engine(url), expire_on_commit=False))
+    return TestClient(app), auth.create_access_token(auth.user_token_claims(user))
+
+def test_editorial_socket_takes_token_from_first_message(tmp_path, monkeypatch):
+    client, token = editorial_client(tmp_path, monkeypatch)
+    with client.websocket_connect("/ws/editorial") as ws:
+        ws.send_json({"action": "auth", "token": token})
+        assert ws.receive_json() == {"type": "authenticated"}
+
+def test_editorial_socket_rejects_query_token_and_inactive_users(tmp_path, monkeypatch):
+    client, token = editorial_client(tmp_path, monkeypatch, is_active=False)
+    with client.websocket_connect(f"/ws/editorial?token={token}") as ws:
+        ws.send_json({"action": "ping"})
+        with pytest.raises(WebSocketDisconnect) as closed:
+            ws.receive_json()
+    assert closed.value.code == 1008
+    with client.websocket_connect("/ws/editorial") as ws:
+        ws.send_json({"action": "auth", "token": token})
+        with pytest.raises(WebSocketDisconnect) as closed:
+            ws.receive_json()
+    assert closed.value.code == 1008
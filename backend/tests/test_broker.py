@@ -0,0 +1,83 @@
+import asyncio
+import json
+import pytest
+from backend.utils import broker as broker_module
+from backend.utils.broker import Broker, MemoryBroker, PostgresBroker
+
+def test_incomplete_backend_fails_on_creation():
+    class Incomplete(Broker):
+        async def publish(self, channel, message):
+            return 0
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+def test_memory_broker_replays_after_sequence():
+    async def run():
+        broker = MemoryBroker()
+        received = []
+
+        async def handler(seq, message):
+            received.append((seq, message))
+
+        broker.subscribe("news", handler)
+        for n in range(3):
+            await broker.publish("news", {"n": n})
+        await broker.publish("other", {"n": 99})
+        return received, await broker.replay("news", 1)
+
+    received, replayed = asyncio.run(run())
+    assert received == [(1, {"n": 0}), (2, {"n": 1}), (3, {"n": 2})]
+    assert replayed == [(2, {"n": 1}), (3, {"n": 2})]
+
+def test_postgres_broker_delivers_late_commits_once(monkeypatch):
+    async def run():
+        broker = PostgresBroker(dsn="postgresql://unused")
+        received = []
+
+        async def handler(seq, message):
+            received.append(seq)
+
+        broker.subscribe("news", handler)
+        broker.low_water["news"] = 10
+        stored = {12: {"n": 12}}
+
+        async def replay(channel, after_seq, limit=broker_module.BROKER_REPLAY_LIMIT):
+            return [(seq, message) for seq, message in sorted(stored.items()) if seq > after_seq][:limit]
+
+        monkeypatch.setattr(broker, "replay", replay)
+        dispatcher = asyncio.create_task(broker._dispatch_loop())
+        # id 13 commits before 11; 11 must still be delivered, duplicates and garbage must not
+        for payload in (
+            {"seq": 13, "message": {"n": 13}},
+            "not json",
+            {"seq": 11, "message": {"n": 11}},
+            {"seq": 13, "message": {"n": 13}},
+            {"seq": 10, "message": {"n": 10}},
+            {"seq": 12},
+        ):
+            broker._on_notify(None, 0, "news", payload if isinstance(payload, str) else json.dumps(payload))
+        while not broker._queue.empty():
+            await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        dispatcher.cancel()
+        await asyncio.gather(dispatcher, return_exceptions=True)
+        # a reconnect catch-up replays from low_water and must not repeat anything
+        await broker._catch_up()
+        return received
+
+    assert asyncio.run(run()) == [13, 11, 12]
+
+def test_seen_window_advances_low_water(monkeypatch):
+    monkeypatch.setattr(broker_module, "BROKER_SEEN_WINDOW", 3)
+
+    async def run():
+        broker = PostgresBroker(dsn="postgresql://unused")
+        for seq in (5, 2, 4, 1, 3):
+            await broker._deliver("news", seq, {})
+        return broker.low_water["news"], broker.seen["news"]
+
+    low_water, seen = asyncio.run(run())
+    assert low_water == 2
+    assert seen == {3, 4, 5}
+    assert all(seq > low_water for seq in seen)
@@ -0,0 +1,30 @@
+import asyncio
+from types import SimpleNamespace
+from backend.utils.bulk_import import ArticleImporter
+
+def importer():
+    articles = ArticleImporter(db=None, author_id=1)
+    articles.slugs = {"category": {}, "region": {}}
+    return articles
+
+def record(slug, **fields):
+    return {"slug": slug, "title_en": slug.title(), "content_en": "Body", **fields}
+
+def test_status_must_be_a_known_article_status():
+    articles = importer()
+    assert articles.prepare(1, record("ok", status="draft"))["status"] == "draft"
+    assert articles.prepare(2, record("bad", status="whatever")) is None
+    assert articles.failed == 1
+    assert articles.errors[0]["line"] == 2 and "status" in articles.errors[0]["error"]
+
+def test_slugs_repeated_in_a_batch_count_as_duplicates(monkeypatch):
+    articles = importer()
+
+    async def write(rows):
+        return [SimpleNamespace(**row) for row in {row["slug"]: row for row in rows}.values()]
+
+    monkeypatch.setattr(articles, "write", write)
+    batch = [(line, articles.prepare(line, record(slug))) for line, slug in enumerate(["a", "b", "a", "a"], 1)]
+    written = asyncio.run(articles.write_batch(batch))
+    assert [article.slug for article in written] == ["a", "b"]
+    assert (articles.imported, articles.duplicates) == (2, 2)
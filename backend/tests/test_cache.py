@@ -0,0 +1,65 @@
+import asyncio
+import gzip
+from starlette.requests import Request
+from backend.utils import cache
+from backend.utils.cache import CacheEntry, MemoryCache, cache_key, make_etag
+
+def request(query: str = "", **headers) -> Request:
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/api/articles",
+        "query_string": query.encode(),
+        "headers": [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()],
+    })
+
+def entry(body: bytes = b"[]", tags=("article",)) -> CacheEntry:
+    return CacheEntry(body=body, media_type="application/json", etag=make_etag(body), tags=list(tags))
+
+def test_cache_key_ignores_parameter_order_and_empty_values():
+    assert cache_key("articles", request("limit=5&region_id=2")) == cache_key("articles", request("region_id=2&limit=5&q="))
+    assert cache_key("articles", request("limit=5"), "am") != cache_key("articles", request("limit=5"))
+
+def test_memory_cache_evicts_lru_expires_and_invalidates_by_tag():
+    async def run():
+        store = MemoryCache(max_entries=2, ttl=60)
+        await store.set("a", entry(tags=["article", "article:1"]))
+        await store.set("b", entry(tags=["region"]))
+        assert await store.get("a") is not None
+        await store.set("c", entry(tags=["article"]))
+        assert await store.get("b") is None and store.evictions == 1
+
+        await store.invalidate("article")
+        assert await store.get("a") is None and await store.get("c") is None
+        assert store.tag_index == {} and store.invalidations == 2
+
+        await store.set("d", entry(), ttl=-1)
+        assert await store.get("d") is None and "d" not in store.entries
+    asyncio.run(run())
+
+def test_cached_entry_answers_conditional_and_compressed_requests(monkeypatch):
+    monkeypatch.setattr(cache, "response_cache", MemoryCache())
+    body = b'{"items": "' + b"x" * 4096 + b'"}'
+    cached = entry(body)
+    cached.encodings = cache.compress_body(body)
+
+    plain = cached.to_response(request())
+    assert plain.status_code == 200 and plain.body == body and plain.headers["etag"] == cached.etag
+
+    gzipped = cached.to_response(request(accept_encoding="gzip;q=1, br;q=0"))
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert gzip.decompress(gzipped.body) == body
+    assert gzipped.headers["etag"] != cached.etag and "Accept-Encoding" in gzipped.headers["vary"]
+
+    for validator in (cached.etag, f"W/{cached.etag}"):
+        assert cached.to_response(request(if_none_match=validator)).status_code == 304
+    revalidated = cached.to_response(request(accept_encoding="gzip", if_none_match=gzipped.headers["etag"]))
+    assert revalidated.status_code == 304 and revalidated.headers["content-encoding"] == "gzip"
+    assert cached.to_response(request(if_none_match='"stale"')).status_code == 200
+    assert cache.response_cache.not_modified == 3
+
+def test_entries_round_trip_through_the_shared_backend_format():
+    cached = entry(b"x" * 2048)
+    cached.encodings = cache.compress_body(cached.body)
+    restored = CacheEntry.loads(cached.dumps())
+    assert (restored.body, restored.etag, restored.tags, restored.encodings) == (cached.body, cached.etag, cached.tags, cached.encodings)
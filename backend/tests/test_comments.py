@@ -0,0 +1,65 @@
+import asyncio
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from backend.models import ArticleCommentCount, Comment
+from backend.utils import comments
+from backend.utils.cache import CacheEntry, MemoryCache, make_etag
+
+def with_comments(monkeypatch, scenario):
+    async def run():
+        engine = create_async_engine("sqlite+aiosqlite://")
+        async with engine.begin() as conn:
+            await conn.run_sync(Comment.__table__.create)
+            await conn.run_sync(ArticleCommentCount.__table__.create)
+            await conn.execute(insert(Comment), [
+                {"id": comment_id, "article_id": article_id, "user_id": 1, "content": "hi", "is_approved": False}
+                for comment_id, article_id in ((1, 10), (2, 10), (3, 20), (4, 20))
+            ])
+        monkeypatch.setattr(comments, "response_cache", MemoryCache())
+        try:
+            async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+                await scenario(session)
+        finally:
+            await engine.dispose()
+    asyncio.run(run())
+
+async def counts(db):
+    return dict((await db.execute(select(ArticleCommentCount.article_id, ArticleCommentCount.approved_count))).all())
+
+def test_moderation_keeps_approved_counts_in_step(monkeypatch):
+    async def scenario(db):
+        changed = await comments.moderate(db, [1, 2, 2, 3, 99], "approve")
+        assert sorted(row.id for row in changed) == [1, 2, 3]
+        assert await counts(db) == {10: 2, 20: 1}
+
+        # approving again must not count the same comments twice
+        assert [row.id for row in await comments.moderate(db, [1, 4], "approve")] == [4]
+        assert await counts(db) == {10: 2, 20: 2}
+
+        await comments.moderate(db, [2, 3], "reject")
+        assert await counts(db) == {10: 1, 20: 1}
+        assert sorted(await db.scalars(select(Comment.id))) == [1, 4]
+
+        expected = await counts(db)
+        assert await comments.rebuild_comment_counts(db, only_if_empty=False) == 2
+        assert await counts(db) == expected
+    with_comments(monkeypatch, scenario)
+
+def test_rejecting_pending_comments_leaves_counts_alone(monkeypatch):
+    async def scenario(db):
+        await comments.moderate(db, [1], "approve")
+        await comments.moderate(db, [2, 3], "reject")
+        assert await counts(db) == {10: 1}
+    with_comments(monkeypatch, scenario)
+
+def test_moderation_invalidates_only_the_changed_threads(monkeypatch):
+    async def scenario(db):
+        cache = comments.response_cache
+        for article_id in (10, 20):
+            await cache.set(f"thread-{article_id}", CacheEntry(
+                body=b"[]", media_type="application/json", etag=make_etag(b"[]"), tags=[comments.thread_tag(article_id)]
+            ))
+        await comments.moderate(db, [3], "approve")
+        assert await cache.get("thread-20") is None
+        assert await cache.get("thread-10") is not None
+    with_comments(monkeypatch, scenario)
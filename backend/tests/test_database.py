@@ -0,0 +1,61 @@
+import asyncio
+from sqlalchemy import text
+from backend.database import clean_database_url, ReplicaRouter
+from backend.utils.db_metrics import db_metrics
+from backend.utils.metrics import RequestStats, Registry, current_request
+
+def test_clean_database_url_rewrites_postgres_only():
+    assert clean_database_url("postgresql://u:p@db/news?sslmode=require") == "postgresql+asyncpg://u:p@db/news"
+    assert clean_database_url("sqlite+aiosqlite:////tmp/replica.db") == "sqlite+aiosqlite:////tmp/replica.db"
+    assert clean_database_url("sqlite+aiosqlite:///replica.db") == "sqlite+aiosqlite:///replica.db"
+
+def test_replica_router_serves_sqlite_replica(tmp_path):
+    url = clean_database_url(f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}")
+
+    async def run():
+        router = ReplicaRouter([url])
+        try:
+            replica = await router.choose()
+            assert replica is not None and replica.healthy
+            async with replica.session_maker() as session:
+                assert (await session.execute(text("SELECT 1"))).scalar() == 1
+        finally:
+            await router.dispose()
+
+    asyncio.run(run())
+
+def test_replica_queries_are_instrumented_per_engine(tmp_path):
+    url = clean_database_url(f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}")
+
+    async def run():
+        router = ReplicaRouter([url])
+        stats = RequestStats()
+        token = current_request.set(stats)
+        try:
+            replica = await router.choose()
+            assert "replica0" in db_metrics.stats()["engines"]
+            before = stats.queries
+            async with replica.session_maker() as session:
+                await session.execute(text("SELECT 1"))
+            assert stats.queries == before + 1
+        finally:
+            current_request.reset(token)
+            await router.dispose()
+        assert "replica0" not in db_metrics.stats()["engines"]
+
+    asyncio.run(run())
+
+def test_collector_samples_render_with_labels():
+    registry = Registry()
+
+    @registry.collector
+    def samples():
+        yield "db_pool_size", "gauge", "Connection pool size", 10, {"engine": "primary"}
+        yield "db_pool_size", "gauge", "Connection pool size", 5, {"engine": "replica0"}
+        yield "jobs_queued", "gauge", "Queued jobs", 3
+
+    lines = registry.render().splitlines()
+    assert lines.count("# TYPE db_pool_size gauge") == 1
+    assert 'db_pool_size{engine="primary"} 10' in lines
+    assert 'db_pool_size{engine="replica0"} 5' in lines
+    assert "jobs_queued 3" in lines
@@ -0,0 +1,54 @@
+from datetime import date, timedelta
+import pytest
+from backend.utils.ethiopian_calendar import (
+    days_in_month, ethiopian_month_range, ethiopian_to_gregorian, format_ethiopian_date,
+    to_ethiopian, to_ethiopian_many
+)
+
+# Gregorian date -> (year, month, day) in the Ethiopian calendar
+REFERENCE_DATES = {
+    date(1896, 3, 1): (1888, 6, 23),    # battle of Adwa, 23 Yekatit 1888
+    date(1900, 1, 1): (1892, 4, 23),
+    date(1974, 9, 12): (1967, 1, 2),
+    date(2000, 1, 1): (1992, 4, 22),
+    date(2007, 9, 12): (2000, 1, 1),    # Ethiopian millennium
+    date(2022, 9, 11): (2015, 1, 1),
+    date(2023, 9, 6): (2015, 13, 1),
+    date(2023, 9, 11): (2015, 13, 6),   # leap Pagume
+    date(2023, 9, 12): (2016, 1, 1),
+    date(2024, 1, 7): (2016, 4, 28),    # Genna after a leap year
+    date(2025, 1, 7): (2017, 4, 29),    # Genna
+    date(2024, 9, 11): (2017, 1, 1),
+    date(2100, 12, 31): (2093, 4, 21),
+}
+
+@pytest.mark.parametrize("gregorian, expected", REFERENCE_DATES.items())
+def test_reference_dates(gregorian, expected):
+    assert tuple(to_ethiopian(gregorian)) == expected
+    assert ethiopian_to_gregorian(*expected) == gregorian
+
+def test_consecutive_days_round_trip():
+    day = date(1850, 1, 1)
+    previous = to_ethiopian(day - timedelta(days=1))
+    while day <= date(2150, 12, 31):
+        current = to_ethiopian(day)
+        if previous.day < days_in_month(previous.year, previous.month):
+            assert current == (previous.year, previous.month, previous.day + 1)
+        elif previous.month < 13:
+            assert current == (previous.year, previous.month + 1, 1)
+        else:
+            assert current == (previous.year + 1, 1, 1)
+        assert ethiopian_to_gregorian(*current) == day
+        previous = current
+        day += timedelta(days=1)
+
+def test_batch_matches_single_conversion():
+    samples = [date(1800, 1, 1) + timedelta(days=offset) for offset in range(0, 150_000, 17)]
+    assert to_ethiopian_many(samples) == [to_ethiopian(day) for day in samples]
+
+def test_month_range_and_format():
+    start, end = ethiopian_month_range(2015, 13)
+    assert (start.date(), end.date()) == (date(2023, 9, 6), date(2023, 9, 12))
+    assert format_ethiopian_date(date(2007, 9, 12), "en") == "Meskerem 1, 2000"
+    with pytest.raises(ValueError):
+        ethiopian_to_gregorian(2016, 13, 6)
@@ -0,0 +1,18 @@
+from fastapi.testclient import TestClient
+from backend.main import app
+from backend.utils.feeds import FEED_FORMATS, FEED_LANGUAGES, FeedScope, feed_store, render_feed
+
+def test_feed_language_fallback(monkeypatch):
+    scope = FeedScope(kind="all", slug=None, scope_id=None, names={}, built_at=1_700_000_000)
+    scope.variants = {
+        (language, fmt): render_feed(scope, [], language, fmt)
+        for language in FEED_LANGUAGES
+        for fmt in FEED_FORMATS
+    }
+    monkeypatch.setitem(feed_store.scopes, ("all", None), scope)
+    client = TestClient(app)
+
+    response = client.get("/api/rss/feed.xml?lang=")
+    assert response.status_code == 200
+    assert response.headers["etag"] == scope.variants[("en", "rss")].etag
+    assert client.get("/api/rss/atom.xml?lang=xx").status_code == 400
@@ -0,0 +1,30 @@
+import asyncio
+import os
+import pytest
+from PIL import Image
+from backend.utils import images
+from backend.utils.jobs import PermanentJobError
+
+def write_upload(directory, size=(40, 30)):
+    Image.new("RGB", size, "red").save(directory / "abc123.png")
+    return {"filename": "abc123.png", "digest": "abc123"}
+
+def test_render_resolves_uploads_against_upload_dir(tmp_path, monkeypatch):
+    uploads = tmp_path / "uploads"
+    uploads.mkdir()
+    monkeypatch.setattr(images, "UPLOAD_DIR", str(uploads))
+    elsewhere = tmp_path / "elsewhere"
+    elsewhere.mkdir()
+    monkeypatch.chdir(elsewhere)
+
+    asyncio.run(images.image_pipeline.render(None, write_upload(uploads)))
+    for variant in images.IMAGE_VARIANTS:
+        for fmt in images.IMAGE_FORMATS:
+            assert os.path.exists(uploads / images.variant_name("abc123", variant, fmt))
+
+def test_decompression_bomb_is_not_retried(tmp_path, monkeypatch):
+    monkeypatch.setattr(images, "UPLOAD_DIR", str(tmp_path))
+    payload = write_upload(tmp_path)
+    monkeypatch.setattr(Image, "MAX_IMAGE_PIXELS", 100)
+    with pytest.raises(PermanentJobError):
+        asyncio.run(images.image_pipeline.render(None, payload))
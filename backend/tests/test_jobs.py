@@ -0,0 +1,90 @@
+import asyncio
+from datetime import datetime, timedelta
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from backend.models import Job
+from backend.utils import jobs
+
+def with_queue(monkeypatch, scenario):
+    async def run():
+        engine = create_async_engine("sqlite+aiosqlite://")
+        async with engine.begin() as conn:
+            await conn.run_sync(Job.__table__.create)
+        session_maker = async_sessionmaker(engine, expire_on_commit=False)
+        monkeypatch.setattr(jobs, "async_session_maker", session_maker)
+        queue = jobs.JobQueue(workers=1)
+        async with session_maker() as session:
+            queue.enqueue(session, "test", {"n": 1}, max_attempts=3)
+            await session.commit()
+        try:
+            return await scenario(queue, session_maker)
+        finally:
+            await engine.dispose()
+    return asyncio.run(run())
+
+async def load(session_maker, job_id):
+    async with session_maker() as session:
+        return await session.get(Job, job_id)
+
+def test_stale_worker_cannot_finish_a_reclaimed_job(monkeypatch):
+    async def scenario(queue, session_maker):
+        stale = await queue.claim()
+        assert await queue.claim() is None
+        async with session_maker() as session:
+            await session.execute(
+                update(Job).where(Job.id == stale.id).values(locked_until=datetime.utcnow() - timedelta(seconds=1))
+            )
+            await session.commit()
+
+        owner = await queue.claim()
+        assert owner.id == stale.id and owner.attempts == 2
+        await queue.finish(stale, None)
+        job = await load(session_maker, stale.id)
+        assert job.status == "running" and job.locked_until == owner.locked_until
+        assert queue.processed == 0
+
+        await queue.finish(owner, "RuntimeError: boom")
+        job = await load(session_maker, owner.id)
+        assert (job.status, job.last_error, job.locked_until) == ("queued", "RuntimeError: boom", None)
+        assert queue.retried == 1
+    with_queue(monkeypatch, scenario)
+
+def test_expired_lease_on_final_attempt_dead_letters(monkeypatch):
+    async def scenario(queue, session_maker):
+        job = await queue.claim()
+        async with session_maker() as session:
+            await session.execute(
+                update(Job).where(Job.id == job.id).values(attempts=3, locked_until=datetime.utcnow() - timedelta(seconds=1))
+            )
+            await session.commit()
+        assert await queue.claim() is None
+        assert (await load(session_maker, job.id)).status == "dead"
+        assert queue.dead_lettered == 1
+    with_queue(monkeypatch, scenario)
+
+def test_permanent_error_dead_letters_on_first_attempt(monkeypatch):
+    async def scenario(queue, session_maker):
+        @queue.handler("test")
+        async def handle(db, payload):
+            raise jobs.PermanentJobError("unreadable")
+
+        job = await queue.claim()
+        await queue.run(job)
+        stored = await load(session_maker, job.id)
+        assert (stored.status, stored.attempts) == ("dead", 1)
+        assert stored.last_error == "PermanentJobError: unreadable"
+        assert queue.dead_lettered == 1 and queue.retried == 0
+    with_queue(monkeypatch, scenario)
+
+def test_successful_run_marks_job_done(monkeypatch):
+    async def scenario(queue, session_maker):
+        seen = []
+
+        @queue.handler("test")
+        async def handle(db, payload):
+            seen.append(payload)
+
+        await queue.run(await queue.claim())
+        assert seen == [{"n": 1}]
+        assert queue.processed == 1 and await queue.claim() is None
+    with_queue(monkeypatch, scenario)
@@ -0,0 +1,57 @@
+import asyncio
+from datetime import datetime, timedelta
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import Column, DateTime, Integer, MetaData, Table, insert, select
+from sqlalchemy.ext.asyncio import create_async_engine
+from backend.main import app
+from backend.utils.pagination import decode_cursor, encode_cursor, keyset_after, keyset_order
+
+metadata = MetaData()
+rows = Table("rows", metadata, Column("id", Integer, primary_key=True), Column("created_at", DateTime))
+
+def paginate(values, limit):
+    async def run():
+        engine = create_async_engine("sqlite+aiosqlite://")
+        async with engine.begin() as conn:
+            await conn.run_sync(metadata.create_all)
+            await conn.execute(insert(rows), [{"id": row_id, "created_at": value} for row_id, value in values])
+            expected = (await conn.execute(select(rows.c.id).order_by(*keyset_order(rows.c.created_at, rows.c.id)))).scalars().all()
+            seen, cursor = [], None
+            while True:
+                query = select(rows).order_by(*keyset_order(rows.c.created_at, rows.c.id)).limit(limit)
+                if cursor:
+                    created_at, row_id = decode_cursor(cursor, datetime.fromisoformat)
+                    query = query.where(keyset_after(rows.c.created_at, rows.c.id, created_at, row_id))
+                page = (await conn.execute(query)).all()
+                seen += [row.id for row in page]
+                if len(page) < limit:
+                    break
+                cursor = encode_cursor(page[-1].created_at, page[-1].id)
+        await engine.dispose()
+        return expected, seen
+    return asyncio.run(run())
+
+def test_keyset_pages_visit_every_row_once_with_nulls_and_ties():
+    start = datetime(2024, 1, 1)
+    values = [(row_id, None if row_id % 5 == 0 else start + timedelta(hours=row_id % 7)) for row_id in range(1, 48)]
+    for limit in (1, 4, 10, 47, 100):
+        expected, seen = paginate(values, limit)
+        assert seen == expected
+        assert sorted(seen) == list(range(1, 48))
+    # NULL sort values come first, newest id first among them
+    assert expected[:9] == [45, 40, 35, 30, 25, 20, 15, 10, 5]
+
+def test_cursor_round_trip_and_rejects_garbage():
+    stamp = datetime(2024, 5, 1, 12, 30)
+    assert decode_cursor(encode_cursor(stamp, 7), datetime.fromisoformat) == (stamp, 7)
+    assert decode_cursor(encode_cursor(None, 3)) == (None, 3)
+    with pytest.raises(HTTPException) as error:
+        decode_cursor("not-a-cursor")
+    assert error.value.status_code == 400
+
+def test_listing_limit_is_bounded():
+    client = TestClient(app)
+    assert client.get("/api/articles?limit=1000000").status_code == 422
+    assert client.get("/api/articles?limit=0").status_code == 422
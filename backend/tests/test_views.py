@@ -0,0 +1,106 @@
+import asyncio
+from datetime import datetime
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from backend.models import ArticleViewBucket
+from backend.utils import view_counter
+from backend.utils.trending import TrendingEngine
+
+# the real articles table uses postgres arrays; the view and trending queries only touch these columns
+metadata = MetaData()
+articles = Table(
+    "articles", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("status", String),
+    Column("view_count", Integer),
+    Column("region_id", Integer),
+    Column("category_id", Integer),
+    Column("updated_at", DateTime),
+)
+EDITED = datetime(2024, 1, 1)
+
+def with_articles(monkeypatch, scenario):
+    async def run():
+        engine = create_async_engine("sqlite+aiosqlite://")
+        async with engine.begin() as conn:
+            await conn.run_sync(metadata.create_all)
+            await conn.run_sync(ArticleViewBucket.__table__.create)
+            await conn.execute(insert(articles), [
+                {"id": 1, "status": "published", "view_count": 0, "region_id": 7, "category_id": None, "updated_at": EDITED},
+                {"id": 2, "status": "published", "view_count": None, "region_id": None, "category_id": 3, "updated_at": EDITED},
+                {"id": 3, "status": "draft", "view_count": 0, "region_id": None, "category_id": None, "updated_at": EDITED},
+            ])
+        session_maker = async_sessionmaker(engine, expire_on_commit=False)
+        monkeypatch.setattr(view_counter, "async_session_maker", session_maker)
+        monkeypatch.setattr(view_counter, "trending", TrendingEngine())
+        try:
+            return await scenario(session_maker)
+        finally:
+            await engine.dispose()
+    return asyncio.run(run())
+
+async def view_counts(session_maker):
+    async with session_maker() as session:
+        return dict((await session.execute(select(articles.c.id, articles.c.view_count))).all())
+
+def test_flush_writes_counts_and_buckets_in_one_batch(monkeypatch):
+    async def scenario(session_maker):
+        counter = view_counter.ViewCounter(max_pending=100)
+        for article_id in (1, 1, 1, 2, 99):
+            counter.record(article_id)
+        assert counter.pending_for(1) == 3
+
+        assert await counter.flush() == 5
+        assert await counter.flush() == 0
+        assert await view_counts(session_maker) == {1: 3, 2: 1, 3: 0}
+        async with session_maker() as session:
+            assert set((await session.execute(select(articles.c.updated_at))).scalars()) == {EDITED}
+            buckets = (await session.execute(
+                select(ArticleViewBucket.article_id, ArticleViewBucket.views).order_by(ArticleViewBucket.article_id)
+            )).all()
+        # views of the missing article 99 are not bucketed
+        assert buckets == [(1, 3), (2, 1)]
+
+        counter.record(1, 2)
+        await counter.flush()
+        async with session_maker() as session:
+            assert await session.scalar(select(ArticleViewBucket.views).where(ArticleViewBucket.article_id == 1)) == 5
+        assert counter.stats() == {"pending": 0, "pending_articles": 0, "flushed": 7, "flushes": 2}
+    with_articles(monkeypatch, scenario)
+
+def test_failed_flush_keeps_views_pending(monkeypatch):
+    async def scenario(session_maker):
+        def unavailable():
+            raise ConnectionError("database down")
+        counter = view_counter.ViewCounter()
+        counter.record(1, 4)
+        monkeypatch.setattr(view_counter, "async_session_maker", unavailable)
+        assert await counter.flush() == 0
+        assert counter.pending_for(1) == 4 and counter.pending_count == 4
+
+        monkeypatch.setattr(view_counter, "async_session_maker", session_maker)
+        assert await counter.flush() == 4
+        assert (await view_counts(session_maker))[1] == 4
+    with_articles(monkeypatch, scenario)
+
+def test_trending_ranks_published_articles_per_scope(monkeypatch):
+    async def scenario(session_maker):
+        counter = view_counter.ViewCounter()
+        counter.record(1, 5)
+        counter.record(2, 2)
+        counter.record(3, 50)
+        await counter.flush()
+
+        engine = view_counter.trending
+        async with session_maker() as session:
+            await engine.refresh(session)
+        assert engine.ranking() == [1, 2]
+        assert engine.ranking(region_id=7) == [1]
+        assert engine.ranking(category_id=3) == [2]
+
+        # flushed views move the lists without waiting for the next refresh
+        counter.record(2, 10)
+        await counter.flush()
+        assert engine.ranking() == [2, 1]
+        assert engine.score(2) > engine.score(1)
+    with_articles(monkeypatch, scenario)
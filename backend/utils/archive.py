@@ -0,0 +1,89 @@
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from fastapi import HTTPException
+from sqlalchemy import select, delete, insert, func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.models import Article, ArchiveMonthCount
+from backend.utils.ethiopian_calendar import to_ethiopian, to_ethiopian_many, ethiopian_month_range, month_name
+
+EthiopianMonth = Tuple[int, int]
+
+def archive_month(article) -> Optional[EthiopianMonth]:
+    """The Ethiopian (year, month) an article is listed under, or None while it isn't published"""
+    if article.status != "published" or not article.published_at:
+        return None
+    eth_date = to_ethiopian(article.published_at)
+    return eth_date.year, eth_date.month
+
+def archive_bounds(eth_year: int, eth_month: int) -> Tuple[datetime, datetime]:
+    try:
+        return ethiopian_month_range(eth_year, eth_month)
+    except (ValueError, OverflowError) as exc:
+        # the last Ethiopian years run past datetime's year 9999
+        raise HTTPException(status_code=400, detail=str(exc))
+
+def archive_deltas(changes: Iterable[Tuple[Optional[EthiopianMonth], Optional[EthiopianMonth]]]) -> Counter:
+    deltas = Counter()
+    for before, after in changes:
+        if before == after:
+            continue
+        if before:
+            deltas[before] -= 1
+        if after:
+            deltas[after] += 1
+    return deltas
+
+async def apply_archive_deltas(db: AsyncSession, deltas: Dict[EthiopianMonth, int]):
+    """Adjust month counts inside the caller's transaction; the upsert keeps concurrent writers consistent"""
+    rows = [
+        {"eth_year": year, "eth_month": month, "article_count": delta}
+        for (year, month), delta in deltas.items() if delta
+    ]
+    if not rows:
+        return
+    dialect = postgresql if db.bind.dialect.name == "postgresql" else sqlite
+    statement = dialect.insert(ArchiveMonthCount).values(rows)
+    await db.execute(statement.on_conflict_do_update(
+        index_elements=[ArchiveMonthCount.eth_year, ArchiveMonthCount.eth_month],
+        set_={"article_count": ArchiveMonthCount.article_count + statement.excluded.article_count}
+    ))
+
+async def record_archive_change(db: AsyncSession, before: Optional[EthiopianMonth], after: Optional[EthiopianMonth]):
+    await apply_archive_deltas(db, archive_deltas([(before, after)]))
+
+async def rebuild_archive(db: AsyncSession, only_if_empty: bool = True) -> int:
+    """Recount months from published articles, grouped by day so the table is scanned once"""
+    if only_if_empty and await db.scalar(select(ArchiveMonthCount.eth_year).limit(1)) is not None:
+        return 0
+    day = func.date(Article.published_at)
+    result = await db.execute(
+        select(day, func.count(Article.id))
+        .where(Article.status == "published", Article.published_at.isnot(None))
+        .group_by(day)
+    )
+    rows = result.all()
+    days = [value if not isinstance(value, str) else datetime.fromisoformat(value) for value, _ in rows]
+    counts = Counter()
+    for eth_date, (_, count) in zip(to_ethiopian_many(days), rows):
+        counts[(eth_date.year, eth_date.month)] += count
+    await db.execute(delete(ArchiveMonthCount))
+    if counts:
+        await db.execute(insert(ArchiveMonthCount), [
+            {"eth_year": year, "eth_month": month, "article_count": count}
+            for (year, month), count in counts.items()
+        ])
+    await db.commit()
+    return len(counts)
+
+async def archive_histogram(db: AsyncSession, language: str = "en") -> List[dict]:
+    result = await db.execute(
+        select(ArchiveMonthCount)
+        .where(ArchiveMonthCount.article_count > 0)
+        .order_by(ArchiveMonthCount.eth_year.desc(), ArchiveMonthCount.eth_month.desc())
+    )
+    return [
+        {"year": row.eth_year, "month": row.eth_month, "name": month_name(row.eth_month, language), "count": row.article_count}
+        for row in result.scalars().all()
+    ]
@@ -1,18 +1,34 @@
 import os
-from datetime import datetime, timedelta
-from typing import Optional
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
 from jose import JWTError, jwt
 import bcrypt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, event, inspect
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
 from backend.database import get_db
-from backend.models import User
+from backend.models import User, AuthRevocation
+from backend.utils.broker import broker
 
 SECRET_KEY = os.getenv("SESSION_SECRET", "your-secret-key-change-in-production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7
+AUTH_CACHE_TTL = float(os.getenv("AUTH_CACHE_TTL", "30"))
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "10000"))
+AUTH_CLAIMS_MAX_AGE = int(os.getenv("AUTH_CLAIMS_MAX_AGE", "900"))
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_POOL_SIZE = int(os.getenv("PASSWORD_POOL_SIZE", str(min(4, os.cpu_count() or 1))))
+PASSWORD_QUEUE_LIMIT = int(os.getenv("PASSWORD_QUEUE_LIMIT", "32"))
+
+AUTH_CHANNEL = "auth"
 
 security = HTTPBearer()
 
@@ -23,57 +39,276 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 def get_password_hash(password: str) -> str:
     password_bytes = password.encode('utf-8')
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
     hashed = bcrypt.hashpw(password_bytes, salt)
     return hashed.decode('utf-8')
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    try:
+        return int(hashed_password.split("$")[2]) != BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
+
+class PasswordPool:
+    """Runs bcrypt off the event loop on a bounded thread pool, shedding load when it backs up"""
+
+    def __init__(self, workers: int = PASSWORD_POOL_SIZE, queue_limit: int = PASSWORD_QUEUE_LIMIT):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+
+    async def run(self, func, *args):
+        if self.in_flight >= self.workers + self.queue_limit:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Authentication is busy, please retry",
+                headers={"Retry-After": "1"},
+            )
+        self.in_flight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "in_flight": self.in_flight,
+            "queue_depth": max(self.in_flight - self.workers, 0),
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+password_pool = PasswordPool()
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_pool.run(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    return await password_pool.run(get_password_hash, password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
+    if "sub" in to_encode:
+        to_encode["sub"] = str(to_encode["sub"])
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "iat": int(time.time())})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+def user_token_claims(user: User) -> dict:
+    return {"sub": user.id, "role": user.role, "active": user.is_active}
+
+@dataclass(frozen=True)
+class Principal:
+    """Detached snapshot of the authenticated user, safe to share between requests"""
+    id: int
+    email: str
+    username: str
+    full_name: Optional[str]
+    role: str
+    is_active: bool
+    created_at: Optional[datetime]
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(
+            id=user.id,
+            email=user.email,
+            username=user.username,
+            full_name=user.full_name,
+            role=user.role,
+            is_active=user.is_active,
+            created_at=user.created_at,
+        )
+
+class PrincipalCache:
+    """Bounded LRU of principals by user id with a short TTL"""
+
+    def __init__(self, max_size: int = AUTH_CACHE_SIZE, ttl: float = AUTH_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries: "OrderedDict[int, tuple]" = OrderedDict()
+        # ordered by last change, so expired markers are trimmed from the front
+        self.changed_at: "OrderedDict[int, float]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: int) -> Optional[Principal]:
+        entry = self.entries.get(user_id)
+        if entry is None or entry[1] < time.monotonic():
+            self.entries.pop(user_id, None)
+            self.misses += 1
+            return None
+        self.entries.move_to_end(user_id)
+        self.hits += 1
+        return entry[0]
+
+    def set(self, principal: Principal):
+        self.entries[principal.id] = (principal, time.monotonic() + self.ttl)
+        self.entries.move_to_end(principal.id)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def invalidate(self, user_id: int, changed_at: Optional[float] = None):
+        self.entries.pop(user_id, None)
+        # Claims issued before this moment no longer reflect the user's role or active flag
+        changed_at = changed_at or time.time()
+        self.changed_at[user_id] = max(changed_at, self.changed_at.get(user_id, 0))
+        self.changed_at.move_to_end(user_id)
+        self.prune()
+
+    def prune(self):
+        """Drop markers older than AUTH_CLAIMS_MAX_AGE, claims issued before them are refused anyway"""
+        cutoff = time.time() - AUTH_CLAIMS_MAX_AGE
+        while self.changed_at:
+            user_id, changed_at = next(iter(self.changed_at.items()))
+            if changed_at >= cutoff:
+                break
+            del self.changed_at[user_id]
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "revocations": len(self.changed_at),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+principal_cache = PrincipalCache()
+
+@event.listens_for(User, "after_update")
+def _invalidate_changed_user(mapper, connection, target):
+    state = inspect(target)
+    if not (state.attrs.role.history.has_changes() or state.attrs.is_active.history.has_changes()):
+        return
+    changed_at = time.time()
+    principal_cache.invalidate(target.id, changed_at)
+    # stored with the change itself, so workers started later still reject the old claims
+    values = {"changed_at": datetime.utcfromtimestamp(changed_at)}
+    dialect = postgresql if connection.dialect.name == "postgresql" else sqlite
+    connection.execute(
+        dialect.insert(AuthRevocation)
+        .values(user_id=target.id, **values)
+        .on_conflict_do_update(index_elements=[AuthRevocation.user_id], set_=values)
+    )
+    if state.session is not None:
+        state.session.info.setdefault("revoked_users", {})[target.id] = changed_at
+
+@event.listens_for(Session, "after_commit")
+def _broadcast_revocations(session):
+    revoked = session.info.pop("revoked_users", None)
+    if revoked:
+        asyncio.get_running_loop().create_task(
+            broker.publish(AUTH_CHANNEL, {"users": [[user_id, changed_at] for user_id, changed_at in revoked.items()]})
+        )
+
+@event.listens_for(Session, "after_rollback")
+def _discard_revocations(session):
+    session.info.pop("revoked_users", None)
+
+async def apply_revocations(seq: int, message: dict):
+    for user_id, changed_at in message["users"]:
+        principal_cache.invalidate(user_id, changed_at)
+
+broker.subscribe(AUTH_CHANNEL, apply_revocations)
+
+async def load_revocations(db: AsyncSession):
+    """Seed the revocation markers that can still matter, i.e. those newer than the oldest trusted claims"""
+    cutoff = datetime.utcnow() - timedelta(seconds=AUTH_CLAIMS_MAX_AGE)
+    result = await db.execute(
+        select(AuthRevocation.user_id, AuthRevocation.changed_at).where(AuthRevocation.changed_at >= cutoff)
+    )
+    for user_id, changed_at in result.all():
+        principal_cache.invalidate(user_id, changed_at.replace(tzinfo=timezone.utc).timestamp())
+
+def decode_token(token: str) -> Optional[dict]:
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload["sub"] = int(payload["sub"])
+        return payload
+    except (JWTError, KeyError, TypeError, ValueError):
+        return None
+
+async def load_principal(user_id: int, db: AsyncSession) -> Optional[Principal]:
+    principal = principal_cache.get(user_id)
+    if principal is not None:
+        return principal
+    result = await db.execute(select(User).where(User.id == user_id))
+    user = result.scalar_one_or_none()
+    if user is None:
+        return None
+    principal = Principal.from_user(user)
+    principal_cache.set(principal)
+    return principal
+
+def claims_principal(payload: dict) -> Optional[Principal]:
+    """Build a principal from signed claims when they are recent enough to trust"""
+    issued_at = payload.get("iat")
+    if "role" not in payload or "active" not in payload or issued_at is None:
+        return None
+    if time.time() - issued_at > AUTH_CLAIMS_MAX_AGE:
+        return None
+    if issued_at < principal_cache.changed_at.get(payload["sub"], 0):
+        return None
+    return Principal(
+        id=payload["sub"],
+        email="",
+        username="",
+        full_name=None,
+        role=payload["role"],
+        is_active=bool(payload["active"]),
+        created_at=None,
+    )
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: AsyncSession = Depends(get_db)
-) -> User:
+) -> Principal:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        token = credentials.credentials
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: int = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-    except JWTError:
+    payload = decode_token(credentials.credentials)
+    if payload is None:
         raise credentials_exception
     
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
-    if user is None:
+    user = await load_principal(payload["sub"], db)
+    if user is None or not user.is_active:
         raise credentials_exception
     return user
 
+async def get_token_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_db)
+) -> Principal:
+    """Like get_current_user, but answers id/role checks from fresh token claims without the DB"""
+    payload = decode_token(credentials.credentials)
+    if payload is not None:
+        principal = claims_principal(payload)
+        if principal is not None and principal.is_active:
+            return principal
+    return await get_current_user(credentials, db)
+
 async def get_optional_user(
     db: AsyncSession = Depends(get_db),
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False))
-) -> Optional[User]:
+) -> Optional[Principal]:
     if not credentials:
         return None
-    try:
-        token = credentials.credentials
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: int = payload.get("sub")
-        if user_id is None:
-            return None
-        result = await db.execute(select(User).where(User.id == user_id))
-        return result.scalar_one_or_none()
-    except JWTError:
+    payload = decode_token(credentials.credentials)
+    if payload is None:
         return None
+    principal = await load_principal(payload["sub"], db)
+    return principal if principal is not None and principal.is_active else None
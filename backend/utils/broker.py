@@ -0,0 +1,233 @@
+import os
+import json
+import heapq
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from collections import defaultdict, deque
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple
+from sqlalchemy import select, delete, text
+from backend.database import DATABASE_URL, async_session_maker
+from backend.models import BroadcastEvent
+
+BROKER_BACKEND = os.getenv("BROKER_BACKEND", "postgres" if DATABASE_URL.startswith("postgresql") else "memory")
+BROKER_REPLAY_LIMIT = int(os.getenv("BROKER_REPLAY_LIMIT", "100"))
+BROKER_RETENTION_HOURS = int(os.getenv("BROKER_RETENTION_HOURS", "24"))
+BROKER_RECONNECT_DELAY = float(os.getenv("BROKER_RECONNECT_DELAY", "2"))
+BROKER_SEEN_WINDOW = int(os.getenv("BROKER_SEEN_WINDOW", "5000"))
+
+# pg_notify payloads are capped at 8000 bytes
+NOTIFY_PAYLOAD_LIMIT = 7500
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[int, dict], Awaitable[None]]
+
+class Broker(ABC):
+    """Delivers published messages to the subscribers of every worker, tagged with a sequence number"""
+
+    def __init__(self):
+        self.handlers: Dict[str, List[Handler]] = defaultdict(list)
+        self.published = 0
+        self.delivered = 0
+
+    def subscribe(self, channel: str, handler: Handler):
+        self.handlers[channel].append(handler)
+
+    @abstractmethod
+    async def publish(self, channel: str, message: dict) -> int:
+        ...
+
+    @abstractmethod
+    async def replay(self, channel: str, after_seq: int, limit: int = BROKER_REPLAY_LIMIT) -> List[Tuple[int, dict]]:
+        ...
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    async def _dispatch(self, channel: str, seq: int, message: dict):
+        self.delivered += 1
+        for handler in self.handlers.get(channel, []):
+            try:
+                await handler(seq, message)
+            except Exception:
+                logger.exception("Broker handler failed for %s #%d", channel, seq)
+
+    def stats(self) -> dict:
+        return {
+            "backend": BROKER_BACKEND,
+            "published": self.published,
+            "delivered": self.delivered,
+        }
+
+class MemoryBroker(Broker):
+    """Single-process broker for tests and local development"""
+
+    def __init__(self, history: int = 1000):
+        super().__init__()
+        self.seq = 0
+        self.history: Dict[str, Deque[Tuple[int, dict]]] = defaultdict(lambda: deque(maxlen=history))
+
+    async def publish(self, channel: str, message: dict) -> int:
+        self.seq += 1
+        self.published += 1
+        self.history[channel].append((self.seq, message))
+        await self._dispatch(channel, self.seq, message)
+        return self.seq
+
+    async def replay(self, channel: str, after_seq: int, limit: int = BROKER_REPLAY_LIMIT) -> List[Tuple[int, dict]]:
+        return [event for event in self.history[channel] if event[0] > after_seq][:limit]
+
+class PostgresBroker(Broker):
+    """Broker built on a broadcast_events table plus LISTEN/NOTIFY"""
+
+    def __init__(self, dsn: str = DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://")):
+        super().__init__()
+        self.dsn = dsn
+        self.connection = None
+        # ids are assigned at insert but become visible at commit, so they can arrive out of order:
+        # everything at or below low_water counts as delivered, above it only the ids in seen do
+        self.low_water: Dict[str, int] = {}
+        self.seen: Dict[str, Set[int]] = defaultdict(set)
+        self._seen_order: Dict[str, List[int]] = defaultdict(list)
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._supervisor: Optional[asyncio.Task] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+
+    async def publish(self, channel: str, message: dict) -> int:
+        payload = json.dumps(message, default=str)
+        async with async_session_maker() as session:
+            event = BroadcastEvent(channel=channel, payload=payload)
+            session.add(event)
+            await session.flush()
+            notification = {"seq": event.id}
+            if len(payload.encode("utf-8")) < NOTIFY_PAYLOAD_LIMIT:
+                notification["message"] = message
+            await session.execute(
+                text("SELECT pg_notify(:channel, :payload)"),
+                {"channel": channel, "payload": json.dumps(notification, default=str)}
+            )
+            if event.id % 100 == 0:
+                await session.execute(
+                    delete(BroadcastEvent).where(
+                        BroadcastEvent.created_at < datetime.utcnow() - timedelta(hours=BROKER_RETENTION_HOURS)
+                    )
+                )
+            await session.commit()
+            self.published += 1
+            return event.id
+
+    async def replay(self, channel: str, after_seq: int, limit: int = BROKER_REPLAY_LIMIT) -> List[Tuple[int, dict]]:
+        async with async_session_maker() as session:
+            result = await session.execute(
+                select(BroadcastEvent)
+                .where(BroadcastEvent.channel == channel, BroadcastEvent.id > after_seq)
+                .order_by(BroadcastEvent.id)
+                .limit(limit)
+            )
+            return [(event.id, json.loads(event.payload)) for event in result.scalars()]
+
+    def _on_notify(self, connection, pid, channel, payload):
+        self._queue.put_nowait((channel, payload))
+
+    def _delivered(self, channel: str, seq: int) -> bool:
+        return seq <= self.low_water.get(channel, 0) or seq in self.seen[channel]
+
+    async def _deliver(self, channel: str, seq: int, message: dict):
+        if self._delivered(channel, seq):
+            return
+        seen, order = self.seen[channel], self._seen_order[channel]
+        seen.add(seq)
+        heapq.heappush(order, seq)
+        while len(order) > BROKER_SEEN_WINDOW:
+            # forget the oldest ids; a commit that lands further back than the window is not replayed
+            oldest = heapq.heappop(order)
+            seen.discard(oldest)
+            self.low_water[channel] = max(self.low_water.get(channel, 0), oldest)
+        await self._dispatch(channel, seq, message)
+
+    async def _dispatch_loop(self):
+        while True:
+            channel, payload = await self._queue.get()
+            try:
+                notification = json.loads(payload)
+                seq = notification["seq"]
+                if self._delivered(channel, seq):
+                    continue
+                if "message" in notification:
+                    await self._deliver(channel, seq, notification["message"])
+                else:
+                    # the notification is sent on commit, so the event is readable by now
+                    for event_seq, message in await self.replay(channel, seq - 1, limit=1):
+                        await self._deliver(channel, event_seq, message)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Failed to handle broker notification on %s", channel)
+
+    async def _catch_up(self):
+        # Deliver anything published while the listener was disconnected, including late commits
+        for channel in list(self.low_water):
+            after = self.low_water[channel]
+            while True:
+                events = await self.replay(channel, after)
+                for event_seq, message in events:
+                    await self._deliver(channel, event_seq, message)
+                if len(events) < BROKER_REPLAY_LIMIT:
+                    break
+                after = events[-1][0]
+
+    async def _supervise(self):
+        import asyncpg
+        while True:
+            try:
+                self.connection = await asyncpg.connect(self.dsn)
+                closed = asyncio.Event()
+                self.connection.add_termination_listener(lambda connection: closed.set())
+                for channel in self.handlers:
+                    await self.connection.add_listener(channel, self._on_notify)
+                await self._catch_up()
+                await closed.wait()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Broker listener connection failed")
+            await asyncio.sleep(BROKER_RECONNECT_DELAY)
+
+    async def start(self):
+        if self._supervisor is None:
+            async with async_session_maker() as session:
+                for channel in self.handlers:
+                    result = await session.execute(
+                        select(BroadcastEvent.id)
+                        .where(BroadcastEvent.channel == channel)
+                        .order_by(BroadcastEvent.id.desc())
+                        .limit(1)
+                    )
+                    self.low_water[channel] = result.scalar_one_or_none() or 0
+            self._dispatcher = asyncio.create_task(self._dispatch_loop())
+            self._supervisor = asyncio.create_task(self._supervise())
+
+    async def stop(self):
+        for task in (self._supervisor, self._dispatcher):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._supervisor = self._dispatcher = None
+        if self.connection is not None and not self.connection.is_closed():
+            await self.connection.close()
+        self.connection = None
+
+def create_broker() -> Broker:
+    if BROKER_BACKEND == "postgres":
+        return PostgresBroker()
+    return MemoryBroker()
+
+broker = create_broker()
@@ -0,0 +1,243 @@
+import os
+import csv
+import json
+import time
+import asyncio
+import logging
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Callable, Dict, Iterator, List, Optional, TextIO, Tuple
+from pydantic import ValidationError
+from sqlalchemy import select, update, delete, insert, func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.models import Article, ArticleLocalization, Category, Region
+from backend.schemas import ArticleImport
+from backend.utils.i18n import article_localizations
+from backend.utils.cache import response_cache
+from backend.utils.feeds import feed_store, feed_state
+from backend.utils.search import search_index
+from backend.utils.trending import trending
+from backend.utils.archive import archive_month, archive_deltas, apply_archive_deltas
+
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "1000"))
+IMPORT_ERROR_SAMPLES = int(os.getenv("IMPORT_ERROR_SAMPLES", "100"))
+IMPORT_FORMATS = ("ndjson", "csv")
+# asyncpg caps a statement at 32767 bind parameters
+MAX_BIND_PARAMETERS = 32767
+
+# An existing slug gets its content replaced; author, view count and creation time are kept
+UPSERT_COLUMNS = [
+    name for name in ArticleImport.model_fields if name not in ("slug", "category", "region", "published_at")
+]
+
+logger = logging.getLogger(__name__)
+
+Record = Tuple[int, Optional[dict], Optional[str]]
+
+def import_format(filename: Optional[str], content_type: Optional[str] = None) -> str:
+    name = (filename or "").lower()
+    if name.endswith(".csv") or content_type in ("text/csv", "application/csv"):
+        return "csv"
+    return "ndjson"
+
+def read_records(stream: TextIO, fmt: str) -> Iterator[Record]:
+    """Yields (line number, record or None, error) without reading the whole input"""
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            # empty cells mean "not provided", extra unnamed cells are dropped
+            yield reader.line_num, {key: value for key, value in record.items() if key and value not in ("", None)}, None
+        return
+    for number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            yield number, None, f"Invalid JSON: {exc}"
+            continue
+        if not isinstance(record, dict):
+            yield number, None, "Expected a JSON object"
+            continue
+        yield number, record, None
+
+def _validation_message(exc: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in exc.errors())
+
+class ArticleImporter:
+    """Validates article records with ArticleImport and upserts them by slug in batches"""
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        author_id: int,
+        batch_size: int = IMPORT_BATCH_SIZE,
+        progress: Optional[Callable[[dict], None]] = None
+    ):
+        self.db = db
+        self.author_id = author_id
+        self.batch_size = min(batch_size, MAX_BIND_PARAMETERS // (len(ArticleImport.model_fields) + 4))
+        self.progress = progress
+        self.slugs: Dict[str, Dict[str, int]] = {}
+        self.processed = 0
+        self.imported = 0
+        self.duplicates = 0
+        self.failed = 0
+        self.errors: List[dict] = []
+        self.started = time.perf_counter()
+
+    async def load_lookups(self):
+        # a few dozen rows, looked up once instead of once per article
+        for kind, model in (("category", Category), ("region", Region)):
+            result = await self.db.execute(select(model.slug, model.id))
+            self.slugs[kind] = dict(result.all())
+
+    def fail(self, line: int, slug: Optional[str], message: str):
+        self.failed += 1
+        if len(self.errors) < IMPORT_ERROR_SAMPLES:
+            self.errors.append({"line": line, "slug": slug, "error": message})
+
+    def prepare(self, line: int, record: dict) -> Optional[dict]:
+        if isinstance(record.get("tags"), str):
+            record["tags"] = [tag.strip() for tag in record["tags"].split(",") if tag.strip()]
+        try:
+            article = ArticleImport.model_validate(record)
+        except ValidationError as exc:
+            self.fail(line, record.get("slug"), _validation_message(exc))
+            return None
+        row = article.model_dump(exclude={"category", "region"})
+        for kind in ("category", "region"):
+            slug = getattr(article, kind)
+            if slug is None:
+                continue
+            if slug not in self.slugs[kind]:
+                self.fail(line, article.slug, f"Unknown {kind} '{slug}'")
+                return None
+            row[f"{kind}_id"] = self.slugs[kind][slug]
+        return row
+
+    def next_batch(self, records: Iterator[Record]) -> Tuple[List[Tuple[int, dict]], bool]:
+        """Parse and validate up to batch_size records; runs off the event loop"""
+        batch = []
+        for line, record, error in records:
+            self.processed += 1
+            if error:
+                self.fail(line, None, error)
+            else:
+                row = self.prepare(line, record)
+                if row is not None:
+                    batch.append((line, row))
+            if len(batch) >= self.batch_size:
+                return batch, False
+        return batch, True
+
+    async def write(self, rows: List[dict]) -> List[SimpleNamespace]:
+        # ON CONFLICT can't touch the same row twice in one statement, so the last copy of a slug wins
+        rows = list({row["slug"]: row for row in rows}.values())
+        now = datetime.utcnow()
+        existing = await self.db.execute(
+            select(Article.slug, Article.status, Article.published_at).where(Article.slug.in_([row["slug"] for row in rows]))
+        )
+        previous_months = {row.slug: archive_month(row) for row in existing.all()}
+        dialect = postgresql if self.db.bind.dialect.name == "postgresql" else sqlite
+        statement = dialect.insert(Article).values([
+            {**row, "author_id": self.author_id, "view_count": 0, "created_at": now, "updated_at": now}
+            for row in rows
+        ])
+        statement = statement.on_conflict_do_update(
+            index_elements=[Article.slug],
+            set_={
+                **{name: statement.excluded[name] for name in UPSERT_COLUMNS},
+                "published_at": func.coalesce(statement.excluded.published_at, Article.published_at),
+                "updated_at": now,
+            }
+        ).returning(Article.id, Article.slug, Article.status, Article.published_at)
+        written = (await self.db.execute(statement)).all()
+        ids = {row.slug: row.id for row in written}
+        await self.db.execute(
+            update(Article)
+            .where(Article.id.in_(ids.values()), Article.status == "published", Article.published_at.is_(None))
+            .values(published_at=now)
+        )
+
+        # mirrors the published_at fix-up above without reading the rows back
+        await apply_archive_deltas(self.db, archive_deltas(
+            (previous_months.get(row.slug), archive_month(SimpleNamespace(
+                status=row.status, published_at=row.published_at or (now if row.status == "published" else None)
+            )))
+            for row in written
+        ))
+
+        articles = [SimpleNamespace(id=ids[row["slug"]], **row) for row in rows]
+        await self.db.execute(delete(ArticleLocalization).where(ArticleLocalization.article_id.in_(ids.values())))
+        await self.db.execute(
+            insert(ArticleLocalization),
+            [localization for article in articles for localization in article_localizations(article)]
+        )
+        await self.db.commit()
+        return articles
+
+    async def write_batch(self, batch: List[Tuple[int, dict]]) -> List[SimpleNamespace]:
+        try:
+            articles = await self.write([row for _, row in batch])
+            # earlier copies of a slug repeated within the batch are never written
+            self.imported += len(articles)
+            self.duplicates += len(batch) - len(articles)
+            return articles
+        except Exception:
+            await self.db.rollback()
+        # one bad row (say a dangling category_id) shouldn't sink the other rows in its batch
+        articles = {}
+        for line, row in batch:
+            try:
+                written = await self.write([row])
+            except Exception as exc:
+                await self.db.rollback()
+                self.fail(line, row["slug"], str(getattr(exc, "orig", exc)))
+                continue
+            if row["slug"] in articles:
+                self.duplicates += 1
+            else:
+                self.imported += 1
+            articles.update((article.slug, article) for article in written)
+        return list(articles.values())
+
+    def announce(self, articles: List[SimpleNamespace]):
+        for article in articles:
+            search_index.sync(article)
+            trending.sync(article)
+        feed_store.article_changed(*{feed_state(article) for article in articles})
+
+    async def run(self, stream: TextIO, fmt: str) -> dict:
+        if fmt not in IMPORT_FORMATS:
+            raise ValueError(f"format must be one of {', '.join(IMPORT_FORMATS)}")
+        await self.load_lookups()
+        records = read_records(stream, fmt)
+        done = False
+        while not done:
+            batch, done = await asyncio.to_thread(self.next_batch, records)
+            if batch:
+                self.announce(await self.write_batch(batch))
+            if self.progress:
+                self.progress(self.summary())
+        await response_cache.invalidate("article")
+        summary = self.summary()
+        logger.info(
+            "Imported %(imported)d of %(processed)d articles (%(duplicates)d duplicate slugs, %(failed)d failed) in %(elapsed_seconds)ss",
+            summary
+        )
+        return summary
+
+    def summary(self) -> dict:
+        elapsed = time.perf_counter() - self.started
+        return {
+            "processed": self.processed,
+            "imported": self.imported,
+            "duplicates": self.duplicates,
+            "failed": self.failed,
+            "elapsed_seconds": round(elapsed, 2),
+            "rows_per_second": round(self.processed / elapsed, 1) if elapsed else 0.0,
+            "errors": self.errors,
+        }
@@ -0,0 +1,280 @@
+import os
+import gzip
+import json
+import time
+import base64
+import hashlib
+from functools import lru_cache
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "memory")
+RESPONSE_CACHE_URL = os.getenv("RESPONSE_CACHE_URL", "redis://localhost:6379/0")
+RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", "60"))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1024"))
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "1024"))
+
+CACHE_CONTROL = "public, max-age=0, must-revalidate"
+
+@dataclass
+class CacheEntry:
+    body: bytes
+    media_type: str
+    etag: str
+    headers: Dict[str, str] = field(default_factory=dict)
+    tags: List[str] = field(default_factory=list)
+    encodings: Dict[str, bytes] = field(default_factory=dict)
+    expires_at: float = 0.0
+
+    def to_response(self, request: Request) -> Response:
+        headers = {**self.headers, "ETag": self.etag, "Cache-Control": CACHE_CONTROL}
+        body = self.body
+        encoding = None
+        if self.encodings:
+            headers["Vary"] = ", ".join(filter(None, [self.headers.get("Vary"), "Accept-Encoding"]))
+            encoding = choose_encoding(request.headers.get("accept-encoding"), self.encodings)
+        if encoding:
+            # each representation needs its own strong validator
+            headers["ETag"] = f'{self.etag[:-1]}-{encoding}"'
+            headers["Content-Encoding"] = encoding
+            body = self.encodings[encoding]
+        if_none_match = request.headers.get("if-none-match")
+        if etag_matches(if_none_match, headers["ETag"]) or etag_matches(if_none_match, self.etag):
+            response_cache.not_modified += 1
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type=self.media_type, headers=headers)
+
+    def dumps(self) -> bytes:
+        return json.dumps({
+            "body": base64.b64encode(self.body).decode("ascii"),
+            "media_type": self.media_type,
+            "etag": self.etag,
+            "headers": self.headers,
+            "tags": self.tags,
+            "encodings": {name: base64.b64encode(data).decode("ascii") for name, data in self.encodings.items()},
+        }).encode("utf-8")
+
+    @classmethod
+    def loads(cls, raw: bytes) -> "CacheEntry":
+        data = json.loads(raw)
+        data["body"] = base64.b64decode(data["body"])
+        data["encodings"] = {name: base64.b64decode(value) for name, value in data.get("encodings", {}).items()}
+        return cls(**data)
+
+def compress_body(body: bytes) -> Dict[str, bytes]:
+    """Pre-compressed variants of a body worth compressing, built once when it is cached"""
+    if len(body) < COMPRESS_MIN_SIZE:
+        return {}
+    encodings = {"gzip": gzip.compress(body, compresslevel=6)}
+    if brotli is not None:
+        encodings["br"] = brotli.compress(body, quality=5)
+    return encodings
+
+def choose_encoding(accept_encoding: Optional[str], available: Dict[str, bytes]) -> Optional[str]:
+    if not accept_encoding:
+        return None
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    for name in ("br", "gzip"):
+        if name in available and accepted.get(name, accepted.get("*", 0)) > 0:
+            return name
+    return None
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+def cache_key(namespace: str, request: Request, *variants: Optional[str]) -> str:
+    params = sorted(
+        (name, value) for name, value in request.query_params.multi_items() if value != ""
+    )
+    query = "&".join(f"{name}={value}" for name, value in params)
+    suffix = "".join(f"|{variant}" for variant in variants if variant)
+    return f"{namespace}?{query}{suffix}"
+
+class MemoryCache:
+    """In-process LRU cache with per-entry TTL and tag-based invalidation"""
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES, ttl: int = RESPONSE_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self.tag_index: Dict[str, Set[str]] = defaultdict(set)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.not_modified = 0
+
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        entry = self.entries.get(key)
+        if entry is None or entry.expires_at < time.monotonic():
+            if entry is not None:
+                self._discard(key)
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    async def set(self, key: str, entry: CacheEntry, ttl: Optional[int] = None):
+        if key in self.entries:
+            self._discard(key)
+        entry.expires_at = time.monotonic() + (ttl or self.ttl)
+        self.entries[key] = entry
+        for tag in entry.tags:
+            self.tag_index[tag].add(key)
+        while len(self.entries) > self.max_entries:
+            oldest = next(iter(self.entries))
+            self._discard(oldest)
+            self.evictions += 1
+
+    async def invalidate(self, *tags: str):
+        for tag in tags:
+            for key in list(self.tag_index.pop(tag, ())):
+                self._discard(key)
+                self.invalidations += 1
+
+    async def clear(self):
+        self.entries.clear()
+        self.tag_index.clear()
+
+    def _discard(self, key: str):
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry.tags:
+            keys = self.tag_index.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.tag_index[tag]
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": "memory",
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "not_modified": self.not_modified,
+        }
+
+class RedisCache:
+    """Shared cache backend so every worker sees the same entries and invalidations"""
+
+    def __init__(self, url: str = RESPONSE_CACHE_URL, ttl: int = RESPONSE_CACHE_TTL, prefix: str = "response-cache:"):
+        try:
+            from redis import asyncio as aioredis
+        except ImportError:
+            raise RuntimeError("RESPONSE_CACHE_BACKEND=redis requires the 'redis' package")
+        self.client = aioredis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.not_modified = 0
+
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        raw = await self.client.get(self.prefix + key)
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return CacheEntry.loads(raw)
+
+    async def set(self, key: str, entry: CacheEntry, ttl: Optional[int] = None):
+        ttl = ttl or self.ttl
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.set(self.prefix + key, entry.dumps(), ex=ttl)
+            for tag in entry.tags:
+                pipe.sadd(self._tag_key(tag), key)
+                pipe.expire(self._tag_key(tag), ttl * 2)
+            await pipe.execute()
+
+    async def invalidate(self, *tags: str):
+        for tag in tags:
+            keys = await self.client.smembers(self._tag_key(tag))
+            if keys:
+                await self.client.delete(*[self.prefix + key.decode("utf-8") for key in keys])
+                self.invalidations += len(keys)
+            await self.client.delete(self._tag_key(tag))
+
+    async def clear(self):
+        async for key in self.client.scan_iter(match=self.prefix + "*"):
+            await self.client.delete(key)
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.prefix}tag:{tag}"
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": "redis",
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": 0,
+            "invalidations": self.invalidations,
+            "not_modified": self.not_modified,
+        }
+
+def create_cache():
+    if RESPONSE_CACHE_BACKEND == "redis":
+        return RedisCache()
+    return MemoryCache()
+
+response_cache = create_cache()
+
+async def cache_store(
+    key: str,
+    body: bytes,
+    tags: Iterable[str],
+    media_type: str = "application/json",
+    headers: Optional[Dict[str, str]] = None,
+    ttl: Optional[int] = None
+) -> CacheEntry:
+    entry = CacheEntry(
+        body=body,
+        media_type=media_type,
+        etag=make_etag(body),
+        headers=dict(headers or {}),
+        tags=list(tags),
+        encodings=compress_body(body),
+    )
+    await response_cache.set(key, entry, ttl)
+    return entry
+
+@lru_cache(maxsize=None)
+def _adapter(model_type) -> TypeAdapter:
+    return TypeAdapter(model_type)
+
+def encode_json(model_type, data) -> bytes:
+    adapter = _adapter(model_type)
+    return adapter.dump_json(adapter.validate_python(data, from_attributes=True))
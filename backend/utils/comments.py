@@ -0,0 +1,84 @@
+from collections import Counter
+from typing import Dict, Iterable, List
+from sqlalchemy.engine import Row
+from sqlalchemy import select, update, delete, insert, func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.models import Article, Comment, ArticleCommentCount
+from backend.utils.cache import response_cache
+
+def thread_tag(article_id: int) -> str:
+    return f"comments:{article_id}"
+
+def approved_count_column():
+    """Approved comment count per article, read from the counter table instead of counting comments"""
+    return func.coalesce(
+        select(ArticleCommentCount.approved_count)
+        .where(ArticleCommentCount.article_id == Article.id)
+        .correlate(Article)
+        .scalar_subquery(),
+        0
+    ).label("approved_comment_count")
+
+async def approved_count(db: AsyncSession, article_id: int) -> int:
+    count = await db.scalar(
+        select(ArticleCommentCount.approved_count).where(ArticleCommentCount.article_id == article_id)
+    )
+    return count or 0
+
+async def apply_count_deltas(db: AsyncSession, deltas: Dict[int, int]):
+    """Adjust approved counts inside the caller's transaction"""
+    rows = [
+        {"article_id": article_id, "approved_count": delta}
+        for article_id, delta in deltas.items() if delta
+    ]
+    if not rows:
+        return
+    dialect = postgresql if db.bind.dialect.name == "postgresql" else sqlite
+    statement = dialect.insert(ArticleCommentCount).values(rows)
+    await db.execute(statement.on_conflict_do_update(
+        index_elements=[ArticleCommentCount.article_id],
+        set_={"approved_count": ArticleCommentCount.approved_count + statement.excluded.approved_count}
+    ))
+
+async def moderate(db: AsyncSession, ids: Iterable[int], action: str) -> List[Row]:
+    """Approve or reject (delete) comments in one statement; returns the comments that changed"""
+    ids = list(set(ids))
+    if action == "approve":
+        # already approved comments are left alone so they aren't counted twice
+        statement = (
+            update(Comment)
+            .where(Comment.id.in_(ids), Comment.is_approved == False)
+            .values(is_approved=True)
+            .returning(Comment.id, Comment.article_id, Comment.user_id, Comment.content, Comment.is_approved, Comment.created_at)
+        )
+        changed = (await db.execute(statement)).all()
+        deltas = Counter(row.article_id for row in changed)
+    else:
+        statement = delete(Comment).where(Comment.id.in_(ids)).returning(Comment.id, Comment.article_id, Comment.is_approved)
+        changed = (await db.execute(statement)).all()
+        deltas = Counter()
+        for row in changed:
+            if row.is_approved:
+                deltas[row.article_id] -= 1
+    await apply_count_deltas(db, deltas)
+    await db.commit()
+    await response_cache.invalidate(*{thread_tag(row.article_id) for row in changed})
+    return changed
+
+async def rebuild_comment_counts(db: AsyncSession, only_if_empty: bool = True) -> int:
+    if only_if_empty and await db.scalar(select(ArticleCommentCount.article_id).limit(1)) is not None:
+        return 0
+    result = await db.execute(
+        select(Comment.article_id, func.count(Comment.id))
+        .where(Comment.is_approved == True)
+        .group_by(Comment.article_id)
+    )
+    rows = result.all()
+    await db.execute(delete(ArticleCommentCount))
+    if rows:
+        await db.execute(insert(ArticleCommentCount), [
+            {"article_id": article_id, "approved_count": count} for article_id, count in rows
+        ])
+    await db.commit()
+    return len(rows)
@@ -0,0 +1,140 @@
+import os
+import time
+from collections import deque
+from typing import Deque, Dict
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from backend.utils.metrics import record_request_query
+
+DB_SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", "500"))
+DB_SLOW_QUERY_LOG_SIZE = int(os.getenv("DB_SLOW_QUERY_LOG_SIZE", "50"))
+
+class PoolWaits:
+    """Checkout waits of one engine's connection pool"""
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.waits: Deque[float] = deque(maxlen=1000)
+
+    def record(self, seconds: float, timed_out: bool = False):
+        if timed_out:
+            self.checkout_timeouts += 1
+        else:
+            self.checkouts += 1
+        self.wait_total += seconds
+        self.wait_max = max(self.wait_max, seconds)
+        self.waits.append(seconds)
+
+    def pool_stats(self) -> dict:
+        pool = self.pool
+        if not isinstance(pool, AsyncAdaptedQueuePool):
+            return {"class": type(pool).__name__}
+        return {
+            "class": type(pool).__name__,
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "idle": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "max_overflow": pool._max_overflow,
+        }
+
+    def stats(self) -> dict:
+        ordered = sorted(self.waits)
+        p99 = ordered[int(len(ordered) * 0.99)] if ordered else 0.0
+        return {
+            "pool": self.pool_stats(),
+            "checkouts": self.checkouts,
+            "checkout_timeouts": self.checkout_timeouts,
+            "wait_avg_ms": round(self.wait_total / max(self.checkouts + self.checkout_timeouts, 1) * 1000, 3),
+            "wait_p99_ms": round(p99 * 1000, 3),
+            "wait_max_ms": round(self.wait_max * 1000, 3),
+        }
+
+class DatabaseMetrics:
+    """Pool checkout waits per engine and query timings, so pool exhaustion shows up as a number instead of latency"""
+
+    def __init__(self, slow_query_ms: float = DB_SLOW_QUERY_MS, log_size: int = DB_SLOW_QUERY_LOG_SIZE):
+        self.slow_query_ms = slow_query_ms
+        self.engines: Dict[str, PoolWaits] = {}
+        self._pools: Dict[int, PoolWaits] = {}
+        self.queries = 0
+        self.query_time_total = 0.0
+        self.slow_queries: Deque[dict] = deque(maxlen=log_size)
+        self.slow_query_count = 0
+
+    def record_wait(self, pool, seconds: float, timed_out: bool = False):
+        waits = self._pools.get(id(pool))
+        if waits is not None:
+            waits.record(seconds, timed_out)
+
+    def record_query(self, engine: str, statement: str, seconds: float):
+        record_request_query(seconds)
+        self.queries += 1
+        self.query_time_total += seconds
+        if seconds * 1000 >= self.slow_query_ms:
+            self.slow_query_count += 1
+            self.slow_queries.append({
+                "engine": engine,
+                "statement": " ".join(statement.split())[:500],
+                "duration_ms": round(seconds * 1000, 1),
+                "at": time.time(),
+            })
+
+    def attach(self, engine, label: str):
+        sync_engine = engine.sync_engine
+        waits = PoolWaits(sync_engine.pool)
+        self.engines[label] = waits
+        self._pools[id(sync_engine.pool)] = waits
+
+        @event.listens_for(sync_engine, "engine_disposed")
+        def _disposed(disposed):
+            # dispose() swaps in a fresh pool
+            self._pools.pop(id(waits.pool), None)
+            waits.pool = disposed.pool
+            self._pools[id(waits.pool)] = waits
+
+        @event.listens_for(sync_engine, "before_cursor_execute")
+        def _before(conn, cursor, statement, parameters, context, executemany):
+            if context is not None:
+                context._query_started = time.perf_counter()
+
+        @event.listens_for(sync_engine, "after_cursor_execute")
+        def _after(conn, cursor, statement, parameters, context, executemany):
+            started = getattr(context, "_query_started", None)
+            if started is not None:
+                self.record_query(label, statement, time.perf_counter() - started)
+
+    def detach(self, label: str):
+        waits = self.engines.pop(label, None)
+        if waits is not None:
+            self._pools.pop(id(waits.pool), None)
+
+    def stats(self) -> dict:
+        return {
+            "engines": {label: waits.stats() for label, waits in self.engines.items()},
+            "checkout_timeouts": sum(waits.checkout_timeouts for waits in self.engines.values()),
+            "queries": self.queries,
+            "query_avg_ms": round(self.query_time_total / max(self.queries, 1) * 1000, 3),
+            "slow_query_threshold_ms": self.slow_query_ms,
+            "slow_queries": self.slow_query_count,
+        }
+
+db_metrics = DatabaseMetrics()
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that times how long each checkout waited for a free connection"""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            db_metrics.record_wait(self, time.perf_counter() - started, timed_out=True)
+            raise
+        db_metrics.record_wait(self, time.perf_counter() - started)
+        return connection
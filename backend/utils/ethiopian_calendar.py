@@ -1,54 +1,99 @@
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import List, NamedTuple, Optional, Tuple, Union
 
-def gregorian_to_ethiopian(g_date: datetime) -> dict:
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Julian Day Number of 1 Meskerem 1 (Amete Mihret era), i.e. 29 August 8 CE in the Julian calendar
+ETHIOPIAN_EPOCH_JDN = 1724221
+# date.toordinal() counts from 1 January 1 CE (proleptic Gregorian), which is JDN 1721426
+ORDINAL_TO_JDN = 1721425
+ETHIOPIAN_EPOCH = ETHIOPIAN_EPOCH_JDN - ORDINAL_TO_JDN
+
+MONTH_NAMES = {
+    "en": ("Meskerem", "Tikimt", "Hidar", "Tahsas", "Tir", "Yekatit", "Megabit", "Miazia", "Ginbot", "Sene", "Hamle", "Nehase", "Pagume"),
+    "am": ("መስከረም", "ጥቅምት", "ኅዳር", "ታኅሣሥ", "ጥር", "የካቲት", "መጋቢት", "ሚያዝያ", "ግንቦት", "ሰኔ", "ሐምሌ", "ነሐሴ", "ጳጉሜን"),
+    "om": ("Fulbaana", "Onkoloolessa", "Sadaasa", "Muddee", "Amajjii", "Guraandhala", "Bitootessa", "Ebla", "Caamsaa", "Waxabajjii", "Adoolessa", "Hagayya", "Qaammee"),
+    "ti": ("መስከረም", "ጥቅምቲ", "ሕዳር", "ታሕሳስ", "ጥሪ", "ለካቲት", "መጋቢት", "ሚያዝያ", "ግንቦት", "ሰነ", "ሓምለ", "ነሓሰ", "ጳጉሜን"),
+}
+
+DateLike = Union[date, datetime]
+
+class EthiopianDate(NamedTuple):
+    year: int
+    month: int
+    day: int
+
+def is_leap_year(year: int) -> bool:
+    """The year before a Gregorian leap year gets a sixth day of Pagume"""
+    return year % 4 == 3
+
+def days_in_month(year: int, month: int) -> int:
+    if not 1 <= month <= 13:
+        raise ValueError(f"Ethiopian month must be between 1 and 13, got {month}")
+    if month < 13:
+        return 30
+    return 6 if is_leap_year(year) else 5
+
+def _from_days(days: int) -> EthiopianDate:
+    # counted from 1 Meskerem of year 0 so that each 1461 day cycle ends on its leap day
+    cycle, remainder = divmod(days + 365, 1461)
+    year = 4 * cycle + remainder // 365 - remainder // 1460
+    day_of_year = remainder % 365 + 365 * (remainder // 1460)
+    return EthiopianDate(year, day_of_year // 30 + 1, day_of_year % 30 + 1)
+
+def _to_days(year: int, month: int, day: int) -> int:
+    return 365 * (year - 1) + year // 4 + 30 * (month - 1) + day - 1
+
+def to_ethiopian(g_date: DateLike) -> EthiopianDate:
+    return _from_days(g_date.toordinal() - ETHIOPIAN_EPOCH)
+
+def gregorian_to_ethiopian(g_date: DateLike) -> dict:
     """Convert Gregorian date to Ethiopian calendar date"""
-    
-    year = g_date.year
-    month = g_date.month
-    day = g_date.day
-    
-    if month == 1 and day <= 9:
-        e_year = year - 8
-        e_month = 4
-        e_day = day + 21
-    elif month >= 9 or (month == 9 and day >= 11):
-        e_year = year - 7
-        if month == 9:
-            e_month = 1
-            e_day = day - 10
-        elif month == 10:
-            e_month = 1 if day <= 10 else 2
-            e_day = day + 20 if day <= 10 else day - 10
-        elif month == 11:
-            e_month = 2 if day <= 9 else 3
-            e_day = day + 21 if day <= 9 else day - 9
-        elif month == 12:
-            e_month = 3 if day <= 9 else 4
-            e_day = day + 21 if day <= 9 else day - 9
+    return to_ethiopian(g_date)._asdict()
+
+def to_ethiopian_many(dates) -> List[EthiopianDate]:
+    """Convert a sequence of dates, or a numpy datetime64 array, in one pass"""
+    if numpy is not None:
+        if isinstance(dates, numpy.ndarray) and numpy.issubdtype(dates.dtype, numpy.datetime64):
+            # datetime64 days count from 1970-01-01
+            ordinals = dates.astype("datetime64[D]").astype(numpy.int64) + date(1970, 1, 1).toordinal()
         else:
-            e_month = month - 8
-            e_day = day + 21
+            ordinals = numpy.fromiter((value.toordinal() for value in dates), dtype=numpy.int64)
+        cycle, remainder = numpy.divmod(ordinals - ETHIOPIAN_EPOCH + 365, 1461)
+        years = 4 * cycle + remainder // 365 - remainder // 1460
+        day_of_year = remainder % 365 + 365 * (remainder // 1460)
+        return list(map(EthiopianDate, years.tolist(), (day_of_year // 30 + 1).tolist(), (day_of_year % 30 + 1).tolist()))
+    return [to_ethiopian(value) for value in dates]
+
+def ethiopian_to_gregorian(year: int, month: int, day: int) -> date:
+    if not 1 <= day <= days_in_month(year, month):
+        raise ValueError(f"{year}-{month:02d} has no day {day}")
+    return date.fromordinal(_to_days(year, month, day) + ETHIOPIAN_EPOCH)
+
+def ethiopian_month_range(year: int, month: Optional[int] = None) -> Tuple[datetime, datetime]:
+    """Gregorian [start, end) datetimes spanning an Ethiopian month, or the whole year without one"""
+    if month is None:
+        start = ethiopian_to_gregorian(year, 1, 1)
+        end = ethiopian_to_gregorian(year + 1, 1, 1)
     else:
-        e_year = year - 7
-        e_month = month + 4
-        e_day = day + 21
-    
-    return {
-        "year": e_year,
-        "month": e_month,
-        "day": e_day
-    }
-
-def format_ethiopian_date(g_date: datetime, language: str = "en") -> str:
+        start = ethiopian_to_gregorian(year, month, 1)
+        end = start + timedelta(days=days_in_month(year, month))
+    return datetime.combine(start, datetime.min.time()), datetime.combine(end, datetime.min.time())
+
+def month_name(month: int, language: str = "en") -> str:
+    return MONTH_NAMES.get(language, MONTH_NAMES["en"])[month - 1]
+
+@lru_cache(maxsize=8192)
+def _format(day: date, language: str) -> str:
+    eth_date = to_ethiopian(day)
+    return f"{month_name(eth_date.month, language)} {eth_date.day}, {eth_date.year}"
+
+def format_ethiopian_date(g_date: DateLike, language: str = "en") -> str:
     """Format Ethiopian date in specified language"""
-    eth_date = gregorian_to_ethiopian(g_date)
-    
-    months = {
-        "en": ["Meskerem", "Tikimt", "Hidar", "Tahsas", "Tir", "Yekatit", "Megabit", "Miazia", "Ginbot", "Sene", "Hamle", "Nehase", "Pagume"],
-        "am": ["መስከረም", "ጥቅምት", "ኅዳር", "ታኅሣሥ", "ጥር", "የካቲት", "መጋቢት", "ሚያዝያ", "ግንቦት", "ሰኔ", "ሐምሌ", "ነሐሴ", "ጳጉሜን"]
-    }
-    
-    month_names = months.get(language, months["en"])
-    month_name = month_names[eth_date["month"] - 1] if eth_date["month"] <= 13 else ""
-    
-    return f"{month_name} {eth_date['day']}, {eth_date['year']}"
+    if isinstance(g_date, datetime):
+        g_date = g_date.date()
+    return _format(g_date, language if language in MONTH_NAMES else "en")
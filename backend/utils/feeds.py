@@ -0,0 +1,255 @@
+import os
+import time
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Optional, Set, Tuple
+from fastapi import Request, Response
+from feedgen.feed import FeedGenerator
+from sqlalchemy import select, desc
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.database import async_session_maker
+from backend.models import Article, Category, Region
+from backend.utils.cache import make_etag, etag_matches
+
+SITE_URL = os.getenv("SITE_URL", "https://ethiopiannews.com")
+FEED_SIZE = int(os.getenv("FEED_SIZE", "20"))
+FEED_DEBOUNCE = float(os.getenv("FEED_DEBOUNCE", "1"))
+FEED_REFRESH_INTERVAL = float(os.getenv("FEED_REFRESH_INTERVAL", "300"))
+
+FEED_LANGUAGES = ["en", "am", "om", "ti"]
+FEED_FORMATS = {"rss": "application/rss+xml", "atom": "application/atom+xml"}
+FEED_TITLES = {"en": "Ethiopian News", "am": "የኢትዮጵያ ዜና", "om": "Oduu Itoophiyaa", "ti": "ዜና ኢትዮጵያ"}
+FEED_DESCRIPTIONS = {
+    "en": "Latest news from Ethiopia",
+    "am": "ከኢትዮጵያ የቅርብ ጊዜ ዜናዎች",
+    "om": "Oduu haaraa Itoophiyaa irraa",
+    "ti": "ሓድሽ ዜና ካብ ኢትዮጵያ",
+}
+
+logger = logging.getLogger(__name__)
+
+ScopeKey = Tuple[str, Optional[str]]
+
+@dataclass
+class RenderedFeed:
+    body: bytes
+    media_type: str
+    etag: str
+    last_modified: datetime
+
+@dataclass
+class FeedScope:
+    kind: str
+    slug: Optional[str]
+    scope_id: Optional[int]
+    names: Dict[str, Optional[str]]
+    variants: Dict[Tuple[str, str], RenderedFeed] = field(default_factory=dict)
+    built_at: float = 0.0
+
+def feed_state(article: Article) -> tuple:
+    return (article.status, article.category_id, article.region_id)
+
+def _aware(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+def _localized(article: Article, field_name: str, language: str) -> Optional[str]:
+    return getattr(article, f"{field_name}_{language}") or getattr(article, f"{field_name}_en")
+
+def render_feed(scope: FeedScope, articles, language: str, fmt: str) -> RenderedFeed:
+    newest = max(
+        (_aware(article.updated_at or article.published_at) for article in articles),
+        default=datetime.fromtimestamp(scope.built_at, timezone.utc)
+    ).replace(microsecond=0)
+    title = FEED_TITLES[language]
+    name = scope.names.get(language) or scope.names.get("en")
+    if name:
+        title = f"{title} - {name}"
+    path = f"/api/rss/{'atom' if fmt == 'atom' else 'feed'}.xml?lang={language}"
+    if scope.slug:
+        path += f"&{scope.kind}={scope.slug}"
+
+    fg = FeedGenerator()
+    fg.id(f"{SITE_URL}{path}")
+    fg.title(title)
+    fg.link(href=SITE_URL, rel="alternate")
+    fg.link(href=f"{SITE_URL}{path}", rel="self")
+    fg.description(FEED_DESCRIPTIONS[language])
+    fg.language(language)
+    fg.lastBuildDate(newest)
+    fg.updated(newest)
+
+    for article in articles:
+        fe = fg.add_entry(order="append")
+        fe.id(f"{SITE_URL}/article/{article.slug}")
+        fe.title(_localized(article, "title", language))
+        fe.link(href=f"{SITE_URL}/article/{article.slug}")
+        excerpt = _localized(article, "excerpt", language)
+        fe.description(excerpt or (_localized(article, "content", language) or "")[:200])
+        if article.published_at:
+            fe.published(_aware(article.published_at))
+        fe.updated(_aware(article.updated_at or article.published_at))
+        if article.featured_image:
+            fe.enclosure(article.featured_image, 0, "image/jpeg")
+
+    body = fg.atom_str(pretty=True) if fmt == "atom" else fg.rss_str(pretty=True)
+    return RenderedFeed(
+        body=body,
+        media_type=FEED_FORMATS[fmt],
+        etag=make_etag(body),
+        last_modified=datetime.fromtimestamp(scope.built_at, timezone.utc).replace(microsecond=0),
+    )
+
+class FeedStore:
+    """Pre-rendered RSS/Atom feeds per scope, rebuilt in the background when their articles change"""
+
+    def __init__(self):
+        self.scopes: Dict[ScopeKey, FeedScope] = {}
+        self.dirty: Set[ScopeKey] = set()
+        self.renders = 0
+        self.served = 0
+        self.not_modified = 0
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    async def get(self, db: AsyncSession, language: str, fmt: str, kind: str = "all", slug: Optional[str] = None) -> Optional[RenderedFeed]:
+        scope = self.scopes.get((kind, slug))
+        if scope is None:
+            scope = await self._build(db, kind, slug)
+            if scope is None:
+                return None
+        self.served += 1
+        return scope.variants[(language, fmt)]
+
+    def article_changed(self, *states: tuple):
+        """Mark feeds stale given the (status, category_id, region_id) of an article before and after a write"""
+        published = [state for state in states if state and state[0] == "published"]
+        if not published:
+            return
+        category_ids = {state[1] for state in published}
+        region_ids = {state[2] for state in published}
+        for key, scope in self.scopes.items():
+            if (
+                scope.kind == "all"
+                or (scope.kind == "category" and scope.scope_id in category_ids)
+                or (scope.kind == "region" and scope.scope_id in region_ids)
+            ):
+                self.dirty.add(key)
+        if self.dirty:
+            self._wakeup.set()
+
+    async def _resolve(self, db: AsyncSession, kind: str, slug: Optional[str]) -> Optional[FeedScope]:
+        if kind == "all":
+            return FeedScope(kind=kind, slug=None, scope_id=None, names={})
+        model = Category if kind == "category" else Region
+        result = await db.execute(select(model).where(model.slug == slug))
+        row = result.scalar_one_or_none()
+        if row is None:
+            return None
+        names = {language: getattr(row, f"name_{language}") for language in FEED_LANGUAGES}
+        return FeedScope(kind=kind, slug=slug, scope_id=row.id, names=names)
+
+    async def _build(self, db: AsyncSession, kind: str, slug: Optional[str]) -> Optional[FeedScope]:
+        previous = self.scopes.get((kind, slug))
+        scope = previous or await self._resolve(db, kind, slug)
+        if scope is None:
+            return None
+        query = select(Article).where(Article.status == "published")
+        if kind == "category":
+            query = query.where(Article.category_id == scope.scope_id)
+        elif kind == "region":
+            query = query.where(Article.region_id == scope.scope_id)
+        result = await db.execute(query.order_by(desc(Article.published_at)).limit(FEED_SIZE))
+        articles = result.scalars().all()
+
+        scope.built_at = time.time()
+        variants = {}
+        for language in FEED_LANGUAGES:
+            for fmt in FEED_FORMATS:
+                feed = render_feed(scope, articles, language, fmt)
+                # Last-Modified tracks when the body last changed, so a delete or unpublish still moves it forward
+                previous = scope.variants.get((language, fmt))
+                if previous is not None:
+                    if previous.etag == feed.etag:
+                        feed.last_modified = previous.last_modified
+                    else:
+                        feed.last_modified = max(feed.last_modified, previous.last_modified)
+                variants[(language, fmt)] = feed
+        scope.variants = variants
+        self.scopes[(kind, slug)] = scope
+        self.renders += 1
+        return scope
+
+    async def rebuild_dirty(self):
+        if not self.dirty:
+            return
+        keys, self.dirty = self.dirty, set()
+        async with async_session_maker() as db:
+            for kind, slug in keys:
+                try:
+                    await self._build(db, kind, slug)
+                except Exception:
+                    logger.exception("Failed to rebuild %s feed %s", kind, slug)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=FEED_REFRESH_INTERVAL)
+                # let a burst of edits settle into a single rebuild
+                await asyncio.sleep(FEED_DEBOUNCE)
+            except asyncio.TimeoutError:
+                cutoff = time.time() - FEED_REFRESH_INTERVAL
+                self.dirty.update(key for key, scope in self.scopes.items() if scope.built_at < cutoff)
+            self._wakeup.clear()
+            await self.rebuild_dirty()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "scopes": len(self.scopes),
+            "dirty": len(self.dirty),
+            "renders": self.renders,
+            "served": self.served,
+            "not_modified": self.not_modified,
+        }
+
+feed_store = FeedStore()
+
+def feed_response(request: Request, feed: RenderedFeed) -> Response:
+    headers = {
+        "ETag": feed.etag,
+        "Last-Modified": format_datetime(feed.last_modified, usegmt=True),
+        "Cache-Control": "public, max-age=0, must-revalidate",
+    }
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        not_modified = etag_matches(if_none_match, feed.etag)
+    else:
+        not_modified = _not_modified_since(request.headers.get("if-modified-since"), feed.last_modified)
+    if not_modified:
+        feed_store.not_modified += 1
+        return Response(status_code=304, headers=headers)
+    return Response(content=feed.body, media_type=feed.media_type, headers=headers)
+
+def _not_modified_since(header: Optional[str], last_modified: datetime) -> bool:
+    if not header:
+        return False
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    return last_modified <= _aware(since)
@@ -0,0 +1,102 @@
+from typing import Dict, List, Optional, Tuple
+from fastapi import HTTPException, Request
+from sqlalchemy import select, delete, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.models import Article, ArticleLocalization
+
+SUPPORTED_LANGUAGES = ("en", "am", "om", "ti")
+DEFAULT_LANGUAGE = "en"
+LANGUAGE_ALIASES = {
+    "en": "en", "eng": "en",
+    "am": "am", "amh": "am",
+    "om": "om", "orm": "om", "gaz": "om",
+    "ti": "ti", "tir": "ti",
+}
+LOCALIZED_ARTICLE_FIELDS = ("title", "excerpt", "content")
+MATERIALIZE_BATCH_SIZE = 500
+
+def parse_accept_language(header: Optional[str]) -> Optional[str]:
+    """Best supported language in an Accept-Language header, honouring q-values"""
+    if not header:
+        return None
+    ranked = []
+    for position, part in enumerate(header.split(",")):
+        tag, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if quality > 0:
+            ranked.append((-quality, position, tag.strip().lower()))
+    for _, _, tag in sorted(ranked):
+        if tag == "*":
+            return DEFAULT_LANGUAGE
+        language = LANGUAGE_ALIASES.get(tag.split("-")[0])
+        if language:
+            return language
+    return None
+
+def resolve_language(request: Request, lang: Optional[str]) -> Tuple[Optional[str], bool]:
+    """Returns the language to serve (None for all languages) and whether it came from Accept-Language"""
+    if not lang:
+        return None, False
+    if lang == "auto":
+        return parse_accept_language(request.headers.get("accept-language")) or DEFAULT_LANGUAGE, True
+    if lang in SUPPORTED_LANGUAGES:
+        return lang, False
+    raise HTTPException(status_code=400, detail="Unsupported language")
+
+def vary_headers(negotiated: bool) -> Dict[str, str]:
+    return {"Vary": "Accept-Language"} if negotiated else {}
+
+def localized_value(row, field: str, language: str) -> Optional[str]:
+    return getattr(row, f"{field}_{language}") or getattr(row, f"{field}_{DEFAULT_LANGUAGE}")
+
+def localize_named(row, language: str, fields: Tuple[str, ...]) -> dict:
+    """Collapse name_en/name_am/... style columns of a category or region into one language"""
+    data = {field: getattr(row, field) for field in fields}
+    data["name"] = localized_value(row, "name", language)
+    data["language"] = language
+    return data
+
+def article_localizations(article: Article) -> List[dict]:
+    rows = []
+    for language in SUPPORTED_LANGUAGES:
+        row = {"article_id": article.id, "language": language, "is_fallback": False}
+        for field in LOCALIZED_ARTICLE_FIELDS:
+            own = getattr(article, f"{field}_{language}")
+            row[field] = own or getattr(article, f"{field}_{DEFAULT_LANGUAGE}")
+            if not own and field != "excerpt":
+                row["is_fallback"] = True
+        rows.append(row)
+    return rows
+
+async def materialize_article(db: AsyncSession, article: Article):
+    """Rewrite the per-language rows of an article inside the caller's transaction"""
+    await db.execute(delete(ArticleLocalization).where(ArticleLocalization.article_id == article.id))
+    await db.execute(insert(ArticleLocalization), article_localizations(article))
+
+async def materialize_missing(db: AsyncSession) -> int:
+    """Backfill localizations for articles written before they were materialized"""
+    total = 0
+    while True:
+        missing = (
+            select(Article)
+            .where(~select(ArticleLocalization.article_id)
+                   .where(ArticleLocalization.article_id == Article.id)
+                   .exists())
+            .limit(MATERIALIZE_BATCH_SIZE)
+        )
+        articles = (await db.execute(missing)).scalars().all()
+        if not articles:
+            return total
+        await db.execute(
+            insert(ArticleLocalization),
+            [row for article in articles for row in article_localizations(article)]
+        )
+        await db.commit()
+        db.expunge_all()
+        total += len(articles)
@@ -0,0 +1,208 @@
+import os
+import uuid
+import asyncio
+import hashlib
+import logging
+from typing import Optional, Tuple
+import aiofiles
+import aiofiles.os
+from fastapi import HTTPException, UploadFile
+from fastapi.responses import JSONResponse
+from fastapi.staticfiles import StaticFiles
+from PIL import Image, ImageOps, UnidentifiedImageError
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.utils.jobs import PermanentJobError, job_queue
+
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static", "uploads"))
+UPLOAD_URL = "/uploads"
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# room for the multipart boundaries and part headers around the file itself
+UPLOAD_FORM_OVERHEAD = 64 * 1024
+
+IMAGE_RENDER_JOB = "image.render"
+
+IMAGE_VARIANTS = {"thumbnail": 320, "card": 800, "full": 1600}
+IMAGE_FORMATS = {"webp": ("WEBP", {"quality": 80, "method": 4}), "jpeg": ("JPEG", {"quality": 82, "optimize": True, "progressive": True})}
+EXTENSIONS = {"JPEG": "jpg", "PNG": "png", "GIF": "gif", "WEBP": "webp", "BMP": "bmp", "TIFF": "tiff"}
+
+logger = logging.getLogger(__name__)
+
+class ImmutableStaticFiles(StaticFiles):
+    """Uploads are content-addressed or uuid-named, so they never change once written"""
+
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
+
+class UploadLimitMiddleware:
+    """Turn away oversized uploads from their Content-Length, or as soon as the streamed body passes the limit"""
+
+    def __init__(self, app, paths: Tuple[str, ...], max_bytes: int = MAX_UPLOAD_BYTES + UPLOAD_FORM_OVERHEAD):
+        self.app = app
+        self.paths = paths
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+        length = dict(scope["headers"]).get(b"content-length", b"")
+        if length.isdigit() and int(length) > self.max_bytes:
+            response = JSONResponse({"detail": "Image is too large"}, status_code=413)
+            await response(scope, receive, send)
+            return
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    # raised while the form is being parsed, before the endpoint runs
+                    raise HTTPException(status_code=413, detail="Image is too large")
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+def variant_name(digest: str, variant: str, fmt: str) -> str:
+    return f"{digest}-{variant}.{'jpg' if fmt == 'jpeg' else fmt}"
+
+def variant_map(digest: str) -> dict:
+    variants = {
+        variant: {
+            "width": width,
+            **{fmt: f"{UPLOAD_URL}/{variant_name(digest, variant, fmt)}" for fmt in IMAGE_FORMATS},
+        }
+        for variant, width in IMAGE_VARIANTS.items()
+    }
+    srcset = {
+        fmt: ", ".join(f"{variants[variant][fmt]} {width}w" for variant, width in IMAGE_VARIANTS.items())
+        for fmt in IMAGE_FORMATS
+    }
+    return {"variants": variants, "srcset": srcset}
+
+async def stream_upload(file: UploadFile) -> Tuple[str, str, int]:
+    """Write an upload to a temporary file chunk by chunk, returning its path, sha256 and size"""
+    await aiofiles.os.makedirs(UPLOAD_DIR, exist_ok=True)
+    temp_path = os.path.join(UPLOAD_DIR, f".upload-{uuid.uuid4().hex}")
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        async with aiofiles.open(temp_path, "wb") as out:
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > MAX_UPLOAD_BYTES:
+                    raise HTTPException(status_code=413, detail="Image is too large")
+                digest.update(chunk)
+                await out.write(chunk)
+    except BaseException:
+        await _remove_quietly(temp_path)
+        raise
+    return temp_path, digest.hexdigest()[:32], size
+
+def _identify(path: str) -> Optional[str]:
+    try:
+        with Image.open(path) as image:
+            return image.format
+    except (UnidentifiedImageError, OSError):
+        return None
+
+def _render_variants(source: str, digest: str):
+    with Image.open(source) as original:
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ("RGB", "RGBA", "L"):
+            image = image.convert("RGBA" if image.mode in ("P", "PA", "LA") else "RGB")
+        for variant, width in IMAGE_VARIANTS.items():
+            resized = image.copy()
+            resized.thumbnail((width, width * 4), Image.Resampling.LANCZOS)
+            for fmt, (pil_format, options) in IMAGE_FORMATS.items():
+                target = os.path.join(UPLOAD_DIR, variant_name(digest, variant, fmt))
+                if os.path.exists(target):
+                    continue
+                output = resized
+                if pil_format == "JPEG" and output.mode == "RGBA":
+                    output = output.convert("RGB")
+                partial = f"{target}.part"
+                output.save(partial, pil_format, **options)
+                os.replace(partial, target)
+
+async def _remove_quietly(path: str):
+    try:
+        await aiofiles.os.remove(path)
+    except FileNotFoundError:
+        pass
+
+async def normalize_upload(url: str) -> dict:
+    """Render the variants of an image that was uploaded here; other URLs are reported, never fetched"""
+    if not url.startswith(f"{UPLOAD_URL}/"):
+        return {"url": url, "error": "Only uploaded images are processed"}
+    filename = os.path.basename(url)
+    path = os.path.join(UPLOAD_DIR, filename)
+    if not await aiofiles.os.path.exists(path):
+        return {"url": url, "error": "Upload not found"}
+    digest = os.path.splitext(filename)[0]
+    try:
+        await asyncio.to_thread(_render_variants, path, digest)
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as exc:
+        return {"url": url, "error": f"Unreadable image: {exc}"}
+    return {"url": url, "hash": digest, **variant_map(digest)}
+
+class ImagePipeline:
+    """Stores uploads and renders their resized WebP/JPEG derivatives through the durable job queue"""
+
+    def __init__(self):
+        self.processed = 0
+        self.failed = 0
+
+    async def store(self, db: AsyncSession, file: UploadFile) -> dict:
+        temp_path, digest, size = await stream_upload(file)
+        try:
+            image_format = await asyncio.to_thread(_identify, temp_path)
+        except Image.DecompressionBombError:
+            await _remove_quietly(temp_path)
+            raise HTTPException(status_code=400, detail="Image dimensions are too large")
+        if image_format is None:
+            await _remove_quietly(temp_path)
+            raise HTTPException(status_code=400, detail="File must be an image")
+
+        filename = f"{digest}.{EXTENSIONS.get(image_format, image_format.lower())}"
+        path = os.path.join(UPLOAD_DIR, filename)
+        if await aiofiles.os.path.exists(path):
+            await _remove_quietly(temp_path)
+        else:
+            await aiofiles.os.replace(temp_path, path)
+
+        # a queued job survives restarts, so the variant URLs handed out below are eventually served
+        job_queue.enqueue(db, IMAGE_RENDER_JOB, {"filename": filename, "digest": digest})
+        await db.commit()
+        job_queue.wake()
+
+        return {"url": f"{UPLOAD_URL}/{filename}", "hash": digest, "size": size, **variant_map(digest)}
+
+    async def render(self, db: AsyncSession, payload: dict):
+        # jobs queued before filenames were stored carry a path relative to the old working directory
+        filename = payload.get("filename") or os.path.basename(payload["path"])
+        try:
+            await asyncio.to_thread(_render_variants, os.path.join(UPLOAD_DIR, filename), payload["digest"])
+        except Image.DecompressionBombError as exc:
+            self.failed += 1
+            raise PermanentJobError(str(exc)) from exc
+        except Exception:
+            self.failed += 1
+            raise
+        self.processed += 1
+
+    def stats(self) -> dict:
+        return {
+            "processed": self.processed,
+            "failed": self.failed,
+        }
+
+image_pipeline = ImagePipeline()
+job_queue.handler(IMAGE_RENDER_JOB)(image_pipeline.render)
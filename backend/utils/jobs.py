@@ -0,0 +1,228 @@
+import os
+import time
+import random
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional
+from sqlalchemy import select, update, delete, func, or_, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.database import async_session_maker
+from backend.models import Job
+from backend.utils.metrics import registry, Counter, Histogram
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "5"))
+JOB_BACKOFF_BASE = float(os.getenv("JOB_BACKOFF_BASE", "5"))
+JOB_BACKOFF_MAX = float(os.getenv("JOB_BACKOFF_MAX", "900"))
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "300"))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "2"))
+JOB_MONITOR_INTERVAL = float(os.getenv("JOB_MONITOR_INTERVAL", "15"))
+JOB_RETENTION_HOURS = int(os.getenv("JOB_RETENTION_HOURS", "72"))
+
+JOB_STATUSES = ("queued", "running", "done", "dead")
+
+logger = logging.getLogger(__name__)
+
+job_runs = registry.register(Counter("job_runs_total", "Background job attempts by outcome", ("kind", "outcome")))
+job_duration = registry.register(Histogram("job_duration_seconds", "Background job run time", ("kind",)))
+
+Handler = Callable[[AsyncSession, dict], Awaitable[None]]
+
+class PermanentJobError(Exception):
+    """Raised by a handler when retrying cannot help; the job is dead-lettered straight away"""
+
+def backoff(attempts: int) -> float:
+    """Exponential delay before the next attempt, jittered so failed batches don't retry in lockstep"""
+    return min(JOB_BACKOFF_MAX, JOB_BACKOFF_BASE * 2 ** (attempts - 1)) * random.uniform(0.8, 1.2)
+
+class JobQueue:
+    """Durable jobs in the jobs table, claimed with SELECT ... FOR UPDATE SKIP LOCKED by a pool of workers"""
+
+    def __init__(self, workers: int = JOB_WORKERS):
+        self.workers = workers
+        self.handlers: Dict[str, Handler] = {}
+        self.depth: Dict[str, int] = {status: 0 for status in JOB_STATUSES}
+        self.oldest_queued_seconds = 0.0
+        self.processed = 0
+        self.retried = 0
+        self.dead_lettered = 0
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+
+    def handler(self, kind: str):
+        def register(handle: Handler) -> Handler:
+            self.handlers[kind] = handle
+            return handle
+        return register
+
+    def enqueue(self, db: AsyncSession, kind: str, payload: dict, delay: float = 0, max_attempts: int = JOB_MAX_ATTEMPTS) -> Job:
+        """Add a job to the caller's transaction, so it exists exactly when the caller's write does"""
+        job = Job(
+            kind=kind,
+            payload=payload,
+            status="queued",
+            max_attempts=max_attempts,
+            run_at=datetime.utcnow() + timedelta(seconds=delay)
+        )
+        db.add(job)
+        return job
+
+    def wake(self):
+        self._wakeup.set()
+
+    async def claim(self) -> Optional[Job]:
+        now = datetime.utcnow()
+        async with async_session_maker() as session:
+            result = await session.execute(
+                select(Job)
+                .where(or_(
+                    and_(Job.status == "queued", Job.run_at <= now),
+                    # a worker that died mid-job leaves it running with an expired lease
+                    and_(Job.status == "running", Job.locked_until < now)
+                ))
+                .order_by(Job.run_at, Job.id)
+                .limit(1)
+                .with_for_update(skip_locked=True)
+            )
+            job = result.scalar_one_or_none()
+            if job is None:
+                return None
+            if job.status == "running" and job.attempts >= job.max_attempts:
+                job.status = "dead"
+                job.last_error = job.last_error or "Lease expired on the final attempt"
+                job.finished_at = now
+                self.dead_lettered += 1
+                await session.commit()
+                return await self.claim()
+            job.status = "running"
+            job.attempts += 1
+            job.locked_until = now + timedelta(seconds=JOB_LEASE_SECONDS)
+            await session.commit()
+            session.expunge(job)
+            return job
+
+    async def run(self, job: Job):
+        handle = self.handlers.get(job.kind)
+        started = time.perf_counter()
+        error = None
+        permanent = False
+        try:
+            if handle is None:
+                raise LookupError(f"No handler for job kind '{job.kind}'")
+            async with async_session_maker() as session:
+                await handle(session, job.payload)
+        except Exception as exc:
+            error = f"{type(exc).__name__}: {exc}"
+            permanent = isinstance(exc, PermanentJobError)
+            logger.exception("Job %d (%s) failed on attempt %d", job.id, job.kind, job.attempts)
+        job_duration.observe(time.perf_counter() - started, job.kind)
+        await self.finish(job, error, permanent)
+
+    async def finish(self, job: Job, error: Optional[str], permanent: bool = False):
+        now = datetime.utcnow()
+        if error is None:
+            values, outcome = {"status": "done", "finished_at": now, "last_error": None}, "done"
+        elif permanent or job.attempts >= job.max_attempts:
+            values, outcome = {"status": "dead", "finished_at": now, "last_error": error}, "dead"
+        else:
+            values = {"status": "queued", "run_at": now + timedelta(seconds=backoff(job.attempts)), "last_error": error}
+            outcome = "retry"
+        async with async_session_maker() as session:
+            # only while we still hold the lease; once it expired another worker may own the job
+            result = await session.execute(
+                update(Job)
+                .where(Job.id == job.id, Job.status == "running", Job.locked_until == job.locked_until)
+                .values(locked_until=None, **values)
+            )
+            await session.commit()
+        if not result.rowcount:
+            logger.warning("Job %d (%s) lost its lease before finishing; result discarded", job.id, job.kind)
+            outcome = "lease_lost"
+        elif outcome == "done":
+            self.processed += 1
+        elif outcome == "dead":
+            self.dead_lettered += 1
+        else:
+            self.retried += 1
+        job_runs.inc(1, job.kind, outcome)
+
+    async def _worker(self):
+        while True:
+            try:
+                job = await self.claim()
+                if job is not None:
+                    await self.run(job)
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # the database is likely unavailable; an unfinished job is retried when its lease expires
+                logger.exception("Job worker iteration failed")
+                await asyncio.sleep(JOB_POLL_INTERVAL)
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=JOB_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def refresh_depth(self, db: AsyncSession):
+        result = await db.execute(select(Job.status, func.count(Job.id)).group_by(Job.status))
+        counts = dict(result.all())
+        self.depth = {status: counts.get(status, 0) for status in JOB_STATUSES}
+        oldest = await db.scalar(
+            select(func.min(Job.run_at)).where(Job.status == "queued", Job.run_at <= datetime.utcnow())
+        )
+        self.oldest_queued_seconds = (datetime.utcnow() - oldest).total_seconds() if oldest else 0.0
+
+    async def _monitor(self):
+        while True:
+            try:
+                async with async_session_maker() as session:
+                    await self.refresh_depth(session)
+                    await session.execute(delete(Job).where(
+                        Job.status == "done",
+                        Job.finished_at < datetime.utcnow() - timedelta(hours=JOB_RETENTION_HOURS)
+                    ))
+                    await session.commit()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Failed to refresh job queue depth")
+            await asyncio.sleep(JOB_MONITOR_INTERVAL)
+
+    async def retry(self, db: AsyncSession, job_id: int) -> bool:
+        """Send a dead-lettered job back to the queue with a fresh set of attempts"""
+        result = await db.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == "dead")
+            .values(status="queued", attempts=0, run_at=datetime.utcnow(), finished_at=None)
+        )
+        await db.commit()
+        self.wake()
+        return result.rowcount > 0
+
+    def start(self):
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+            self._tasks.append(asyncio.create_task(self._monitor()))
+
+    async def stop(self):
+        # a job cut off here keeps its lease and is picked up again once the lease expires
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "depth": self.depth,
+            "oldest_queued_seconds": round(self.oldest_queued_seconds, 1),
+            "processed": self.processed,
+            "retried": self.retried,
+            "dead_lettered": self.dead_lettered,
+        }
+
+job_queue = JobQueue()
@@ -0,0 +1,48 @@
+import json
+import base64
+from datetime import datetime
+from typing import Any, Callable, Optional, Tuple
+from fastapi import HTTPException, Response
+from sqlalchemy import and_, or_, desc
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count"
+
+def encode_cursor(sort_value: Any, row_id: int) -> str:
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    raw = json.dumps([sort_value, row_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str, parse: Optional[Callable[[Any], Any]] = None) -> Tuple[Any, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        if sort_value is not None and parse:
+            sort_value = parse(sort_value)
+        return sort_value, int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def keyset_order(sort_column, id_column) -> tuple:
+    """`sort_column DESC NULLS FIRST, id_column DESC`, spelled out because SQLite puts NULLs last"""
+    return desc(sort_column).nulls_first(), desc(id_column)
+
+def keyset_after(sort_column, id_column, sort_value: Any, row_id: int):
+    """Rows after (sort_value, row_id) in keyset_order(sort_column, id_column)"""
+    if sort_value is None:
+        # NULLs come first, so only the remaining NULL rows precede every non-NULL row
+        return or_(sort_column.isnot(None), and_(sort_column.is_(None), id_column < row_id))
+    return and_(
+        sort_column <= sort_value,
+        or_(sort_column < sort_value, id_column < row_id)
+    )
+
+def next_cursor_headers(rows, limit: int, sort_attr: str) -> dict:
+    if rows and len(rows) == limit:
+        last = rows[-1]
+        return {NEXT_CURSOR_HEADER: encode_cursor(getattr(last, sort_attr), last.id)}
+    return {}
+
+def set_next_cursor(response: Response, rows, limit: int, sort_attr: str):
+    response.headers.update(next_cursor_headers(rows, limit, sort_attr))
@@ -0,0 +1,149 @@
+from typing import Any, Dict, FrozenSet, List, Optional
+from fastapi import HTTPException
+from sqlalchemy import select, and_, desc
+from sqlalchemy.orm import load_only, joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.models import Article, ArticleLocalization, Comment, User
+from backend.schemas import (
+    Article as ArticleSchema, ArticleCard, LocalizedArticleCard, LocalizedArticle,
+    ArticleDetail, LocalizedArticleDetail
+)
+from backend.utils.cache import encode_json
+from backend.utils.serialization import encode_rows, encode_dicts
+from backend.utils.i18n import localize_named
+from backend.utils.comments import approved_count_column
+
+ARTICLE_VIEWS = ("full", "card")
+ARTICLE_FIELDS = list(ArticleSchema.model_fields)
+CARD_FIELDS = list(ArticleCard.model_fields)
+LOCALIZED_FIELDS = ("language", "title", "excerpt", "content", "is_fallback")
+ARTICLE_INCLUDES = ("author", "category", "region", "comments")
+RELATION_FIELDS = {"category": ("id", "slug", "description", "parent_id"), "region": ("id", "slug")}
+
+def parse_includes(include: Optional[str]) -> FrozenSet[str]:
+    requested = frozenset(name.strip() for name in (include or "").split(",") if name.strip())
+    unknown = sorted(requested - set(ARTICLE_INCLUDES))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown includes: {', '.join(unknown)}")
+    return requested
+
+class ArticleProjection:
+    """Which article columns a listing loads and how it serializes them"""
+
+    def __init__(
+        self,
+        view: str = "full",
+        lang: Optional[str] = None,
+        fields: Optional[str] = None,
+        includes: FrozenSet[str] = frozenset()
+    ):
+        if view not in ARTICLE_VIEWS:
+            raise HTTPException(status_code=400, detail=f"view must be one of {', '.join(ARTICLE_VIEWS)}")
+        self.view = view
+        self.lang = lang
+        self.fields: Optional[List[str]] = None
+        self.includes = includes
+        self.localizations: Dict[int, ArticleLocalization] = {}
+        self.comment_counts: Dict[int, int] = {}
+        if fields:
+            requested = [name.strip() for name in fields.split(",") if name.strip()]
+            unknown = [name for name in requested if name not in ARTICLE_FIELDS]
+            if unknown:
+                raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+            self.fields = list(dict.fromkeys(["id"] + requested))
+
+    @property
+    def localized_model(self):
+        return LocalizedArticle if self.view == "full" else LocalizedArticleCard
+
+    def _article_columns(self) -> Optional[List[str]]:
+        if self.fields:
+            return self.fields
+        if self.lang:
+            # Text comes from the narrow per-language row, the article only supplies metadata
+            return [name for name in self.localized_model.model_fields if name not in LOCALIZED_FIELDS]
+        if self.view == "card":
+            return CARD_FIELDS
+        return None
+
+    def select(self, *required: str):
+        query = select(Article)
+        columns = self._article_columns()
+        if columns is not None:
+            names = list(dict.fromkeys(columns + list(required)))
+            query = query.options(load_only(*[getattr(Article, name) for name in names]))
+        if self.lang and not self.fields:
+            query = query.add_columns(ArticleLocalization).join(
+                ArticleLocalization,
+                and_(ArticleLocalization.article_id == Article.id, ArticleLocalization.language == self.lang)
+            )
+        if self.includes:
+            # many-to-one relations ride along in the same query, the comment count comes from its counter row
+            if "author" in self.includes:
+                query = query.options(joinedload(Article.author).load_only(User.id, User.username, User.full_name))
+            for relation in ("category", "region"):
+                if relation in self.includes:
+                    query = query.options(joinedload(getattr(Article, relation)))
+            query = query.add_columns(approved_count_column())
+        return query
+
+    async def fetch(self, db: AsyncSession, query) -> list:
+        result = await db.execute(query)
+        localized = self.lang and not self.fields
+        if not localized and not self.includes:
+            return result.scalars().all()
+        rows = result.all()
+        if localized:
+            self.localizations = {row[0].id: row[1] for row in rows}
+        if self.includes:
+            self.comment_counts = {row[0].id: row[-1] for row in rows}
+        return [row[0] for row in rows]
+
+    async def fetch_comments(self, db: AsyncSession, article_id: int, limit: int) -> list:
+        result = await db.execute(
+            select(Comment)
+            .where(Comment.article_id == article_id, Comment.is_approved == True)
+            .order_by(desc(Comment.created_at), desc(Comment.id))
+            .limit(limit)
+        )
+        return result.scalars().all()
+
+    def detail(self, article: Article, comments: Optional[list] = None, comments_cursor: Optional[str] = None) -> bytes:
+        """An article with the relations named in `includes`"""
+        if self.lang:
+            data = self.localize(article, self.localizations[article.id])
+        else:
+            data = {name: getattr(article, name) for name in ARTICLE_FIELDS}
+        if "author" in self.includes:
+            data["author"] = article.author
+        for relation, fields in RELATION_FIELDS.items():
+            if relation in self.includes:
+                value = getattr(article, relation)
+                data[relation] = localize_named(value, self.lang, fields) if self.lang and value else value
+        if "comments" in self.includes:
+            data["comments"] = comments
+            data["comments_cursor"] = comments_cursor
+        data["approved_comment_count"] = self.comment_counts.get(article.id, 0)
+        return encode_json(LocalizedArticleDetail if self.lang else ArticleDetail, data)
+
+    def localize(self, article: Article, localization: ArticleLocalization) -> Dict[str, Any]:
+        data = {
+            name: getattr(article, name)
+            for name in self.localized_model.model_fields
+            if name not in LOCALIZED_FIELDS
+        }
+        for name in LOCALIZED_FIELDS:
+            if name in self.localized_model.model_fields:
+                data[name] = getattr(localization, name)
+        return data
+
+    def encode(self, articles) -> bytes:
+        if self.fields:
+            return encode_dicts([{name: getattr(article, name) for name in self.fields} for article in articles])
+        if self.lang:
+            return encode_rows(self.localized_model, [
+                self.localize(article, self.localizations[article.id]) for article in articles
+            ])
+        if self.view == "card":
+            return encode_rows(ArticleCard, articles)
+        return encode_rows(ArticleSchema, articles)
@@ -0,0 +1,297 @@
+import os
+import re
+import math
+import uuid
+import asyncio
+import logging
+from collections import defaultdict
+from html import escape, unescape
+from typing import Dict, List, Optional, Set
+from sqlalchemy import select, or_, and_, case, desc, func, literal_column
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.database import async_session_maker, set_statement_timeout
+from backend.models import Article, SEARCH_LANGUAGES, SEARCH_CONFIGS
+from backend.utils.broker import broker
+
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "auto")
+SEARCH_STATEMENT_TIMEOUT_MS = int(os.getenv("SEARCH_STATEMENT_TIMEOUT_MS", "3000"))
+# private-use markers, swapped for <mark> only after the headline has been escaped
+MARK_START, MARK_STOP = "\ue000", "\ue001"
+HEADLINE_OPTIONS = f"MaxFragments=2, MaxWords=30, MinWords=10, StartSel={MARK_START}, StopSel={MARK_STOP}"
+FIELD_WEIGHTS = {"title": 1.0, "excerpt": 0.4, "content": 0.1}
+SNIPPET_WORDS = 30
+SEARCH_OVERFETCH = 20
+SEARCH_MAX_MATCHES = int(os.getenv("SEARCH_MAX_MATCHES", "1000"))
+SEARCH_CHANNEL = "search"
+WORKER_ID = uuid.uuid4().hex
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+TAG_RE = re.compile(r"<[^>]*>")
+
+logger = logging.getLogger(__name__)
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return [token.lower() for token in TOKEN_RE.findall(text or "")]
+
+def plain_text(value: Optional[str]) -> str:
+    return unescape(TAG_RE.sub(" ", value or ""))
+
+def highlight(headline: Optional[str]) -> Optional[str]:
+    if headline is None:
+        return None
+    return escape(unescape(headline)).replace(MARK_START, "<mark>").replace(MARK_STOP, "</mark>")
+
+def article_vector(language: str):
+    return getattr(Article, f"search_{language}")
+
+def article_query(language: str, term: str):
+    regconfig = literal_column(f"'{SEARCH_CONFIGS[language]}'::regconfig")
+    return func.websearch_to_tsquery(regconfig, term)
+
+def use_fulltext(db: AsyncSession) -> bool:
+    if SEARCH_BACKEND == "memory":
+        return False
+    if SEARCH_BACKEND == "postgres":
+        return True
+    return db.bind.dialect.name == "postgresql"
+
+def match_clause(term: str, languages: Optional[List[str]] = None):
+    return or_(*[
+        article_vector(language).op("@@")(article_query(language, term))
+        for language in languages or SEARCH_LANGUAGES
+    ])
+
+class InvertedIndex:
+    """In-memory inverted index used when PostgreSQL full-text search is unavailable"""
+
+    def __init__(self):
+        self.postings: Dict[str, Dict[str, Dict[int, float]]] = {
+            language: defaultdict(dict) for language in SEARCH_LANGUAGES
+        }
+        self.documents: Dict[int, Dict[str, List[str]]] = {}
+        self.texts: Dict[int, Dict[str, str]] = {}
+        self.loaded = False
+        self.unannounced: Set[int] = set()
+        self._announcer: Optional[asyncio.Task] = None
+
+    def add(self, article: Article):
+        self.remove(article.id)
+        if article.status != "published":
+            return
+        self.documents[article.id] = {}
+        self.texts[article.id] = {}
+        for language in SEARCH_LANGUAGES:
+            fields = {field: plain_text(getattr(article, f"{field}_{language}")) for field in FIELD_WEIGHTS}
+            weights: Dict[str, float] = defaultdict(float)
+            for field, weight in FIELD_WEIGHTS.items():
+                for token in tokenize(fields[field]):
+                    weights[token] += weight
+            if not weights:
+                continue
+            for token, weight in weights.items():
+                self.postings[language][token][article.id] = weight
+            self.documents[article.id][language] = list(weights)
+            self.texts[article.id][language] = fields["content"] or fields["excerpt"] or fields["title"]
+
+    def remove(self, article_id: int):
+        for language, tokens in self.documents.pop(article_id, {}).items():
+            postings = self.postings[language]
+            for token in tokens:
+                postings[token].pop(article_id, None)
+                if not postings[token]:
+                    del postings[token]
+        self.texts.pop(article_id, None)
+
+    def search(self, term: str, languages: Optional[List[str]] = None) -> List[dict]:
+        terms = tokenize(term)
+        if not terms:
+            return []
+        total = max(len(self.documents), 1)
+        best: Dict[int, dict] = {}
+        for language in languages or SEARCH_LANGUAGES:
+            postings = self.postings[language]
+            matches = [postings.get(token) for token in terms]
+            if not all(matches):
+                continue
+            candidates = set.intersection(*[set(match) for match in matches])
+            for article_id in candidates:
+                rank = sum(
+                    match[article_id] * math.log(1 + total / len(match))
+                    for match in matches
+                )
+                if article_id not in best or rank > best[article_id]["rank"]:
+                    best[article_id] = {"id": article_id, "rank": rank, "language": language}
+        return sorted(best.values(), key=lambda hit: hit["rank"], reverse=True)
+
+    def snippet(self, article_id: int, language: str, term: str) -> Optional[str]:
+        text = self.texts.get(article_id, {}).get(language)
+        if not text:
+            return None
+        terms = set(tokenize(term))
+        words = text.split()
+        start = next(
+            (i for i, word in enumerate(words) if set(tokenize(word)) & terms), 0
+        )
+        start = max(start - SNIPPET_WORDS // 3, 0)
+        fragment = [
+            f"<mark>{escape(word)}</mark>" if set(tokenize(word)) & terms else escape(word)
+            for word in words[start:start + SNIPPET_WORDS]
+        ]
+        return " ".join(fragment)
+
+    def sync(self, article: Article):
+        if self.loaded:
+            self.add(article)
+        self._announce(article.id)
+
+    def discard(self, article_id: int):
+        if self.loaded:
+            self.remove(article_id)
+        self._announce(article_id)
+
+    def _announce(self, article_id: int):
+        # every worker keeps its own index, so the others are told which articles to reload
+        if SEARCH_BACKEND != "memory":
+            return
+        self.unannounced.add(article_id)
+        if self._announcer is None or self._announcer.done():
+            self._announcer = asyncio.get_running_loop().create_task(self._publish())
+
+    async def _publish(self):
+        while self.unannounced:
+            article_ids, self.unannounced = sorted(self.unannounced), set()
+            try:
+                await broker.publish(SEARCH_CHANNEL, {"origin": WORKER_ID, "article_ids": article_ids})
+            except Exception:
+                logger.exception("Failed to announce search index changes for %s", article_ids)
+
+    async def reload(self, article_ids: List[int]):
+        async with async_session_maker() as db:
+            result = await db.execute(select(Article).where(Article.id.in_(article_ids)))
+            found = {article.id: article for article in result.scalars()}
+        for article_id in article_ids:
+            if article_id in found:
+                self.add(found[article_id])
+            else:
+                self.remove(article_id)
+
+    async def ensure_loaded(self, db: AsyncSession):
+        if self.loaded:
+            return
+        result = await db.execute(select(Article).where(Article.status == "published"))
+        for article in result.scalars():
+            self.add(article)
+        self.loaded = True
+
+search_index = InvertedIndex()
+
+async def apply_search_changes(seq: int, message: dict):
+    if message["origin"] == WORKER_ID or not search_index.loaded:
+        return
+    await search_index.reload(message["article_ids"])
+
+broker.subscribe(SEARCH_CHANNEL, apply_search_changes)
+
+async def matching_article_ids(db: AsyncSession, term: str, limit: int = SEARCH_MAX_MATCHES) -> List[int]:
+    """Ids of the best ranked matches, capped so a common term can't put the whole corpus in an IN list"""
+    await search_index.ensure_loaded(db)
+    return [hit["id"] for hit in search_index.search(term)[:limit]]
+
+async def search_articles(
+    db: AsyncSession,
+    term: str,
+    language: Optional[str] = None,
+    category_id: Optional[int] = None,
+    region_id: Optional[int] = None,
+    skip: int = 0,
+    limit: int = 20
+) -> List[dict]:
+    languages = [language] if language else SEARCH_LANGUAGES
+    filters = [Article.status == "published"]
+    if category_id:
+        filters.append(Article.category_id == category_id)
+    if region_id:
+        filters.append(Article.region_id == region_id)
+
+    if not use_fulltext(db):
+        return await _search_in_memory(db, term, languages, filters, skip, limit)
+
+    # free text from the public shouldn't be able to hold a connection for the global timeout
+    await set_statement_timeout(db, SEARCH_STATEMENT_TIMEOUT_MS)
+    ranks = {
+        lang: func.ts_rank_cd(article_vector(lang), article_query(lang, term))
+        for lang in languages
+    }
+    best_rank = func.greatest(*ranks.values())
+    ranked = (
+        select(
+            Article.id,
+            best_rank.label("rank"),
+            *[rank.label(f"rank_{lang}") for lang, rank in ranks.items()]
+        )
+        .where(and_(*filters), match_clause(term, languages))
+        .order_by(desc("rank"), desc(Article.published_at))
+        .offset(skip)
+        .limit(limit)
+        .subquery()
+    )
+    best_language = case(
+        *[(ranked.c[f"rank_{lang}"] == ranked.c.rank, lang) for lang in languages],
+        else_=languages[0]
+    )
+    snippet = case(
+        *[
+            (
+                ranked.c[f"rank_{lang}"] == ranked.c.rank,
+                func.ts_headline(
+                    literal_column(f"'{SEARCH_CONFIGS[lang]}'::regconfig"),
+                    # plain text, so the headline can be escaped as a whole
+                    func.regexp_replace(
+                        func.coalesce(getattr(Article, f"content_{lang}"), getattr(Article, f"title_{lang}")),
+                        "<[^>]*>", " ", "g"
+                    ),
+                    article_query(lang, term),
+                    HEADLINE_OPTIONS
+                )
+            )
+            for lang in languages
+        ]
+    )
+    result = await db.execute(
+        select(Article, ranked.c.rank, best_language.label("language"), snippet.label("snippet"))
+        .join(ranked, Article.id == ranked.c.id)
+        .order_by(desc(ranked.c.rank), desc(Article.published_at))
+    )
+    return [
+        {"article": article, "rank": rank, "language": lang, "snippet": highlight(text)}
+        for article, rank, lang, text in result.all()
+    ]
+
+async def _search_in_memory(db, term, languages, filters, skip, limit) -> List[dict]:
+    await search_index.ensure_loaded(db)
+    hits = search_index.search(term, languages)
+    # check the ranked hits against the filters a window at a time, instead of loading every match
+    matched, position, window = [], 0, skip + limit + SEARCH_OVERFETCH
+    while position < len(hits) and len(matched) < skip + limit:
+        chunk = hits[position:position + window]
+        position += window
+        result = await db.execute(
+            select(Article.id).where(and_(*filters), Article.id.in_([hit["id"] for hit in chunk]))
+        )
+        allowed = set(result.scalars())
+        matched += [hit for hit in chunk if hit["id"] in allowed]
+    page = matched[skip:skip + limit]
+    if not page:
+        return []
+    result = await db.execute(select(Article).where(Article.id.in_([hit["id"] for hit in page])))
+    articles = {article.id: article for article in result.scalars()}
+    page = [hit for hit in page if hit["id"] in articles]
+    return [
+        {
+            "article": articles[hit["id"]],
+            "rank": hit["rank"],
+            "language": hit["language"],
+            "snippet": search_index.snippet(hit["id"], hit["language"], term),
+        }
+        for hit in page
+    ]
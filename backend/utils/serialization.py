@@ -0,0 +1,47 @@
+import os
+import json
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Any, List, Tuple
+from backend.utils.cache import encode_json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+FAST_SERIALIZATION = os.getenv("FAST_SERIALIZATION", "false").lower() in ("1", "true", "yes")
+
+def _default(value: Any):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(data: Any) -> bytes:
+    """Compact UTF-8 JSON, the same shape pydantic's dump_json produces for plain values"""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+@lru_cache(maxsize=None)
+def field_names(model) -> Tuple[str, ...]:
+    return tuple(model.model_fields)
+
+def row_dicts(model, rows) -> List[dict]:
+    names = field_names(model)
+    return [
+        {name: row[name] for name in names} if isinstance(row, dict)
+        else {name: getattr(row, name) for name in names}
+        for row in rows
+    ]
+
+def encode_rows(model, rows) -> bytes:
+    """A JSON list of `model`; the fast path copies fields off rows we loaded ourselves without re-validating them"""
+    if FAST_SERIALIZATION:
+        return dumps(row_dicts(model, rows))
+    return encode_json(List[model], rows)
+
+def encode_dicts(rows: List[dict]) -> bytes:
+    if FAST_SERIALIZATION:
+        return dumps(rows)
+    return encode_json(List[dict], rows)
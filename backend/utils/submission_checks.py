@@ -0,0 +1,84 @@
+import re
+import hashlib
+from datetime import datetime
+from typing import Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.models import Submission, SubmissionCheck
+from backend.utils.images import normalize_upload
+
+MIN_DETECTION_LETTERS = 20
+WORD_PATTERN = re.compile(r"\w+")
+ETHIOPIC = re.compile(r"[ሀ-፿]")
+LATIN = re.compile(r"[A-Za-z]")
+
+# frequent function words that separate the two languages sharing each script
+MARKER_WORDS = {
+    "am": {"ነው", "ናቸው", "እና", "ላይ", "ውስጥ", "ነበር", "ይህ", "ግን", "እንደ", "ወደ", "የሚል", "አለ"},
+    "ti": {"እዩ", "እዮም", "ኣብ", "ናይ", "እዚ", "ምስ", "ከም", "ግን", "ድማ", "ነበረ", "ኣሎ", "እውን"},
+    "en": {"the", "and", "of", "to", "in", "is", "that", "for", "was", "with", "on", "are"},
+    "om": {"fi", "kan", "keessatti", "irratti", "akka", "kana", "isaan", "ture", "jedhe", "naannoo", "garuu", "ni"},
+}
+
+def _marker_scores(words, first: str, second: str) -> Tuple[float, float]:
+    return (
+        sum(word in MARKER_WORDS[first] for word in words),
+        sum(word in MARKER_WORDS[second] for word in words),
+    )
+
+def detect_language(text: str) -> Tuple[Optional[str], float]:
+    """Best guess among en/am/om/ti with a 0-1 confidence, or (None, 0.0) when the text is too short"""
+    ethiopic = len(ETHIOPIC.findall(text))
+    latin = len(LATIN.findall(text))
+    if ethiopic + latin < MIN_DETECTION_LETTERS:
+        return None, 0.0
+    words = WORD_PATTERN.findall(text.casefold())
+    if ethiopic >= latin:
+        first, second = "am", "ti"
+        first_score, second_score = _marker_scores(words, first, second)
+        # Tigrinya spells the vowel a with ኣ where Amharic uses አ
+        first_score += text.count("አ") * 0.5
+        second_score += text.count("ኣ") * 0.5
+    else:
+        first, second = "en", "om"
+        first_score, second_score = _marker_scores(words, first, second)
+        # long vowels are written doubled in Afaan Oromo
+        second_score += len(re.findall(r"aa|ee|ii|oo|uu", text.casefold())) * 0.25
+    total = first_score + second_score
+    if not total:
+        return first, 0.5
+    if first_score >= second_score:
+        return first, round(first_score / total, 2)
+    return second, round(second_score / total, 2)
+
+def content_fingerprint(title: str, content: str) -> str:
+    """Hash of the words only, so re-sent copies match despite spacing, case and punctuation changes"""
+    words = WORD_PATTERN.findall(f"{title} {content}".casefold())
+    return hashlib.sha256(" ".join(words).encode("utf-8")).hexdigest()
+
+async def check_submission(db: AsyncSession, submission: Submission) -> dict:
+    """Run the intake checks and upsert their results; safe to repeat when a job is retried"""
+    detected, confidence = detect_language(f"{submission.title}\n{submission.content}")
+    fingerprint = content_fingerprint(submission.title, submission.content)
+    duplicate_of = await db.scalar(
+        select(SubmissionCheck.submission_id)
+        .where(SubmissionCheck.fingerprint == fingerprint, SubmissionCheck.submission_id != submission.id)
+        .order_by(SubmissionCheck.submission_id)
+        .limit(1)
+    )
+    images = [await normalize_upload(url) for url in submission.images or []]
+    values = {
+        "detected_language": detected,
+        "language_confidence": confidence,
+        "language_matches": None if detected is None else detected == submission.language,
+        "fingerprint": fingerprint,
+        "duplicate_of": duplicate_of,
+        "images": images,
+        "processed_at": datetime.utcnow(),
+    }
+    dialect = postgresql if db.bind.dialect.name == "postgresql" else sqlite
+    statement = dialect.insert(SubmissionCheck).values(submission_id=submission.id, **values)
+    await db.execute(statement.on_conflict_do_update(index_elements=[SubmissionCheck.submission_id], set_=values))
+    await db.commit()
+    return {"submission_id": submission.id, **values}
@@ -0,0 +1,201 @@
+import os
+import time
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import select, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.database import async_session_maker
+from backend.models import Article, ArticleViewBucket
+
+TRENDING_HALF_LIFE_HOURS = float(os.getenv("TRENDING_HALF_LIFE_HOURS", "6"))
+TRENDING_WINDOW_HOURS = int(os.getenv("TRENDING_WINDOW_HOURS", "72"))
+TRENDING_TOP_K = int(os.getenv("TRENDING_TOP_K", "100"))
+TRENDING_REFRESH_INTERVAL = float(os.getenv("TRENDING_REFRESH_INTERVAL", "60"))
+BUCKET_SECONDS = 3600
+
+logger = logging.getLogger(__name__)
+
+Scope = Tuple[str, Optional[int]]
+ALL_SCOPE: Scope = ("all", None)
+
+def bucket_start(moment: datetime) -> datetime:
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+def article_scopes(region_id: Optional[int], category_id: Optional[int]) -> List[Scope]:
+    scopes = [ALL_SCOPE]
+    if region_id:
+        scopes.append(("region", region_id))
+    if category_id:
+        scopes.append(("category", category_id))
+    return scopes
+
+class TrendingEngine:
+    """Exponentially decayed view scores with a precomputed top-K list per scope"""
+
+    def __init__(self, half_life_hours: float = TRENDING_HALF_LIFE_HOURS, top_k: int = TRENDING_TOP_K):
+        self.half_life = half_life_hours * 3600
+        self.top_k = top_k
+        self.anchor = time.time()
+        self.scores: Dict[int, float] = {}
+        self.scopes_of: Dict[int, List[Scope]] = {}
+        self.rankings: Dict[Scope, List[int]] = {}
+        self.loaded = False
+        self.refreshes = 0
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def weight(self, timestamp: float) -> float:
+        # Scores are stored relative to a fixed anchor instead of being decayed in place:
+        # time shrinks every score by the same factor, so rankings only move on new views
+        return 2 ** ((timestamp - self.anchor) / self.half_life)
+
+    def score(self, article_id: int, now: Optional[float] = None) -> float:
+        """Decayed view score as of now"""
+        return self.scores.get(article_id, 0.0) * 2 ** ((self.anchor - (now or time.time())) / self.half_life)
+
+    def ranking(self, region_id: Optional[int] = None, category_id: Optional[int] = None) -> List[int]:
+        if region_id:
+            return self.rankings.get(("region", region_id), [])
+        if category_id:
+            return self.rankings.get(("category", category_id), [])
+        return self.rankings.get(ALL_SCOPE, [])
+
+    def record(self, views: Dict[int, int], timestamp: Optional[float] = None):
+        """Fold views flushed by this worker into the rankings until the next refresh"""
+        weight = self.weight(timestamp or time.time())
+        for article_id, count in views.items():
+            scopes = self.scopes_of.get(article_id)
+            if scopes is None:
+                # not published, or first seen by another worker; picked up on refresh
+                continue
+            self.scores[article_id] += count * weight
+            for scope in scopes:
+                self._promote(scope, article_id)
+
+    def _promote(self, scope: Scope, article_id: int):
+        # Scores only grow between refreshes, so re-placing the article that changed keeps every list exact
+        ranking = self.rankings.setdefault(scope, [])
+        score = self.scores[article_id]
+        if article_id in ranking:
+            ranking.remove(article_id)
+        elif len(ranking) >= self.top_k and score <= self.scores[ranking[-1]]:
+            return
+        position = len(ranking)
+        while position > 0 and self.scores[ranking[position - 1]] < score:
+            position -= 1
+        ranking.insert(position, article_id)
+        del ranking[self.top_k:]
+
+    def sync(self, article: Article):
+        if article.status != "published":
+            self.discard(article.id)
+            return
+        scopes = article_scopes(article.region_id, article.category_id)
+        if article.id not in self.scores:
+            # known from now on, so record() counts its first views instead of waiting for a refresh
+            self.scores[article.id] = 0.0
+            self.scopes_of[article.id] = scopes
+        elif scopes != self.scopes_of.get(article.id):
+            score = self.scores[article.id]
+            self.discard(article.id)
+            self.scores[article.id] = score
+            self.scopes_of[article.id] = scopes
+            for scope in scopes:
+                self._promote(scope, article.id)
+
+    def discard(self, article_id: int):
+        self.scores.pop(article_id, None)
+        for scope in self.scopes_of.pop(article_id, []):
+            ranking = self.rankings.get(scope, [])
+            if article_id in ranking:
+                ranking.remove(article_id)
+
+    async def refresh(self, db: AsyncSession):
+        """Rebuild scores and rankings from the shared hourly buckets of every worker; read-only"""
+        async with self._lock:
+            cutoff = datetime.utcnow() - timedelta(hours=TRENDING_WINDOW_HOURS)
+            result = await db.execute(
+                select(
+                    ArticleViewBucket.article_id,
+                    ArticleViewBucket.bucket_start,
+                    ArticleViewBucket.views,
+                    Article.region_id,
+                    Article.category_id,
+                )
+                .join(Article, Article.id == ArticleViewBucket.article_id)
+                .where(ArticleViewBucket.bucket_start >= cutoff, Article.status == "published")
+            )
+            anchor = time.time()
+            scores: Dict[int, float] = defaultdict(float)
+            scopes_of: Dict[int, List[Scope]] = {}
+            for article_id, start, views, region_id, category_id in result:
+                # weigh each bucket at its midpoint, the current one no later than now
+                midpoint = min(start.replace(tzinfo=timezone.utc).timestamp() + BUCKET_SECONDS / 2, anchor)
+                scores[article_id] += views * 2 ** ((midpoint - anchor) / self.half_life)
+                scopes_of[article_id] = article_scopes(region_id, category_id)
+
+            members: Dict[Scope, List[int]] = defaultdict(list)
+            for article_id, scopes in scopes_of.items():
+                for scope in scopes:
+                    members[scope].append(article_id)
+            self.anchor = anchor
+            self.scores = dict(scores)
+            self.scopes_of = scopes_of
+            self.rankings = {
+                scope: sorted(ids, key=lambda article_id: (-scores[article_id], -article_id))[:self.top_k]
+                for scope, ids in members.items()
+            }
+            self.loaded = True
+            self.refreshes += 1
+
+    async def prune(self, db: AsyncSession):
+        cutoff = datetime.utcnow() - timedelta(hours=TRENDING_WINDOW_HOURS)
+        await db.execute(delete(ArticleViewBucket).where(ArticleViewBucket.bucket_start < cutoff))
+        await db.commit()
+
+    async def ensure_loaded(self, db: AsyncSession):
+        if not self.loaded:
+            await self.refresh(db)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(TRENDING_REFRESH_INTERVAL)
+            try:
+                async with async_session_maker() as db:
+                    await self.prune(db)
+                    await self.refresh(db)
+            except Exception:
+                logger.exception("Failed to refresh trending rankings")
+
+    async def start(self):
+        """Seed rankings from the stored buckets, so views flushed right after boot land in a loaded engine"""
+        if self._task is not None:
+            return
+        try:
+            async with async_session_maker() as db:
+                await self.refresh(db)
+        except Exception:
+            logger.exception("Failed to load trending rankings")
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "half_life_hours": self.half_life / 3600,
+            "articles": len(self.scores),
+            "scopes": len(self.rankings),
+            "refreshes": self.refreshes,
+        }
+
+trending = TrendingEngine()
@@ -0,0 +1,143 @@
+import os
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Optional
+from sqlalchemy import update, select, values, column, bindparam, func, case, literal, Integer, DateTime
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from backend.database import async_session_maker
+from backend.models import Article, ArticleViewBucket
+from backend.utils.trending import trending, bucket_start
+
+VIEW_FLUSH_INTERVAL = float(os.getenv("VIEW_FLUSH_INTERVAL", "5"))
+VIEW_MAX_PENDING = int(os.getenv("VIEW_MAX_PENDING", "1000"))
+
+logger = logging.getLogger(__name__)
+
+# a view is not an edit: keep updated_at, which feeds publish as the entry's modification time
+UNCHANGED = {"updated_at": Article.__table__.c.updated_at}
+
+class ViewCounter:
+    """Accumulates article views in memory and writes them in batches"""
+
+    def __init__(self, flush_interval: float = VIEW_FLUSH_INTERVAL, max_pending: int = VIEW_MAX_PENDING):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.pending: Dict[int, int] = defaultdict(int)
+        self.pending_count = 0
+        self.flushed_count = 0
+        self.flush_count = 0
+        self._lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def record(self, article_id: int, count: int = 1):
+        self.pending[article_id] += count
+        self.pending_count += count
+        if self.pending_count >= self.max_pending:
+            self._wakeup.set()
+
+    def pending_for(self, article_id: int) -> int:
+        return self.pending.get(article_id, 0)
+
+    async def flush(self) -> int:
+        async with self._lock:
+            if not self.pending:
+                return 0
+            batch, self.pending = self.pending, defaultdict(int)
+            total, self.pending_count = self.pending_count, 0
+            try:
+                async with async_session_maker() as session:
+                    await self._write(session, batch)
+                    await session.commit()
+            except IntegrityError:
+                # retrying a batch the database rejects would block every later flush behind it
+                logger.exception("Dropped %d article views the database rejected", total)
+                return 0
+            except Exception:
+                logger.exception("Failed to flush %d article views", total)
+                for article_id, count in batch.items():
+                    self.pending[article_id] += count
+                self.pending_count += total
+                return 0
+            self.flushed_count += total
+            self.flush_count += 1
+            trending.record(batch)
+            return total
+
+    async def _write(self, session, batch: Dict[int, int]):
+        articles = Article.__table__
+        if session.bind.dialect.name == "postgresql":
+            deltas = values(
+                column("id", Integer), column("delta", Integer), name="view_deltas"
+            ).data(list(batch.items()))
+            await session.execute(
+                update(articles)
+                .where(articles.c.id == deltas.c.id)
+                .values(view_count=func.coalesce(articles.c.view_count, 0) + deltas.c.delta, **UNCHANGED)
+            )
+        else:
+            await session.execute(
+                update(articles)
+                .where(articles.c.id == bindparam("article_id"))
+                .values(view_count=func.coalesce(articles.c.view_count, 0) + bindparam("delta"), **UNCHANGED),
+                [{"article_id": article_id, "delta": count} for article_id, count in batch.items()]
+            )
+        await self._write_buckets(session, batch)
+
+    async def _write_buckets(self, session, batch: Dict[int, int]):
+        # joined against articles so views of an article deleted since they were counted are skipped
+        articles = Article.__table__
+        hour = literal(bucket_start(datetime.utcnow()), DateTime)
+        if session.bind.dialect.name == "postgresql":
+            dialect = postgresql
+            deltas = values(
+                column("id", Integer), column("delta", Integer), name="bucket_deltas"
+            ).data(list(batch.items()))
+            rows = select(articles.c.id, hour, deltas.c.delta).join(deltas, deltas.c.id == articles.c.id)
+        else:
+            dialect = sqlite
+            # the WHERE clause also keeps SQLite from reading ON CONFLICT as part of the SELECT
+            rows = select(articles.c.id, hour, case(batch, value=articles.c.id)).where(articles.c.id.in_(list(batch)))
+        statement = dialect.insert(ArticleViewBucket).from_select(
+            [ArticleViewBucket.article_id, ArticleViewBucket.bucket_start, ArticleViewBucket.views], rows
+        )
+        await session.execute(statement.on_conflict_do_update(
+            index_elements=[ArticleViewBucket.article_id, ArticleViewBucket.bucket_start],
+            set_={"views": ArticleViewBucket.views + statement.excluded.views}
+        ))
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "pending": self.pending_count,
+            "pending_articles": len(self.pending),
+            "flushed": self.flushed_count,
+            "flushes": self.flush_count,
+        }
+
+view_counter = ViewCounter()
@@ -39,7 +39,9 @@ export default function HomePage() {
     
     websocket.onmessage = (event) => {
       const data = JSON.parse(event.data)
-      if (data.type === 'breaking_news') {
+      if (data.type === 'ping') {
+        websocket.send(JSON.stringify({ action: 'pong' }))
+      } else if (data.type === 'breaking_news') {
         console.log('New breaking news:', data.data)
       }
     }